@@ -1,15 +1,24 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
+from django.http import FileResponse, Http404
 from rest_framework.authtoken.models import Token
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
 
 
 from backend.models import (
     User, Shop, Category, Product, ProductInfo, Parameter, 
-    ProductParameter, Order, OrderItem, Contact, ConfirmEmailToken
+    ProductParameter, Order, OrderItem, Contact, ConfirmEmailToken, StockHold,
+    ArchivedOrder, ArchivedOrderItem, OutboxEvent, OutgoingEmail, PendingNotification,
+    RequestProfile, SlowQuery
 )
+from backend.models import can_transition
+from backend.profiling import ProfileStorage
+from backend.services.inventory import InventoryError
+from backend.services.orders import OrderService, OrderServiceError
+from backend.services.outbox import OutboxService
 
 
 # Настройка заголовков админки
@@ -53,10 +62,10 @@ class ShopAdmin(admin.ModelAdmin):
     Панель управления магазинами.
 
     """
-    list_display = ('name', 'user', 'is_accepting_orders', 'products_count')
-    list_filter = ('is_accepting_orders',)
+    list_display = ('name', 'user', 'is_accepting_orders', 'order_digest', 'products_count')
+    list_filter = ('is_accepting_orders', 'order_digest')
     search_fields = ('name', 'user__email')
-    list_editable = ('is_accepting_orders',)
+    list_editable = ('is_accepting_orders', 'order_digest')
     
     def products_count(self, obj):
         count = obj.product_infos.count()
@@ -114,16 +123,26 @@ class ProductInfoAdmin(admin.ModelAdmin):
     Панель управления информацией о товарах (склад).
 
     """
-    list_display = ('product', 'shop', 'model', 'price', 'price_rrc', 'quantity', 'availability_status')
+    list_display = (
+        'product', 'shop', 'model', 'price', 'price_rrc', 'quantity', 'stock_total',
+        'stock_shards', 'availability_status'
+    )
     list_filter = ('shop', 'product__category')
     search_fields = ('product__name', 'model', 'shop__name')
     list_editable = ('price', 'price_rrc', 'quantity')
     inlines = [ProductParameterInline]
-    
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stock_total()
+
+    def stock_total(self, obj):
+        return obj.total_quantity
+    stock_total.short_description = 'Всего с шардами'
+
     def availability_status(self, obj):
-        if obj.quantity > 10:
+        if obj.total_quantity > 10:
             return format_html('<span style="color: green;">✓ В наличии</span>')
-        elif obj.quantity > 0:
+        elif obj.total_quantity > 0:
             return format_html('<span style="color: orange;">⚠ Мало</span>')
         else:
             return format_html('<span style="color: red;">✗ Нет в наличии</span>')
@@ -159,7 +178,7 @@ class ProductParameterAdmin(admin.ModelAdmin):
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ('total_price',)
+    readonly_fields = ('price', 'total_price')
     
     def total_price(self, obj):
         if obj.product_info and obj.quantity:
@@ -168,6 +187,24 @@ class OrderItemInline(admin.TabularInline):
     total_price.short_description = 'Сумма'
 
 
+class OrderAdminForm(forms.ModelForm):
+    """
+    Форма заказа с проверкой перехода статуса и скрытой версией заказа.
+
+    """
+    class Meta:
+        model = Order
+        fields = '__all__'
+        widgets = {'version': forms.HiddenInput()}
+
+    def clean_state(self):
+        state = self.cleaned_data['state']
+        old_state = self.instance.state if self.instance.pk else None
+        if old_state and state != old_state and not can_transition(old_state, state):
+            raise forms.ValidationError(f'Недопустимый переход статуса: {old_state} → {state}')
+        return state
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     """
@@ -180,7 +217,42 @@ class OrderAdmin(admin.ModelAdmin):
     list_editable = ('state',)
     date_hierarchy = 'dt'
     inlines = [OrderItemInline]
-    
+    form = OrderAdminForm
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', OrderAdminForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        """
+        Статус меняется через OrderService (переход по таблице, проверка версии),
+        остальные измененные поля сохраняются отдельно без перезаписи статуса.
+        """
+        if not change or 'state' not in form.changed_data:
+            super().save_model(request, obj, form, change)
+            return
+
+        new_state = obj.state
+        obj.state = form.initial['state']
+        other_fields = [name for name in form.changed_data if name not in ('state', 'version')]
+        if other_fields:
+            obj.save(update_fields=other_fields)
+        try:
+            OrderService.change_status(
+                obj, new_state, changed_by=request.user.id, comment='Изменено в админке'
+            )
+        except (OrderServiceError, InventoryError) as error:
+            request._order_status_failed = True
+            self.message_user(request, f'Заказ #{obj.pk}: {error}', level=messages.ERROR)
+
+    def message_user(self, request, message, level=messages.INFO, *args, **kwargs):
+        """
+        Сообщение об успешном сохранении не показывается, если статус не изменился из-за ошибки.
+        """
+        if level == messages.SUCCESS and getattr(request, '_order_status_failed', False):
+            return
+        super().message_user(request, message, level, *args, **kwargs)
+
     def items_count(self, obj):
         return obj.ordered_items.count()
     items_count.short_description = 'Товаров'
@@ -216,6 +288,169 @@ class OrderItemAdmin(admin.ModelAdmin):
     total_price.short_description = 'Общая стоимость'
 
 
+@admin.register(StockHold)
+class StockHoldAdmin(admin.ModelAdmin):
+    """
+    Панель просмотра резервов товаров в корзинах.
+
+    """
+    list_display = ('product_info', 'order', 'quantity', 'expires_at')
+    list_filter = ('product_info__shop',)
+    search_fields = ('product_info__product__name', 'order__user__email')
+    raw_id_fields = ('product_info', 'order')
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+    readonly_fields = ('product_name', 'shop_name', 'price', 'quantity')
+    fields = readonly_fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """
+    Панель просмотра архивных заказов (только чтение).
+
+    """
+    list_display = ('id', 'user', 'dt', 'state', 'total_sum', 'archived_at')
+    list_filter = ('state',)
+    search_fields = ('id', 'user__email')
+    date_hierarchy = 'dt'
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """
+    Панель просмотра событий outbox.
+
+    """
+    list_display = (
+        'id', 'topic', 'aggregate_id', 'created_at', 'dispatched_at', 'processed_at', 'attempts',
+        'failed_at',
+    )
+    list_filter = ('topic', ('failed_at', admin.EmptyFieldListFilter))
+    search_fields = ('aggregate_id',)
+    readonly_fields = (
+        'topic', 'aggregate_id', 'payload', 'created_at', 'dispatched_at', 'attempts', 'failed_at'
+    )
+    actions = ('replay_events',)
+
+    @admin.action(description='Повторить обработку выбранных событий')
+    def replay_events(self, request, queryset):
+        replayed = OutboxService.replay(queryset.values_list('id', flat=True))
+        self.message_user(request, f'Событий возвращено в очередь: {replayed}')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """
+    Панель просмотра очереди исходящих писем.
+
+    """
+    list_display = ('id', 'subject', 'domain', 'email_type', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'email_type')
+    search_fields = ('subject', 'domain')
+    raw_id_fields = ('user', 'order')
+
+
+@admin.register(PendingNotification)
+class PendingNotificationAdmin(admin.ModelAdmin):
+    """
+    Панель просмотра отложенных уведомлений.
+
+    """
+    list_display = ('id', 'kind', 'user', 'order', 'old_status', 'new_status', 'send_after')
+    list_filter = ('kind',)
+    raw_id_fields = ('user', 'order')
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Панель просмотра профилей запросов.
+
+    """
+    list_display = (
+        'created_at', 'view', 'method', 'path', 'status_code', 'duration_ms', 'mode', 'user',
+        'download_link'
+    )
+    list_filter = ('mode', 'view')
+    search_fields = ('view', 'path', 'request_id')
+    raw_id_fields = ('user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:profile_id>/download/',
+                self.admin_site.admin_view(self.download),
+                name='backend_requestprofile_download',
+            ),
+        ] + super().get_urls()
+
+    def download(self, request, profile_id):
+        profile = RequestProfile.objects.filter(id=profile_id).first()
+        if profile is None:
+            raise Http404
+        try:
+            file = open(ProfileStorage.path(profile.file_name), 'rb')
+        except FileNotFoundError:
+            raise Http404
+        return FileResponse(file, as_attachment=True, filename=profile.file_name)
+
+    def download_link(self, obj):
+        url = reverse('admin:backend_requestprofile_download', args=[obj.id])
+        return format_html('<a href="{}">{}</a>', url, obj.file_name)
+    download_link.short_description = 'Файл'
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """
+    Панель медленных SQL-запросов, сгруппированных по отпечатку.
+
+    """
+    list_display = ('short_sql', 'calls', 'avg_ms', 'max_ms', 'last_ms', 'last_view', 'last_seen')
+    list_filter = ('last_view',)
+    search_fields = ('sql', 'fingerprint', 'last_view')
+    fields = (
+        'fingerprint', 'sql', 'calls', 'total_ms', 'avg_ms', 'max_ms', 'last_ms', 'last_view',
+        'stack', 'explain', 'first_seen', 'last_seen'
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def short_sql(self, obj):
+        return obj.sql if len(obj.sql) <= 120 else f'{obj.sql[:120]}…'
+    short_sql.short_description = 'Запрос'
+
+    def avg_ms(self, obj):
+        return obj.avg_ms
+    avg_ms.short_description = 'Среднее, мс'
+
+
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
     """
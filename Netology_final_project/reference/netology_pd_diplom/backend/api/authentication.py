@@ -0,0 +1,162 @@
+"""
+Аутентификация по токену с кэшированием.
+"""
+
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenCache:
+    """
+    Двухуровневый кэш токенов: LRU в памяти процесса и общий кэш Django.
+
+    Хранится токен вместе с пользователем. Локальный уровень отдает копию
+    записи, поэтому изменения ``request.user`` в запросе не попадают в кэш.
+    При выходе, смене пароля и деактивации записи удаляются из общего кэша
+    и из памяти текущего процесса; в других процессах локальная запись
+    живет не дольше AUTH_TOKEN_LOCAL_CACHE_TTL секунд.
+
+    Инвалидация меняет версию токена в общем кэше. Запрос, прочитавший токен
+    из базы, сохраняет его, только если версия не изменилась с начала чтения,
+    иначе устаревшая запись вернулась бы в кэш.
+    """
+
+    _local = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(key: str) -> str:
+        """
+        Ключ записи в общем кэше.
+        """
+        return f"auth:token:{key}"
+
+    @staticmethod
+    def version_key(key: str) -> str:
+        """
+        Ключ версии инвалидации токена в общем кэше.
+        """
+        return f"auth:token:{key}:version"
+
+    @classmethod
+    def version(cls, key: str) -> Optional[str]:
+        """
+        Текущая версия инвалидации токена; None, если токен не инвалидировался.
+        """
+        return cache.get(cls.version_key(key))
+
+    @classmethod
+    def get(cls, key: str):
+        """
+        Токен с пользователем из кэша или None.
+        """
+        now = time.monotonic()
+        with cls._lock:
+            entry = cls._local.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    cls._local.move_to_end(key)
+                    return pickle.loads(payload)
+                del cls._local[key]
+
+        token = cache.get(cls.cache_key(key))
+        if token is not None:
+            cls._remember(key, token, now)
+        return token
+
+    @classmethod
+    def set(cls, token: Token, version: Optional[str]) -> bool:
+        """
+        Сохраняет токен с пользователем на обоих уровнях, если версия
+        инвалидации не изменилась с момента ``version``.
+
+        Возвращает False, если запись пропущена.
+        """
+        if cls.version(token.key) != version:
+            return False
+        cache.set(cls.cache_key(token.key), token, settings.AUTH_TOKEN_CACHE_TTL)
+        # Инвалидация меняет версию до удаления записи: если она прошла между
+        # проверкой и записью, повторная проверка это увидит
+        if cls.version(token.key) != version:
+            cache.delete(cls.cache_key(token.key))
+            return False
+        cls._remember(token.key, token, time.monotonic())
+        return True
+
+    @classmethod
+    def _remember(cls, key: str, token: Token, now: float) -> None:
+        """
+        Записывает токен в LRU процесса, вытесняя самые старые записи.
+        """
+        payload = pickle.dumps(token)
+        with cls._lock:
+            cls._local[key] = (now + settings.AUTH_TOKEN_LOCAL_CACHE_TTL, payload)
+            cls._local.move_to_end(key)
+            while len(cls._local) > settings.AUTH_TOKEN_LOCAL_CACHE_SIZE:
+                cls._local.popitem(last=False)
+
+    @classmethod
+    def invalidate(cls, *keys: str) -> None:
+        """
+        Удаляет токены из общего кэша и из памяти процесса.
+        """
+        if not keys:
+            return
+        version = uuid.uuid4().hex
+        cache.set_many(
+            {cls.version_key(key): version for key in keys}, settings.AUTH_TOKEN_CACHE_TTL
+        )
+        cache.delete_many([cls.cache_key(key) for key in keys])
+        with cls._lock:
+            for key in keys:
+                cls._local.pop(key, None)
+
+    @classmethod
+    def invalidate_user(cls, user_id: int) -> None:
+        """
+        Удаляет из кэша токены пользователя.
+        """
+        cls.invalidate(*Token.objects.filter(user_id=user_id).values_list("key", flat=True))
+
+    @classmethod
+    def clear_local(cls) -> None:
+        """
+        Очищает LRU процесса.
+        """
+        with cls._lock:
+            cls._local.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, читающая токен и пользователя из ``TokenCache``.
+
+    К базе обращается только при промахе кэша.
+    """
+
+    def authenticate_credentials(self, key):
+        token = TokenCache.get(key)
+        if token is None:
+            version = TokenCache.version(key)
+            try:
+                token = Token.objects.select_related("user").get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if token.user.is_active:
+                TokenCache.set(token, version)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return (token.user, token)
@@ -0,0 +1,135 @@
+"""
+Фильтры списков заказов.
+"""
+
+from datetime import datetime, time, timedelta
+
+from backend.models import OrderState
+from django.utils import timezone
+from rest_framework import serializers
+
+from .pagination import KeysetPagination
+
+
+def parse_states(value: str) -> list:
+    """
+    Разбирает список статусов через запятую (корзина не является заказом).
+    """
+    allowed = {choice for choice in OrderState.values if choice != OrderState.BASKET}
+    states = [state.strip() for state in value.split(",") if state.strip()]
+    invalid = [state for state in states if state not in allowed]
+    if invalid:
+        raise serializers.ValidationError(
+            f'Недопустимый статус: {", ".join(invalid)}'
+        )
+    return states
+
+
+class OrderListQuerySerializer(serializers.Serializer):
+    """
+    Параметры запроса истории заказов.
+    """
+
+    state = serializers.CharField(
+        required=False, help_text="Статус или список статусов через запятую"
+    )
+    date_from = serializers.DateField(required=False, help_text="Начальная дата (включительно)")
+    date_to = serializers.DateField(required=False, help_text="Конечная дата (включительно)")
+    summary = serializers.BooleanField(
+        required=False, default=False, help_text="Краткий режим без позиций заказа"
+    )
+    cursor = serializers.CharField(required=False, help_text="Курсор следующей страницы")
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=KeysetPagination.max_limit,
+        help_text="Размер страницы",
+    )
+
+    def validate_state(self, value):
+        """
+        Проверка списка статусов (корзина не является заказом).
+        """
+        return parse_states(value)
+
+    def validate(self, attrs):
+        """
+        Проверка корректности диапазона дат.
+        """
+        date_from = attrs.get("date_from")
+        date_to = attrs.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError("date_from не может быть позже date_to")
+        return attrs
+
+
+class SalesAnalyticsQuerySerializer(serializers.Serializer):
+    """
+    Параметры запроса аналитики продаж магазина.
+    """
+
+    max_days = 366
+
+    date_from = serializers.DateField(
+        required=False, help_text="Начальная дата (включительно), по умолчанию 30 дней назад"
+    )
+    date_to = serializers.DateField(
+        required=False, help_text="Конечная дата (включительно), по умолчанию сегодня"
+    )
+    group_by = serializers.ChoiceField(
+        choices=["day", "status", "product"], required=False, default="day",
+        help_text="Группировка строк отчета",
+    )
+    state = serializers.CharField(
+        required=False, help_text="Статус или список статусов через запятую"
+    )
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=100, default=20,
+        help_text="Количество товаров в группировке product",
+    )
+
+    def validate_state(self, value):
+        """
+        Проверка списка статусов.
+        """
+        return parse_states(value)
+
+    def validate(self, attrs):
+        """
+        Период по умолчанию и ограничение его длины.
+        """
+        attrs.setdefault("date_to", timezone.localdate())
+        attrs.setdefault("date_from", attrs["date_to"] - timedelta(days=29))
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from не может быть позже date_to")
+        if (attrs["date_to"] - attrs["date_from"]).days >= self.max_days:
+            raise serializers.ValidationError(f"Период не может превышать {self.max_days} дней")
+        return attrs
+
+
+def _day_start(value):
+    """
+    Начало дня в текущем часовом поясе.
+    """
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def filter_orders(queryset, params, state_field="state", date_field="dt"):
+    """
+    Применяет фильтры по статусу и диапазону дат.
+
+    Диапазон дат переводится в сравнение с границами суток, а не в ``__date``,
+    чтобы условие оставалось индексируемым.
+    """
+    states = params.get("state")
+    if states:
+        queryset = queryset.filter(**{f"{state_field}__in": states})
+
+    date_from = params.get("date_from")
+    if date_from:
+        queryset = queryset.filter(**{f"{date_field}__gte": _day_start(date_from)})
+
+    date_to = params.get("date_to")
+    if date_to:
+        queryset = queryset.filter(
+            **{f"{date_field}__lt": _day_start(date_to + timedelta(days=1))}
+        )
+    return queryset
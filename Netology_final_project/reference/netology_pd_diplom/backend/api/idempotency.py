@@ -0,0 +1,138 @@
+"""
+Идемпотентные запросы по заголовку Idempotency-Key.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from backend.models import IdempotencyKey
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(request) -> str:
+    """
+    Хеш тела запроса для проверки, что ключ повторяется с теми же параметрами.
+    """
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """
+    Декоратор метода APIView: повтор запроса с тем же ключом возвращает
+    сохраненный ответ, не выполняя обработчик повторно.
+
+    Ответы 5xx не сохраняются, чтобы клиент мог повторить запрос.
+    Пока первый запрос выполняется, повтор получает 409; запись, оставшаяся
+    без ответа дольше IDEMPOTENCY_LEASE секунд (процесс упал или был убит),
+    считается брошенной, и повтор выполняет запрос заново.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"status": False, "errors": f"{IDEMPOTENCY_HEADER} длиннее 255 символов"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request)
+        record, response = start(request, key, fingerprint)
+        if record is None:
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            record.status_code = response.status_code
+            record.response = response.data
+            record.save(update_fields=["status_code", "response"])
+        return response
+
+    return wrapper
+
+
+def start(request, key: str, fingerprint: str) -> tuple:
+    """
+    Создает запись ключа перед выполнением запроса.
+
+    Возвращает ``(запись, None)`` или ``(None, ответ)``, если ключ уже
+    использован. Брошенная запись того же запроса удаляется, и создание
+    повторяется один раз.
+    """
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    method=request.method,
+                    path=request.path,
+                    request_hash=fingerprint,
+                )
+            return record, None
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if record is None:
+            continue
+        same_request = (record.method, record.path, record.request_hash) == (
+            request.method, request.path, fingerprint
+        )
+        if not (same_request and is_abandoned(record)):
+            return None, replay(record, request, fingerprint)
+        # Удаляет только пока запись все еще брошена: параллельный повтор
+        # мог перехватить ее раньше
+        IdempotencyKey.objects.filter(
+            id=record.id, status_code__isnull=True, created_at=record.created_at
+        ).delete()
+    return None, Response(
+        {"status": False, "errors": "Запрос с этим ключом еще выполняется"},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+def is_abandoned(record: IdempotencyKey) -> bool:
+    """
+    Запрос начал выполняться дольше IDEMPOTENCY_LEASE секунд назад и не завершился.
+    """
+    lease = timedelta(seconds=settings.IDEMPOTENCY_LEASE)
+    return record.status_code is None and record.created_at < timezone.now() - lease
+
+
+def replay(record: IdempotencyKey, request, fingerprint: str) -> Response:
+    """
+    Ответ на повтор запроса с уже использованным ключом.
+    """
+    if (record.method, record.path, record.request_hash) != (
+        request.method, request.path, fingerprint
+    ):
+        return Response(
+            {"status": False, "errors": "Ключ идемпотентности использован с другим запросом"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record.status_code is None:
+        return Response(
+            {"status": False, "errors": "Запрос с этим ключом еще выполняется"},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response(
+        record.response, status=record.status_code, headers={REPLAYED_HEADER: "true"}
+    )
@@ -0,0 +1,79 @@
+"""
+Keyset-пагинация для списков заказов.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+class KeysetPagination:
+    """
+    Пагинация по паре полей (дата, id) в порядке убывания.
+
+    В отличие от OFFSET, стоимость выборки страницы не зависит от её номера:
+    курсор хранит значения последней строки, и следующая страница выбирается
+    условием ``(dt, id) < (cursor_dt, cursor_id)`` по индексу.
+    """
+
+    default_limit = 20
+    max_limit = 100
+
+    def __init__(self, date_field: str = "dt", id_field: str = "id"):
+        self.date_field = date_field
+        self.id_field = id_field
+
+    @staticmethod
+    def encode_cursor(dt: datetime, pk: int) -> str:
+        """
+        Упаковывает позицию последней строки в непрозрачный курсор.
+        """
+        raw = f"{dt.isoformat()}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        """
+        Распаковывает курсор в пару (дата, id).
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            dt_value, pk_value = raw.rsplit("|", 1)
+            return datetime.fromisoformat(dt_value), int(pk_value)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+            raise ValidationError({"cursor": "Некорректный курсор"}) from error
+
+    def get_limit(self, limit) -> int:
+        """
+        Ограничивает размер страницы допустимым диапазоном.
+        """
+        if not limit:
+            return self.default_limit
+        return max(1, min(int(limit), self.max_limit))
+
+    def paginate(self, queryset, cursor=None, limit=None):
+        """
+        Возвращает строки страницы и курсор следующей страницы (или None).
+        """
+        limit = self.get_limit(limit)
+        if cursor:
+            cursor_dt, cursor_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f"{self.date_field}__lt": cursor_dt})
+                | Q(**{self.date_field: cursor_dt, f"{self.id_field}__lt": cursor_id})
+            )
+
+        rows = list(
+            queryset.order_by(f"-{self.date_field}", f"-{self.id_field}")[: limit + 1]
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self.encode_cursor(
+                getattr(last, self.date_field), getattr(last, self.id_field)
+            )
+        return rows, next_cursor
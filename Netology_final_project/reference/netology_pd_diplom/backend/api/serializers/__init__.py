@@ -4,7 +4,13 @@ from .contact import ContactSerializer
 from .category import CategorySerializer
 from .shop import ShopSerializer
 from .product import ProductSerializer, ProductParameterSerializer, ProductInfoSerializer
-from .order import OrderItemSerializer, OrderItemCreateSerializer, OrderSerializer
+from .order import (
+    OrderItemSerializer, OrderItemCreateSerializer, OrderSerializer, OrderSummarySerializer
+)
+from .archive import (
+    ArchivedOrderSerializer, ArchivedOrderDetailSerializer, ArchivedOrderSummarySerializer,
+    PartnerArchivedOrderSerializer, PartnerArchivedOrderSummarySerializer
+)
 
 __all__ = [
     'UserSerializer',
@@ -16,5 +22,11 @@ __all__ = [
     'ProductInfoSerializer',
     'OrderItemSerializer',
     'OrderItemCreateSerializer',
-    'OrderSerializer'
+    'OrderSerializer',
+    'OrderSummarySerializer',
+    'ArchivedOrderSerializer',
+    'ArchivedOrderDetailSerializer',
+    'ArchivedOrderSummarySerializer',
+    'PartnerArchivedOrderSerializer',
+    'PartnerArchivedOrderSummarySerializer',
 ]
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Сериализаторы архивных заказов.
+"""
+
+from backend.models import ArchivedOrder, ArchivedOrderItem, ArchivedOrderStatusHistory
+from rest_framework import serializers
+
+
+class ArchivedOrderItemSerializer(serializers.ModelSerializer):
+    """
+    Позиция архивного заказа.
+    """
+
+    class Meta:
+        """
+        Мета-класс.
+        """
+
+        model = ArchivedOrderItem
+        fields = (
+            "product_info_id",
+            "shop_id",
+            "product_name",
+            "shop_name",
+            "price",
+            "quantity",
+        )
+        read_only_fields = fields
+
+
+class ArchivedOrderStatusHistorySerializer(serializers.ModelSerializer):
+    """
+    Запись истории статусов архивного заказа.
+    """
+
+    class Meta:
+        """
+        Мета-класс.
+        """
+
+        model = ArchivedOrderStatusHistory
+        fields = ("old_status", "new_status", "changed_at", "comment")
+        read_only_fields = fields
+
+
+class ArchivedOrderSummarySerializer(serializers.ModelSerializer):
+    """
+    Краткое представление архивного заказа.
+    """
+
+    class Meta:
+        """
+        Мета-класс.
+        """
+
+        model = ArchivedOrder
+        fields = ("id", "state", "dt", "total_sum", "items_count")
+        read_only_fields = fields
+
+
+class ArchivedOrderSerializer(ArchivedOrderSummarySerializer):
+    """
+    Архивный заказ с позициями и адресом доставки.
+    """
+
+    items = ArchivedOrderItemSerializer(read_only=True, many=True)
+
+    class Meta(ArchivedOrderSummarySerializer.Meta):
+        """
+        Мета-класс.
+        """
+
+        fields = ArchivedOrderSummarySerializer.Meta.fields + ("contact", "archived_at", "items")
+        read_only_fields = fields
+
+
+class ArchivedOrderDetailSerializer(ArchivedOrderSerializer):
+    """
+    Архивный заказ с позициями и историей статусов.
+    """
+
+    status_history = ArchivedOrderStatusHistorySerializer(read_only=True, many=True)
+
+    class Meta(ArchivedOrderSerializer.Meta):
+        """
+        Мета-класс.
+        """
+
+        fields = ArchivedOrderSerializer.Meta.fields + ("status_history",)
+        read_only_fields = fields
+
+
+class PartnerArchivedOrderSummarySerializer(ArchivedOrderSummarySerializer):
+    """
+    Краткое представление архивного заказа для магазина: сумма и количество
+    только по позициям магазина.
+    """
+
+    total_sum = serializers.DecimalField(
+        source="shop_total_sum", max_digits=12, decimal_places=2, read_only=True
+    )
+    items_count = serializers.IntegerField(source="shop_items_count", read_only=True)
+
+
+class PartnerArchivedOrderSerializer(PartnerArchivedOrderSummarySerializer):
+    """
+    Архивный заказ для магазина с его позициями и адресом доставки.
+    """
+
+    items = ArchivedOrderItemSerializer(read_only=True, many=True)
+
+    class Meta(ArchivedOrderSerializer.Meta):
+        """
+        Мета-класс.
+        """
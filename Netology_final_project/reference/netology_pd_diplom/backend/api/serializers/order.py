@@ -62,3 +62,27 @@ class OrderSerializer(serializers.ModelSerializer):
             "contact",
         )
         read_only_fields = ("id",)
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """
+    Краткое представление заказа без позиций.
+    """
+
+    total_sum = serializers.DecimalField(max_digits=12, decimal_places=2)
+    items_count = serializers.IntegerField()
+
+    class Meta:
+        """
+        Мета-класс.
+        """
+
+        model = Order
+        fields = (
+            "id",
+            "state",
+            "dt",
+            "total_sum",
+            "items_count",
+        )
+        read_only_fields = fields
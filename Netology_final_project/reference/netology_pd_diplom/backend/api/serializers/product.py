@@ -51,6 +51,14 @@ class ProductInfoSerializer(serializers.ModelSerializer):
 
     product = ProductSerializer(read_only=True)
     product_parameters = ProductParameterSerializer(read_only=True, many=True)
+    quantity = serializers.IntegerField(
+        source="total_quantity", read_only=True, help_text="Остаток с учетом шардов склада"
+    )
+    available = serializers.IntegerField(
+        source="available_quantity",
+        read_only=True,
+        help_text="Остаток за вычетом резервов в корзинах (только в каталоге)",
+    )
 
     class Meta:
         """
@@ -64,6 +72,7 @@ class ProductInfoSerializer(serializers.ModelSerializer):
             "product",
             "shop",
             "quantity",
+            "available",
             "price",
             "price_rrc",
             "product_parameters",
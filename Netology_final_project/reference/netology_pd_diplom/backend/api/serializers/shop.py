@@ -19,7 +19,7 @@ class ShopSerializer(serializers.ModelSerializer):
         """
 
         model = Shop
-        fields = ("id", "name", "is_accepting_orders", "status_order")
+        fields = ("id", "name", "is_accepting_orders", "order_digest", "status_order")
         read_only_fields = ("id",)
 
     def get_status_order(self, obj):
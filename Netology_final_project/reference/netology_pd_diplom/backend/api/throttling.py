@@ -0,0 +1,84 @@
+"""
+Ограничение частоты запросов скользящим окном в общем кэше.
+"""
+
+from rest_framework.throttling import (
+    AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+)
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Лимит запросов по счетчикам скользящего окна.
+
+    Вместо списка отметок времени на ключ хранятся два счетчика: текущего
+    и предыдущего окна длиной ``duration``. Число запросов за последние
+    ``duration`` секунд оценивается как счетчик текущего окна плюс доля
+    предыдущего, пропорциональная еще не прошедшей части окна. Счетчик
+    увеличивается атомарным ``incr`` кэша, поэтому при общем кэше (Redis)
+    лимит соблюдается во всех процессах, а проверка не зависит от лимита.
+    Отклоненный запрос счетчик не увеличивает.
+    """
+
+    def _incr(self, key: str) -> int:
+        """
+        Атомарно увеличивает счетчик окна, создавая его при отсутствии.
+        """
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Счетчик живет два окна: в следующем окне он станет предыдущим
+            if self.cache.add(key, 1, self.duration * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current_key = f"{self.key}:{window}"
+        self.previous = self.cache.get(f"{self.key}:{window - 1}", 0)
+        self.current = self._incr(current_key)
+        if self.previous * (1 - self.elapsed / self.duration) + self.current > self.num_requests:
+            self.current = self.cache.decr(current_key)
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """
+        Время до момента, когда оценка опустится ниже лимита.
+        """
+        if self.current < self.num_requests and self.previous:
+            share = (self.num_requests - self.current) / self.previous
+            return max(0.0, self.duration * (1 - share) - self.elapsed)
+        next_window = self.duration - self.elapsed
+        if not self.current:
+            return next_window
+        return next_window + max(0.0, self.duration * (1 - self.num_requests / self.current))
+
+
+class SlidingWindowUserRateThrottle(UserRateThrottle, SlidingWindowRateThrottle):
+    """
+    Лимит запросов пользователя (scope ``user``) скользящим окном.
+    """
+
+
+class SlidingWindowAnonRateThrottle(AnonRateThrottle, SlidingWindowRateThrottle):
+    """
+    Лимит анонимных запросов (scope ``anon``) скользящим окном.
+    """
+
+
+class SlidingWindowScopedRateThrottle(ScopedRateThrottle, SlidingWindowRateThrottle):
+    """
+    Лимит запросов по ``throttle_scope`` представления скользящим окном.
+    """
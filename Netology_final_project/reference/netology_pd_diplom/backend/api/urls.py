@@ -3,12 +3,15 @@ from django_rest_passwordreset.views import reset_password_request_token, reset_
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .views.auth import RegisterAccount, LoginAccount, AccountDetails, ConfirmAccount
+from .views.auth import RegisterAccount, LoginAccount, LogoutAccount, AccountDetails, ConfirmAccount
 from .views.catalog import CategoryView, ShopView, ProductInfoView
 from .views.basket import BasketView
 from .views.contacts import ContactView
-from .views.orders import OrderView
-from .views.partners import PartnerUpdate, PartnerState, PartnerOrders
+from .views.orders import OrderView, OrderDetailView, ArchivedOrderView, ArchivedOrderDetailView
+from .views.partners import (
+    PartnerUpdate, PartnerState, PartnerOrders, PartnerOrderDetail, PartnerOrdersBulkStatus,
+    PartnerAnalytics, PartnerArchivedOrders
+)
 from backend.api.views.admin_import import AdminImportView
 
 @api_view(['GET'])
@@ -35,6 +38,14 @@ urlpatterns = [
     path('partner/update/', PartnerUpdate.as_view(), name='partner-update'),
     path('partner/state/', PartnerState.as_view(), name='partner-state'),
     path('partner/orders/', PartnerOrders.as_view(), name='partner-orders'),
+    path('partner/orders/<int:order_id>/', PartnerOrderDetail.as_view(), name='partner-order-detail'),
+    path('partner/orders/bulk/', PartnerOrdersBulkStatus.as_view(), name='partner-orders-bulk'),
+    path(
+        'partner/orders/archive/',
+        PartnerArchivedOrders.as_view(),
+        name='partner-orders-archive',
+    ),
+    path('partner/analytics/', PartnerAnalytics.as_view(), name='partner-analytics'),
 
     # =======  Пользователи  ===============  
     path('user/register/', RegisterAccount.as_view(), name='user-register'),
@@ -42,6 +53,7 @@ urlpatterns = [
     path('user/details/', AccountDetails.as_view(), name='user-details'),
     path('user/contact/', ContactView.as_view(), name='user-contact'),
     path('user/login/', LoginAccount.as_view(), name='user-login'),
+    path('user/logout/', LogoutAccount.as_view(), name='user-logout'),
     path('user/password_reset/', reset_password_request_token, name='password-reset'),
     path('user/password_reset/confirm/', reset_password_confirm, name='password-reset-confirm'),
 
@@ -53,6 +65,13 @@ urlpatterns = [
     # =======  Заказы ==============  
     path('basket/', BasketView.as_view(), name='basket'),
     path('order/', OrderView.as_view(), name='order'),
+    path('order/<int:order_id>/', OrderDetailView.as_view(), name='order-detail'),
+    path('order/archive/', ArchivedOrderView.as_view(), name='order-archive'),
+    path(
+        'order/archive/<int:order_id>/',
+        ArchivedOrderDetailView.as_view(),
+        name='order-archive-detail',
+    ),
 
     # =======  Админка ==============  
     path('admin/import/', AdminImportView.as_view(), name='admin-import'),
@@ -1,4 +1,7 @@
 from backend.api.serializers.user import UserSerializer
+from backend.api.throttling import (
+    SlidingWindowAnonRateThrottle, SlidingWindowScopedRateThrottle, SlidingWindowUserRateThrottle
+)
 from backend.models import ConfirmEmailToken
 from backend.tasks.celery_tasks import send_confirmation_email_task
 from django.contrib.auth import authenticate
@@ -7,7 +10,6 @@ from drf_spectacular.utils import extend_schema
 from rest_framework import serializers, status
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.throttling import ScopedRateThrottle, UserRateThrottle, AnonRateThrottle
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -58,7 +60,9 @@ class RegisterAccount(APIView):
     """
 
     permission_classes = [AllowAny]
-    throttle_classes = [UserRateThrottle, AnonRateThrottle, ScopedRateThrottle]
+    throttle_classes = [
+        SlidingWindowUserRateThrottle, SlidingWindowAnonRateThrottle, SlidingWindowScopedRateThrottle
+    ]
     throttle_scope = 'account'
 
 
@@ -125,7 +129,9 @@ class ConfirmAccount(APIView):
     """
 
     permission_classes = [AllowAny]
-    throttle_classes = [UserRateThrottle, AnonRateThrottle]
+    throttle_classes = [
+        SlidingWindowUserRateThrottle, SlidingWindowAnonRateThrottle, SlidingWindowScopedRateThrottle
+    ]
     throttle_scope = 'account'
 
     @extend_schema(
@@ -172,7 +178,9 @@ class LoginAccount(APIView):
     """
 
     permission_classes = [AllowAny]
-    throttle_classes = [UserRateThrottle, AnonRateThrottle]
+    throttle_classes = [
+        SlidingWindowUserRateThrottle, SlidingWindowAnonRateThrottle, SlidingWindowScopedRateThrottle
+    ]
     throttle_scope = 'account'
 
     @extend_schema(
@@ -209,13 +217,32 @@ class LoginAccount(APIView):
         )
 
 
+class LogoutAccount(APIView):
+    """
+    Выход пользователя.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Выход пользователя",
+        description="Удаляет токен пользователя; для работы с API нужно авторизоваться заново",
+        request=None,
+        responses={200: {"Status": True}},
+        tags=["Пользователи"],
+    )
+    def post(self, request, *args, **kwargs):
+        Token.objects.filter(user=request.user).delete()
+        return Response({"Status": True}, status=200)
+
+
 class AccountDetails(APIView):
     """
     Управление данными аккаунта.
     """
 
     permission_classes = [IsAuthenticated]
-    throttle_classes = [UserRateThrottle]
+    throttle_classes = [SlidingWindowUserRateThrottle, SlidingWindowScopedRateThrottle]
     throttle_scope = 'account'
 
     @extend_schema(
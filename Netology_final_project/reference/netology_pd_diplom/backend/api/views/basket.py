@@ -6,11 +6,12 @@ from collections import defaultdict
 from django.db import IntegrityError
 
 from backend.api.serializers import OrderItemSerializer, OrderSerializer
+from backend.api.throttling import SlidingWindowScopedRateThrottle, SlidingWindowUserRateThrottle
 from backend.models import Order, OrderItem, ProductInfo
+from backend.services.inventory import StockHoldService
 from drf_spectacular.utils import extend_schema
 from django.db.models import F, Sum, Q
 from rest_framework import serializers
-from rest_framework.throttling import ScopedRateThrottle, UserRateThrottle
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -55,13 +56,38 @@ class ErrorResponseSerializer(serializers.Serializer):
     errors = serializers.CharField()
 
 
+def unavailable_products(basket, requested: dict) -> list:
+    """
+    Товары, которых не хватает с учетом резервов других корзин.
+    """
+    products = ProductInfo.objects.filter(id__in=requested.keys())
+    return [
+        product.id
+        for product in products
+        if not product.check_availability(requested[product.id], exclude_order_id=basket.id)
+    ]
+
+
+def stock_error_response(product_ids: list) -> Response:
+    """
+    Ответ о недостаточном остатке.
+    """
+    return Response(
+        {
+            "status": False,
+            "errors": f"Недостаточно товара на складе: {', '.join(map(str, product_ids))}",
+        },
+        status=400,
+    )
+
+
 class BasketView(APIView):
     """
     Управление корзиной покупок пользователя.
     """
 
     permission_classes = [IsAuthenticated]
-    throttle_classes = [UserRateThrottle, ScopedRateThrottle]
+    throttle_classes = [SlidingWindowUserRateThrottle, SlidingWindowScopedRateThrottle]
     throttle_scope = 'basket'
 
     @extend_schema(
@@ -76,10 +102,7 @@ class BasketView(APIView):
         """
         basket = (
             Order.objects.filter(user_id=request.user.id, state="basket")
-            .prefetch_related(
-                "ordered_items__product_info__product__category",
-                "ordered_items__product_info__product_parameters__parameter",
-            )
+            .with_items()
             .annotate(
                 total_sum=Sum(
                     F("ordered_items__quantity")
@@ -110,21 +133,34 @@ class BasketView(APIView):
             )
 
         basket, _ = Order.objects.get_or_create(user_id=request.user.id, state="basket")
-        objects_created = 0
+        requested = defaultdict(int)
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            product_id, quantity = item.get("product_info"), item.get("quantity")
+            if isinstance(product_id, int) and isinstance(quantity, int):
+                requested[product_id] += quantity
+        unavailable = unavailable_products(basket, requested)
+        if unavailable:
+            return stock_error_response(unavailable)
 
-        for order_item in items:
-            order_item["order"] = basket.id
-            serializer = OrderItemSerializer(data=order_item)
-            if serializer.is_valid():
-                try:
-                    serializer.save()
-                    objects_created += 1
-                except IntegrityError as error:
-                    return Response({"status": False, "errors": str(error)}, status=400)
-            else:
-                return Response(
-                    {"status": False, "errors": serializer.errors}, status=400
-                )
+        objects_created = 0
+        try:
+            for order_item in items:
+                order_item["order"] = basket.id
+                serializer = OrderItemSerializer(data=order_item)
+                if serializer.is_valid():
+                    try:
+                        serializer.save()
+                        objects_created += 1
+                    except IntegrityError as error:
+                        return Response({"status": False, "errors": str(error)}, status=400)
+                else:
+                    return Response(
+                        {"status": False, "errors": serializer.errors}, status=400
+                    )
+        finally:
+            StockHoldService.sync_basket(basket, requested.keys())
 
         product_ids = [item["product_info"] for item in items]
         products = ProductInfo.objects.select_related("shop").filter(id__in=product_ids)
@@ -172,6 +208,8 @@ class BasketView(APIView):
 
         basket, _ = Order.objects.get_or_create(user_id=request.user.id, state="basket")
         deleted_count = OrderItem.objects.filter(order=basket, product_info_id__in=items).delete()[0]
+        if deleted_count > 0:
+            StockHoldService.sync_basket(basket, items)
 
         if deleted_count > 0:
             return Response({"status": True, "deleted_objects": deleted_count})
@@ -201,14 +239,26 @@ class BasketView(APIView):
             )
 
         basket, _ = Order.objects.get_or_create(user_id=request.user.id, state="basket")
-        objects_updated = 0
+        updates = {
+            item.get("id"): item.get("quantity")
+            for item in items
+            if isinstance(item.get("id"), int) and isinstance(item.get("quantity"), int)
+        }
+        product_map = dict(
+            OrderItem.objects.filter(order=basket, id__in=updates.keys())
+            .values_list("id", "product_info_id")
+        )
+        unavailable = unavailable_products(
+            basket, {product_map[item_id]: updates[item_id] for item_id in product_map}
+        )
+        if unavailable:
+            return stock_error_response(unavailable)
 
-        for item in items:
-            item_id = item.get("id")
-            quantity = item.get("quantity")
-            if isinstance(item_id, int) and isinstance(quantity, int):
-                objects_updated += OrderItem.objects.filter(
-                    order=basket, id=item_id
-                ).update(quantity=quantity)
+        objects_updated = 0
+        for item_id, quantity in updates.items():
+            objects_updated += OrderItem.objects.filter(
+                order=basket, id=item_id
+            ).update(quantity=quantity)
 
+        StockHoldService.sync_basket(basket, product_map.values())
         return Response({"status": True, "updated_objects": objects_updated})
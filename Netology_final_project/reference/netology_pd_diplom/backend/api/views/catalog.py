@@ -83,6 +83,7 @@ class ProductInfoView(APIView):
 
         queryset = (
             ProductInfo.objects.filter(query)
+            .with_available()
             .select_related("shop", "product__category")
             .prefetch_related("product_parameters__parameter")
             .distinct()
@@ -2,17 +2,24 @@
 Views заказов
 """
 
-from backend.api.serializers import OrderSerializer
-from backend.models import Order
-from backend.services.emails import send_order_confirmation_email
-from backend.signals import new_order
-from django.db import IntegrityError
-from django.db.models import F, Sum
+from backend.api.filters import OrderListQuerySerializer, filter_orders
+from backend.api.pagination import KeysetPagination
+from backend.api.serializers import (
+    ArchivedOrderDetailSerializer,
+    ArchivedOrderSerializer,
+    ArchivedOrderSummarySerializer,
+    OrderSerializer,
+    OrderSummarySerializer,
+)
+from backend.api.idempotency import IDEMPOTENCY_HEADER, idempotent
+from backend.models import ArchivedOrder, Contact, Order, OrderState
+from backend.services.inventory import InventoryError
+from backend.services.orders import OrderConflictError, OrderService
 from rest_framework import serializers, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 
 
 class OrderListResponseSerializer(serializers.ModelSerializer):
@@ -47,65 +54,210 @@ class OrderView(APIView):
 
     @extend_schema(
         summary="Получение заказов пользователя",
-        description="Возвращает список всех заказов пользователя, кроме корзины",
+        description=(
+            "Возвращает заказы пользователя, кроме корзины, постранично (от новых к старым). "
+            "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+            "В режиме summary позиции заказов не загружаются."
+        ),
+        parameters=[OrderListQuerySerializer],
         responses=OrderListResponseSerializer(many=True),
         tags=["Заказы"]
     )
     def get(self, request):
-        new_order.send(sender=self.__class__, user_id=request.user.id)
-        orders = (
-            Order.objects.filter(user_id=request.user.id)
-            .exclude(state="basket")
-            .prefetch_related(
-                "ordered_items__product_info__product__category",
-                "ordered_items__product_info__product_parameters__parameter",
+        query = OrderListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {"status": False, "errors": query.errors},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .select_related("contact")
-            .annotate(
-                total_sum=Sum(
-                    F("ordered_items__quantity")
-                    * F("ordered_items__product_info__price")
-                )
-            )
-            .distinct()
-        )
+        params = query.validated_data
+
+        orders = filter_orders(
+            Order.objects.filter(user_id=request.user.id).exclude(state=OrderState.BASKET),
+            params,
+        ).with_totals()
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if params["summary"]:
+            serializer_class = OrderSummarySerializer
+        else:
+            serializer_class = OrderSerializer
+            orders = orders.with_items().select_related("contact")
+
+        page, next_cursor = KeysetPagination().paginate(
+            orders, params.get("cursor"), params.get("limit")
+        )
+        response = Response(serializer_class(page, many=True).data, status=status.HTTP_200_OK)
+        if next_cursor:
+            response["X-Next-Cursor"] = next_cursor
+        return response
 
     @extend_schema(
         summary="Оформление заказа",
-        description="Позволяет оформить заказ из корзины, указывая контакт",
+        description=(
+            "Позволяет оформить заказ из корзины, указывая контакт. "
+            f"Повтор запроса с тем же заголовком {IDEMPOTENCY_HEADER} возвращает "
+            "сохраненный ответ без повторного резервирования и уведомлений."
+        ),
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER, str, OpenApiParameter.HEADER, required=False,
+                description="Уникальный ключ попытки оформления",
+            )
+        ],
         request=OrderCreateRequestSerializer,
-        responses={200: OrderCreateResponseSerializer, 400: ErrorResponseSerializer},
+        responses={
+            200: OrderCreateResponseSerializer,
+            400: ErrorResponseSerializer,
+            409: ErrorResponseSerializer,
+            422: ErrorResponseSerializer,
+        },
         tags=["Заказы"]
     )
+    @idempotent
     def post(self, request):
-        if {"id", "contact"}.issubset(request.data):
-            order_id = request.data["id"]
-
-            if str(order_id).isdigit():
-                try:
-                    updated = Order.objects.filter(
-                        id=order_id, user_id=request.user.id, state="basket"
-                    ).update(contact_id=request.data["contact"], state="new")
-                except IntegrityError:
-                    return Response(
-                        {"status": False, "errors": "Неправильные аргументы"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                if updated:
-                    order = Order.objects.get(id=order_id)
-                    new_order.send(sender=self.__class__, user_id=request.user.id)
-                    send_order_confirmation_email(order)
-
-                    return Response(
-                        {"status": True, "message": "Заказ подтверждён"},
-                        status=status.HTTP_200_OK,
-                    )
+        request_data = OrderCreateRequestSerializer(data=request.data)
+        if not request_data.is_valid():
+            return Response(
+                {"status": False, "errors": "Не указаны все необходимые аргументы"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        order_id = request_data.validated_data["id"]
+        contact_id = request_data.validated_data["contact"]
+
+        if not Contact.objects.filter(id=contact_id, user_id=request.user.id).exists():
+            return Response(
+                {"status": False, "errors": "Неправильные аргументы"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        order = Order.objects.filter(
+            id=order_id, user_id=request.user.id, state=OrderState.BASKET
+        ).first()
+        if order is None:
+            return Response(
+                {"status": False, "errors": "Корзина не найдена"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            OrderService.change_status(
+                order,
+                OrderState.NEW,
+                changed_by=request.user.id,
+                comment="Оформление заказа",
+                fields={"contact_id": contact_id},
+            )
+        except InventoryError as error:
+            return Response(
+                {"status": False, "errors": f"Недостаточно товара на складе: {error}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except OrderConflictError as error:
+            return Response(
+                {"status": False, "errors": str(error)}, status=status.HTTP_409_CONFLICT
+            )
 
         return Response(
-            {"status": False, "errors": "Не указаны все необходимые аргументы"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
\ No newline at end of file
+            {"status": True, "message": "Заказ подтверждён"},
+            status=status.HTTP_200_OK,
+        )
+
+
+class OrderDetailView(APIView):
+    """
+    Просмотр одного заказа пользователя со всеми позициями.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Получение заказа",
+        description="Возвращает заказ пользователя с позициями, товарами и параметрами",
+        responses={200: OrderSerializer, 404: ErrorResponseSerializer},
+        tags=["Заказы"]
+    )
+    def get(self, request, order_id):
+        order = (
+            Order.objects.filter(id=order_id, user_id=request.user.id)
+            .exclude(state=OrderState.BASKET)
+            .with_totals()
+            .with_items()
+            .select_related("contact")
+            .first()
+        )
+        if order is None:
+            return Response(
+                {"status": False, "errors": "Заказ не найден"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
+
+
+class ArchivedOrderView(APIView):
+    """
+    Просмотр архивных заказов пользователя (только чтение).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Получение архивных заказов",
+        description=(
+            "Возвращает доставленные и отмененные заказы, перенесенные в архив, "
+            "постранично (от новых к старым). Курсор следующей страницы передается "
+            "в заголовке X-Next-Cursor."
+        ),
+        parameters=[OrderListQuerySerializer],
+        responses=ArchivedOrderSerializer(many=True),
+        tags=["Заказы"]
+    )
+    def get(self, request):
+        query = OrderListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {"status": False, "errors": query.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        params = query.validated_data
+
+        orders = filter_orders(ArchivedOrder.objects.filter(user_id=request.user.id), params)
+        if params["summary"]:
+            serializer_class = ArchivedOrderSummarySerializer
+        else:
+            serializer_class = ArchivedOrderSerializer
+            orders = orders.prefetch_related("items")
+
+        page, next_cursor = KeysetPagination().paginate(
+            orders, params.get("cursor"), params.get("limit")
+        )
+        response = Response(serializer_class(page, many=True).data, status=status.HTTP_200_OK)
+        if next_cursor:
+            response["X-Next-Cursor"] = next_cursor
+        return response
+
+
+class ArchivedOrderDetailView(APIView):
+    """
+    Просмотр одного архивного заказа пользователя.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Получение архивного заказа",
+        description="Возвращает архивный заказ с позициями и историей статусов",
+        responses={200: ArchivedOrderDetailSerializer, 404: ErrorResponseSerializer},
+        tags=["Заказы"]
+    )
+    def get(self, request, order_id):
+        order = (
+            ArchivedOrder.objects.filter(id=order_id, user_id=request.user.id)
+            .prefetch_related("items", "status_history")
+            .first()
+        )
+        if order is None:
+            return Response(
+                {"status": False, "errors": "Заказ не найден"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(ArchivedOrderDetailSerializer(order).data, status=status.HTTP_200_OK)
@@ -2,15 +2,25 @@
 Views по партнерам.
 """
 import yaml
-from backend.api.serializers import OrderSerializer, ShopSerializer
+from backend.api.filters import (
+    OrderListQuerySerializer, SalesAnalyticsQuerySerializer, filter_orders
+)
+from backend.api.pagination import KeysetPagination
+from backend.api.serializers import (
+    OrderSerializer, OrderSummarySerializer, PartnerArchivedOrderSerializer,
+    PartnerArchivedOrderSummarySerializer, ShopSerializer
+)
 from backend.api.serializers.partners import PartnerUpdateSerializer
 from backend.models import (
-    Category, Order, OrderStatusHistory, Parameter, Product, ProductInfo, ProductParameter, Shop
+    ArchivedOrder, ArchivedOrderItem, Category, Order, Parameter, Product, ProductInfo,
+    ProductParameter, Shop, ShopOrder
 )
+from backend.services.analytics import SalesRollupService
+from backend.services.orders import OrderConflictError, OrderService, OrderTransitionError
 from backend.utils import strtobool
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
-from django.db.models import F, Sum
+from django.db.models import F, Prefetch, Q, Sum
 from requests import get
 from rest_framework import status, serializers
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
@@ -35,10 +45,12 @@ class PartnerStateResponseSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
     is_accepting_orders = serializers.BooleanField()
+    order_digest = serializers.BooleanField()
 
 
 class PartnerStateUpdateRequestSerializer(serializers.Serializer):
-    state = serializers.CharField()
+    state = serializers.CharField(required=False)
+    digest = serializers.CharField(required=False)
 
 
 class PartnerOrdersResponseSerializer(serializers.Serializer):
@@ -56,6 +68,55 @@ class PartnerOrderStatusUpdateResponseSerializer(serializers.Serializer):
     errors = serializers.CharField(required=False)
 
 
+class PartnerOrderBulkStatusRequestSerializer(serializers.Serializer):
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=500
+    )
+    status = serializers.ChoiceField(choices=["confirmed", "assembled", "sent", "delivered"])
+    comment = serializers.CharField(required=False, allow_blank=True, max_length=255)
+
+
+class PartnerOrderBulkResultSerializer(serializers.Serializer):
+    order_id = serializers.IntegerField()
+    status = serializers.BooleanField()
+    state = serializers.CharField(required=False)
+    errors = serializers.CharField(required=False)
+
+
+class PartnerOrderBulkStatusResponseSerializer(serializers.Serializer):
+    status = serializers.BooleanField()
+    updated = serializers.IntegerField()
+    results = PartnerOrderBulkResultSerializer(many=True)
+
+
+class PartnerSalesTotalsSerializer(serializers.Serializer):
+    orders = serializers.IntegerField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class PartnerAnalyticsResponseSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    group_by = serializers.CharField()
+    totals = PartnerSalesTotalsSerializer()
+    rows = serializers.ListField(child=serializers.DictField())
+
+
+def get_shop_id(user_id):
+    """
+    Возвращает id магазина пользователя или None.
+    """
+    return Shop.objects.filter(user_id=user_id).values_list("id", flat=True).first()
+
+
+def with_order_details(orders):
+    """
+    Догружает позиции заказов с товарами и параметрами.
+    """
+    return orders.with_items().select_related("contact")
+
+
 class PartnerUpdate(APIView):
     """
     Обновление информации о партнёрах (прайс-лист).
@@ -176,7 +237,10 @@ class PartnerState(APIView):
 
     @extend_schema(
         summary="Обновление состояния партнёра",
-        description="Обновляет статус магазина (принимает заказы или нет)",
+        description=(
+            "Обновляет статус магазина (принимает заказы или нет) и подписку "
+            "на ежечасную сводку заказов (digest)"
+        ),
         request=PartnerStateUpdateRequestSerializer,
         responses={200: PartnerUpdateResponseSerializer, 400: PartnerUpdateResponseSerializer},
         tags=["Партнёры"]
@@ -185,9 +249,15 @@ class PartnerState(APIView):
         if request.user.type != "shop":
             return Response({"status": False, "errors": "Только для магазинов"}, status=403)
         state = request.data.get("state")
-        if state:
+        digest = request.data.get("digest")
+        if state or digest is not None:
             try:
-                Shop.objects.filter(user_id=request.user.id).update(is_accepting_orders=strtobool(state))
+                updates = {}
+                if state:
+                    updates["is_accepting_orders"] = strtobool(state)
+                if digest is not None:
+                    updates["order_digest"] = strtobool(digest)
+                Shop.objects.filter(user_id=request.user.id).update(**updates)
                 return Response({"status": True, "message": "Статус магазина успешно изменен"}, status=200)
             except ValueError as error:
                 return Response({"status": False, "errors": str(error)}, status=400)
@@ -203,32 +273,57 @@ class PartnerOrders(APIView):
 
     @extend_schema(
         summary="Получение заказов магазина",
-        description="Возвращает список заказов, связанных с магазином",
+        description=(
+            "Возвращает заказы, связанные с магазином, постранично (от новых к старым). "
+            "Курсор следующей страницы передается в заголовке X-Next-Cursor. "
+            "В режиме summary позиции заказов не загружаются."
+        ),
+        parameters=[OrderListQuerySerializer],
         responses={200: OrderSerializer(many=True), 403: PartnerUpdateResponseSerializer},
         tags=["Партнёры"]
     )
     def get(self, request, *args, **kwargs):
         if request.user.type != "shop":
             return Response({"status": False, "errors": "Только для магазинов"}, status=403)
-        orders = (
-            Order.objects.filter(ordered_items__product_info__shop__user_id=request.user.id)
-            .exclude(state="basket")
-            .prefetch_related(
-                "ordered_items__product_info__product__category",
-                "ordered_items__product_info__product_parameters__parameter",
-            )
-            .select_related("contact")
-            .annotate(total_sum=Sum(F("ordered_items__quantity") * F("ordered_items__product_info__price")))
-            .distinct()
+        query = OrderListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"status": False, "errors": query.errors}, status=400)
+        params = query.validated_data
+
+        shop_id = get_shop_id(request.user.id)
+        if shop_id is None:
+            return Response([], status=200)
+
+        index = filter_orders(ShopOrder.objects.filter(shop_id=shop_id), params)
+        rows, next_cursor = KeysetPagination(id_field="order_id").paginate(
+            index.only("order_id", "dt"), params.get("cursor"), params.get("limit")
         )
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data, status=200)
+        order_ids = [row.order_id for row in rows]
+
+        orders = Order.objects.filter(id__in=order_ids).with_totals(shop_id=shop_id)
+        if params["summary"]:
+            serializer_class = OrderSummarySerializer
+        else:
+            serializer_class = OrderSerializer
+            orders = with_order_details(orders)
+        orders_map = {order.id: order for order in orders}
+        page = [orders_map[order_id] for order_id in order_ids if order_id in orders_map]
+
+        response = Response(serializer_class(page, many=True).data, status=200)
+        if next_cursor:
+            response["X-Next-Cursor"] = next_cursor
+        return response
 
     @extend_schema(
         summary="Обновление статуса заказа",
         description="Позволяет магазину изменить статус заказа",
         request=PartnerOrderStatusUpdateRequestSerializer,
-        responses={200: PartnerOrderStatusUpdateResponseSerializer, 400: PartnerOrderStatusUpdateResponseSerializer},
+        responses={
+            200: PartnerOrderStatusUpdateResponseSerializer,
+            400: PartnerOrderStatusUpdateResponseSerializer,
+            404: PartnerOrderStatusUpdateResponseSerializer,
+            409: PartnerOrderStatusUpdateResponseSerializer,
+        },
         tags=["Партнёры"]
     )
     def post(self, request, *args, **kwargs):
@@ -240,22 +335,207 @@ class PartnerOrders(APIView):
             allowed_statuses = ["confirmed", "assembled", "sent", "delivered"]
             if new_status not in allowed_statuses:
                 return Response({"status": False, "errors": f'Недопустимый статус. Разрешены: {", ".join(allowed_statuses)}'}, status=400)
+            shop_id = get_shop_id(request.user.id)
+            order = None
+            if shop_id is not None and str(order_id).isdigit():
+                order = Order.objects.filter(id=order_id, shop_orders__shop_id=shop_id).first()
+            if not order:
+                return Response({"status": False, "errors": "Заказ не найден"}, status=404)
             try:
-                order = Order.objects.filter(id=order_id, ordered_items__product_info__shop__user_id=request.user.id).first()
-                if not order:
-                    return Response({"status": False, "errors": "Заказ не найден"}, status=404)
-                old_status = order.state
-                order.state = new_status
-                order.save()
-                OrderStatusHistory.objects.create(
-                    order=order,
-                    old_status=old_status,
-                    new_status=new_status,
-                    changed_by=request.user,
+                OrderService.change_status(
+                    order,
+                    new_status,
+                    changed_by=request.user.id,
                     comment=f"Статус изменен магазином {request.user.email}",
                 )
-                status_names = {"confirmed": "Подтвержден", "assembled": "Собран", "sent": "Отправлен", "delivered": "Доставлен"}
-                return Response({"status": True, "message": f'Статус заказа #{order_id} изменен на "{status_names.get(new_status, new_status)}"'}, status=200)
-            except Exception as e:
-                return Response({"status": False, "errors": f"Ошибка: {str(e)}"}, status=400)
-        return Response({"status": False, "errors": "Не указаны все необходимые аргументы (order_id, status)"}, status=400)
\ No newline at end of file
+            except OrderConflictError as error:
+                return Response({"status": False, "errors": str(error)}, status=409)
+            except OrderTransitionError as error:
+                return Response({"status": False, "errors": str(error)}, status=400)
+            status_names = {"confirmed": "Подтвержден", "assembled": "Собран", "sent": "Отправлен", "delivered": "Доставлен"}
+            return Response({"status": True, "message": f'Статус заказа #{order_id} изменен на "{status_names.get(new_status, new_status)}"'}, status=200)
+        return Response({"status": False, "errors": "Не указаны все необходимые аргументы (order_id, status)"}, status=400)
+
+
+class PartnerOrderDetail(APIView):
+    """
+    Просмотр одного заказа магазина со всеми позициями.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Получение заказа магазина",
+        description="Возвращает заказ, содержащий товары магазина, с позициями и параметрами",
+        responses={200: OrderSerializer, 403: PartnerUpdateResponseSerializer, 404: PartnerUpdateResponseSerializer},
+        tags=["Партнёры"]
+    )
+    def get(self, request, order_id, *args, **kwargs):
+        if request.user.type != "shop":
+            return Response({"status": False, "errors": "Только для магазинов"}, status=403)
+        shop_id = get_shop_id(request.user.id)
+        order = None
+        if shop_id is not None:
+            order = with_order_details(
+                Order.objects.filter(id=order_id, shop_orders__shop_id=shop_id)
+                .with_totals(shop_id=shop_id)
+            ).first()
+        if order is None:
+            return Response({"status": False, "errors": "Заказ не найден"}, status=404)
+        return Response(OrderSerializer(order).data, status=200)
+
+
+class PartnerArchivedOrders(APIView):
+    """
+    Просмотр архивных заказов магазина (только чтение).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Получение архивных заказов магазина",
+        description=(
+            "Возвращает перенесенные в архив заказы с товарами магазина постранично "
+            "(от новых к старым). Позиции, сумма и количество — только по товарам "
+            "магазина. Курсор следующей страницы передается в заголовке X-Next-Cursor."
+        ),
+        parameters=[OrderListQuerySerializer],
+        responses={
+            200: PartnerArchivedOrderSerializer(many=True),
+            403: PartnerUpdateResponseSerializer,
+        },
+        tags=["Партнёры"]
+    )
+    def get(self, request, *args, **kwargs):
+        if request.user.type != "shop":
+            return Response({"status": False, "errors": "Только для магазинов"}, status=403)
+        query = OrderListQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"status": False, "errors": query.errors}, status=400)
+        params = query.validated_data
+
+        shop_id = get_shop_id(request.user.id)
+        if shop_id is None:
+            return Response([], status=200)
+
+        shop_items = Q(items__shop_id=shop_id)
+        orders = filter_orders(
+            ArchivedOrder.objects.filter(
+                id__in=ArchivedOrderItem.objects.filter(shop_id=shop_id).values("order_id")
+            ),
+            params,
+        ).annotate(
+            shop_total_sum=Sum(F("items__price") * F("items__quantity"), filter=shop_items),
+            shop_items_count=Sum("items__quantity", filter=shop_items),
+        )
+        if params["summary"]:
+            serializer_class = PartnerArchivedOrderSummarySerializer
+        else:
+            serializer_class = PartnerArchivedOrderSerializer
+            orders = orders.prefetch_related(
+                Prefetch("items", queryset=ArchivedOrderItem.objects.filter(shop_id=shop_id))
+            )
+
+        page, next_cursor = KeysetPagination().paginate(
+            orders, params.get("cursor"), params.get("limit")
+        )
+        response = Response(serializer_class(page, many=True).data, status=200)
+        if next_cursor:
+            response["X-Next-Cursor"] = next_cursor
+        return response
+
+
+class PartnerOrdersBulkStatus(APIView):
+    """
+    Массовая смена статуса заказов магазина.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Массовое обновление статуса заказов",
+        description=(
+            "Переводит до 500 заказов магазина в указанный статус одной транзакцией. "
+            "Возвращает результат по каждому заказу; уведомления покупателям "
+            "отправляются одной фоновой задачей."
+        ),
+        request=PartnerOrderBulkStatusRequestSerializer,
+        responses={
+            200: PartnerOrderBulkStatusResponseSerializer,
+            400: PartnerOrderStatusUpdateResponseSerializer,
+            403: PartnerOrderStatusUpdateResponseSerializer,
+        },
+        tags=["Партнёры"]
+    )
+    def post(self, request, *args, **kwargs):
+        if request.user.type != "shop":
+            return Response({"status": False, "errors": "Только для магазинов"}, status=403)
+        serializer = PartnerOrderBulkStatusRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"status": False, "errors": serializer.errors}, status=400)
+        data = serializer.validated_data
+
+        shop_id = get_shop_id(request.user.id)
+        if shop_id is None:
+            return Response({"status": False, "errors": "Магазин не найден"}, status=404)
+
+        results = OrderService.bulk_change_status(
+            data["order_ids"],
+            data["status"],
+            shop_id=shop_id,
+            changed_by=request.user.id,
+            comment=data.get("comment") or f"Статус изменен магазином {request.user.email}",
+        )
+        updated = sum(1 for result in results if result["status"])
+        return Response({"status": True, "updated": updated, "results": results}, status=200)
+
+
+class PartnerAnalytics(APIView):
+    """
+    Аналитика продаж магазина по дневным агрегатам.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Аналитика продаж магазина",
+        description=(
+            "Выручка, количество товаров и заказов за период (до 366 дней) по дням, "
+            "статусам или товарам. Отчет строится по дневным агрегатам, которые "
+            "обновляются при каждой смене статуса заказа; день — дата оформления заказа."
+        ),
+        parameters=[SalesAnalyticsQuerySerializer],
+        responses={
+            200: PartnerAnalyticsResponseSerializer,
+            400: PartnerUpdateResponseSerializer,
+            403: PartnerUpdateResponseSerializer,
+        },
+        tags=["Партнёры"]
+    )
+    def get(self, request, *args, **kwargs):
+        if request.user.type != "shop":
+            return Response({"status": False, "errors": "Только для магазинов"}, status=403)
+        query = SalesAnalyticsQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"status": False, "errors": query.errors}, status=400)
+        params = query.validated_data
+
+        shop_id = get_shop_id(request.user.id)
+        if shop_id is None:
+            return Response({"status": False, "errors": "Магазин не найден"}, status=404)
+
+        report = SalesRollupService.report(
+            shop_id,
+            params["date_from"],
+            params["date_to"],
+            group_by=params["group_by"],
+            states=params.get("state"),
+            limit=params["limit"],
+        )
+        data = {
+            "date_from": params["date_from"],
+            "date_to": params["date_to"],
+            "group_by": params["group_by"],
+            **report,
+        }
+        return Response(PartnerAnalyticsResponseSerializer(data).data, status=200)
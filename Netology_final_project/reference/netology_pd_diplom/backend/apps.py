@@ -12,7 +12,13 @@ class BackendConfig(AppConfig):
 
     def ready(self):
         """
-        импортируем сигналы.
+        импортируем сигналы и системные проверки, подключаем метрики сериализаторов
+        и задач Celery.
 
         """
+        import backend.checks
         import backend.signals
+        import backend.task_metrics
+        from backend.metrics import instrument_serializers
+
+        instrument_serializers()
@@ -0,0 +1,80 @@
+"""
+Нагрузочные сценарии для команды ``benchmark``.
+"""
+
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def isolated_database(keepdb: bool = False):
+    """
+    Временная тестовая БД, чтобы сценарий не трогал рабочие данные.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+@contextmanager
+def muted_notifications():
+    """
+    Отключает уведомления о заказах (события outbox) на время замера.
+    """
+    from backend.signals import (
+        order_status_changed, order_status_changed_handler,
+        order_statuses_changed, order_statuses_changed_handler,
+    )
+
+    order_status_changed.disconnect(order_status_changed_handler)
+    order_statuses_changed.disconnect(order_statuses_changed_handler)
+    try:
+        yield
+    finally:
+        order_status_changed.connect(order_status_changed_handler)
+        order_statuses_changed.connect(order_statuses_changed_handler)
+
+
+class QueryCounter:
+    """
+    Счетчик SQL-запросов без ограничения журнала ``connection.queries``.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    """
+    Считает запросы к БД внутри блока.
+    """
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+def db_error_kind(error: Exception) -> str:
+    """
+    Классификация ошибки БД для сводки замера.
+
+    PostgreSQL сообщает о взаимной блокировке кодом SQLSTATE 40P01;
+    SQLite при конкурентной записи отвечает «database is locked».
+    """
+    cause = getattr(error, "__cause__", None)
+    message = str(error).lower()
+    if getattr(cause, "pgcode", None) == "40P01" or "deadlock" in message:
+        return "deadlocks"
+    if "locked" in message:
+        return "lock_errors"
+    return "errors"
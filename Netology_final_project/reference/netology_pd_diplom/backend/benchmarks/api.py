@@ -0,0 +1,330 @@
+"""
+Сценарии нагрузки на основные эндпоинты API.
+"""
+
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from backend.benchmarks import count_queries
+from backend.benchmarks.connections import LOCAL_CACHE, percentile
+from backend.models import Contact, OrderItem, OrderState, ProductInfo, Shop
+from backend.models.users import User
+from backend.services.synthetic import SyntheticDataGenerator, zipf_rank
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+API = "/api/v1"
+
+
+@contextmanager
+def unthrottled():
+    """
+    Поднимает лимиты запросов, чтобы замер не упирался в 429.
+
+    Проверки лимитов и обращения к кэшу выполняются как обычно.
+    """
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    SimpleRateThrottle.THROTTLE_RATES = defaultdict(lambda: "1000000/second")
+    try:
+        yield
+    finally:
+        SimpleRateThrottle.THROTTLE_RATES = rates
+
+
+class Context:
+    """
+    Данные сценариев: клиенты покупателей и магазинов, предложения и фид прайс-листа.
+    """
+
+    def __init__(self, options: dict):
+        self.rng = random.Random(options["seed"])
+        self.skew = options["skew"]
+        generator = SyntheticDataGenerator(
+            shops=options["shops"],
+            categories=options["categories"],
+            products=options["products"],
+            offers=options["offers"],
+            users=options["users"],
+            orders=options["orders"],
+            skew=options["skew"],
+            seed=options["seed"],
+        )
+        self.counts = generator.run()
+        self.category_ids = generator.category_ids
+        self.shop_ids = generator.shop_ids
+        self.offer_start, self.offer_end = generator.offer_start, generator.offer_end
+        # Остатки пополняются, чтобы корзины и оформление не упирались в склад
+        ProductInfo.objects.update(quantity=10 ** 6)
+
+        buyers = generator.user_ids[:options["buyers"]]
+        OrderItem.objects.filter(order__user_id__in=buyers, order__state=OrderState.BASKET).delete()
+        self.buyers = [self.client(user_id) for user_id in buyers]
+        self.contacts = dict(
+            Contact.objects.filter(user_id__in=buyers)
+            .order_by("-id").values_list("user_id", "id")
+        )
+
+        partner = User.objects.create_user(
+            email=f"partner{self.shop_ids[0]}@example.com", password="benchmark",
+            is_active=True, type="shop",
+        )
+        Shop.objects.filter(id=self.shop_ids[0]).update(user=partner)
+        self.partner = self.client(partner.id)
+
+        # Прайс-лист импортируется отдельным магазином, чтобы не удалять
+        # предложения, которые используют остальные сценарии
+        importer = User.objects.create_user(
+            email=f"importer{self.shop_ids[0]}@example.com", password="benchmark",
+            is_active=True, type="shop",
+        )
+        self.importer = self.client(importer.id)
+        with tempfile.TemporaryDirectory() as directory:
+            SyntheticDataGenerator(
+                shops=1, categories=options["categories"], products=options["products"],
+                offers=options["import_offers"], skew=options["skew"], seed=options["seed"],
+                yaml_dir=directory, yaml_only=True,
+            ).run()
+            with open(os.path.join(directory, "shop1.yaml"), "rb") as feed:
+                self.price_list = feed.read()
+
+    @staticmethod
+    def client(user_id: int) -> APIClient:
+        """
+        Клиент API с токеном пользователя.
+        """
+        token, _ = Token.objects.get_or_create(user_id=user_id)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        client.user_id = user_id
+        return client
+
+    def offers(self, count: int) -> list:
+        """
+        Разные предложения, выбранные по популярности.
+        """
+        total = self.offer_end - self.offer_start
+        return list({
+            self.offer_start + zipf_rank(self.rng, total, self.skew) - 1 for _ in range(count)
+        })
+
+    def category(self) -> int:
+        """
+        Категория, выбранная по популярности.
+        """
+        return self.category_ids[zipf_rank(self.rng, len(self.category_ids), self.skew) - 1]
+
+
+def catalog(context: Context):
+    """
+    Просмотр каталога анонимным покупателем.
+    """
+    client = APIClient()
+    yield "categories", client.get(f"{API}/categories/")
+    yield "shops", client.get(f"{API}/shops/")
+    category = context.category()
+    yield "products?category", client.get(f"{API}/products/", {"category_id": category})
+    shop = context.shop_ids[zipf_rank(context.rng, len(context.shop_ids), context.skew) - 1]
+    yield "products?category&shop", client.get(
+        f"{API}/products/", {"category_id": category, "shop_id": shop}
+    )
+
+
+def basket(context: Context):
+    """
+    Добавление, просмотр, изменение и очистка корзины.
+    """
+    client = context.rng.choice(context.buyers)
+    offers = context.offers(context.rng.randint(1, 3))
+    yield "basket add", client.post(
+        f"{API}/basket/",
+        {"items": [{"product_info": offer, "quantity": 1} for offer in offers]},
+        format="json",
+    )
+    response = client.get(f"{API}/basket/")
+    yield "basket get", response
+    items = response.json()[0]["ordered_items"] if response.status_code == 200 else []
+    yield "basket update", client.put(
+        f"{API}/basket/",
+        {"items": [{"id": item["id"], "quantity": 2} for item in items]},
+        format="json",
+    )
+    yield "basket delete", client.delete(
+        f"{API}/basket/",
+        {"items": [item["product_info"]["id"] for item in items]},
+        format="json",
+    )
+
+
+def checkout(context: Context):
+    """
+    Наполнение корзины и оформление заказа.
+    """
+    client = context.rng.choice(context.buyers)
+    offers = context.offers(context.rng.randint(1, 3))
+    yield "basket add", client.post(
+        f"{API}/basket/",
+        {"items": [{"product_info": offer, "quantity": 1} for offer in offers]},
+        format="json",
+    )
+    response = client.get(f"{API}/basket/")
+    yield "basket get", response
+    yield "order create", client.post(
+        f"{API}/order/",
+        {"id": response.json()[0]["id"], "contact": context.contacts[client.user_id]},
+        format="json",
+    )
+
+
+def partner_orders(context: Context):
+    """
+    Просмотр заказов крупнейшего магазина.
+    """
+    client = context.partner
+    response = client.get(f"{API}/partner/orders/", {"limit": 20})
+    yield "partner orders", response
+    yield "partner orders summary", client.get(
+        f"{API}/partner/orders/", {"limit": 100, "summary": "true"}
+    )
+    orders = response.json() if response.status_code == 200 else []
+    if orders:
+        order_id = context.rng.choice(orders)["id"]
+        yield "partner order detail", client.get(f"{API}/partner/orders/{order_id}/")
+
+
+def price_import(context: Context):
+    """
+    Загрузка прайс-листа магазина файлом.
+    """
+    feed = SimpleUploadedFile("shop.yaml", context.price_list)
+    yield "partner update", context.importer.post(
+        f"{API}/partner/update/", {"file": feed}, format="multipart"
+    )
+
+
+SCENARIOS = {
+    "catalog": catalog,
+    "basket": basket,
+    "checkout": checkout,
+    "partner": partner_orders,
+    "import": price_import,
+}
+
+
+def summarize(timings: list, queries: list, errors: int, elapsed: float = None) -> dict:
+    """
+    Перцентили задержки, запросы к БД на запрос и, если задано время
+    прогона ``elapsed``, пропускная способность.
+    """
+    summary = {"requests": len(timings), "errors": errors}
+    if elapsed:
+        summary["rps"] = round(len(timings) / elapsed, 1)
+    return {
+        **summary,
+        "p50_ms": percentile(timings, 0.5),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+        "queries_per_request": round(sum(queries) / len(queries), 1),
+    }
+
+
+def measure(scenario: str, context: Context, iterations: int) -> dict:
+    """
+    Прогоняет ``iterations`` итераций сценария, первая итерация — прогрев.
+
+    Задержка и число SQL-запросов замеряются на каждый HTTP-запрос;
+    ответ с кодом 400 и выше считается ошибкой.
+    """
+    steps = defaultdict(lambda: {"timings": [], "queries": [], "errors": 0})
+    total = {"timings": [], "queries": [], "errors": 0}
+    started = time.perf_counter()
+    for iteration in range(iterations + 1):
+        requests = SCENARIOS[scenario](context)
+        while True:
+            with count_queries() as counter:
+                request_started = time.perf_counter()
+                try:
+                    name, response = next(requests)
+                except StopIteration:
+                    break
+                elapsed = time.perf_counter() - request_started
+            if iteration == 0:
+                continue
+            for bucket in (steps[name], total):
+                bucket["timings"].append(elapsed)
+                bucket["queries"].append(counter.count)
+                bucket["errors"] += response.status_code >= 400
+        if iteration == 0:
+            started = time.perf_counter()
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(total["timings"], total["queries"], total["errors"], elapsed),
+        "steps": {
+            name: summarize(data["timings"], data["queries"], data["errors"])
+            for name, data in steps.items()
+        },
+    }
+
+
+def git_commit() -> str:
+    """
+    Текущий коммит репозитория или пустая строка вне git.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(scenarios: list, iterations: int = 200, **options) -> dict:
+    """
+    Готовит синтетические данные и прогоняет сценарии по очереди.
+
+    Клиент — тестовый клиент Django в том же процессе, поэтому в замер
+    входит весь стек middleware, аутентификации и сериализации без сети.
+    Лимиты запросов считаются в кэше в памяти процесса.
+    """
+    with override_settings(CACHES=LOCAL_CACHE), unthrottled():
+        context = Context(options)
+        results = {scenario: measure(scenario, context, iterations) for scenario in scenarios}
+    return {
+        "commit": git_commit(),
+        "database": connection.vendor,
+        "created_at": timezone.now().isoformat(),
+        "iterations": iterations,
+        "options": options,
+        "data": context.counts,
+        "scenarios": results,
+    }
+
+
+def compare(result: dict, baseline_path: str) -> dict:
+    """
+    Изменение p50/p95/p99 и запросов к БД относительно сохраненного прогона.
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    deltas = {}
+    for scenario, current in result["scenarios"].items():
+        previous = baseline["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        deltas[scenario] = {
+            key: round(current[key] - previous[key], 2)
+            for key in ("p50_ms", "p95_ms", "p99_ms", "rps", "queries_per_request")
+        }
+    return {"baseline": baseline.get("commit", ""), "scenarios": deltas}
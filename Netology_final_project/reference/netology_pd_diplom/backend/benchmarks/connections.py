@@ -0,0 +1,76 @@
+"""
+Сценарий задержки запросов при соединении с БД на запрос и постоянном соединении.
+"""
+
+import statistics
+import time
+
+from backend.models import Category
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def percentile(timings: list, share: float) -> float:
+    """
+    Перцентиль выборки в миллисекундах.
+    """
+    ordered = sorted(timings)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * share))] * 1000, 2)
+
+
+def measure(mode: str, requests: int, per_request: bool, path: str) -> dict:
+    """
+    Задержка ``requests`` GET-запросов к ``path``.
+
+    В режиме соединения на запрос соединение закрывается после каждого
+    ответа, как при CONN_MAX_AGE=0; время закрытия входит в замер.
+    """
+    client = Client()
+    opened = []
+
+    def on_connect(sender, **kwargs):
+        opened.append(kwargs["connection"].alias)
+
+    connection_created.connect(on_connect)
+    timings = []
+    try:
+        for _ in range(requests):
+            # Лимиты запросов сбрасываются вне замера
+            cache.clear()
+            started = time.perf_counter()
+            client.get(path)
+            if per_request:
+                connection.close()
+            timings.append(time.perf_counter() - started)
+    finally:
+        connection_created.disconnect(on_connect)
+    return {
+        "mode": mode,
+        "requests": requests,
+        "connections": len(opened),
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "p50_ms": percentile(timings, 0.5),
+        "p95_ms": percentile(timings, 0.95),
+    }
+
+
+def run(requests: int = 1000, path: str = "/api/v1/categories/") -> list:
+    """
+    Сравнивает задержку при соединении на запрос и при постоянном соединении.
+
+    Лимиты запросов считаются в отдельном кэше в памяти процесса, чтобы
+    замер не трогал общий кэш. Имеет смысл на PostgreSQL: тестовая SQLite
+    в памяти не закрывает соединение.
+    """
+    Category.objects.bulk_create(
+        [Category(name=f"Категория {number}") for number in range(20)]
+    )
+    with override_settings(CACHES=LOCAL_CACHE):
+        return [
+            measure("соединение на запрос", requests, True, path),
+            measure("постоянное соединение", requests, False, path),
+        ]
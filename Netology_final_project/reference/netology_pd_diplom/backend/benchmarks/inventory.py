@@ -0,0 +1,115 @@
+"""
+Сценарий конкурентного оформления заказов на «горячие» товары.
+"""
+
+import queue
+import random
+import threading
+import time
+import uuid
+
+from backend.models import Order, OrderItem, OrderState, Product, ProductInfo, Shop
+from backend.models.users import User
+from backend.services.inventory import InventoryError, StockShardService
+from backend.services.orders import OrderService
+from django.db import DatabaseError, connection
+
+from . import db_error_kind
+
+
+def prepare(checkouts: int, hot_skus: int, items_per_order: int, seed=None, shards=0) -> list:
+    """
+    Создает товары и корзины; возвращает id корзин для оформления.
+    """
+    rnd = random.Random(seed)
+    run_id = uuid.uuid4().hex[:8]
+    user = User.objects.create_user(
+        email=f"benchmark-{run_id}@example.com", password="benchmark", is_active=True
+    )
+    shop = Shop.objects.create(name=f"Benchmark {run_id}")
+    product = Product.objects.create(name="Benchmark product")
+    skus = ProductInfo.objects.bulk_create(
+        [
+            ProductInfo(
+                product=product,
+                shop=shop,
+                external_id=number,
+                price=100,
+                price_rrc=100,
+                quantity=checkouts * items_per_order * 2,
+                stock_shards=shards,
+            )
+            for number in range(hot_skus)
+        ]
+    )
+    sku_ids = [sku.id for sku in skus]
+    for sku_id in sku_ids if shards else []:
+        StockShardService.consolidate(sku_id)
+
+    orders = Order.objects.bulk_create(
+        [Order(user=user, state=OrderState.BASKET) for _ in range(checkouts)]
+    )
+    items = []
+    for order in orders:
+        # Случайный порядок позиций провоцирует встречные блокировки
+        for sku_id in rnd.sample(sku_ids, min(items_per_order, len(sku_ids))):
+            items.append(
+                OrderItem(order_id=order.id, product_info_id=sku_id, quantity=rnd.randint(1, 2))
+            )
+    OrderItem.objects.bulk_create(items)
+    return [order.id for order in orders]
+
+
+def run(checkouts=200, workers=8, hot_skus=5, items_per_order=3, seed=None, shards=0) -> dict:
+    """
+    Оформляет корзины параллельно и возвращает сводку замера.
+
+    При ``shards > 0`` остаток горячих товаров раскладывается по шардам.
+    """
+    order_ids = prepare(checkouts, hot_skus, items_per_order, seed, shards)
+    tasks = queue.Queue()
+    for order_id in order_ids:
+        tasks.put(order_id)
+
+    stats = {"completed": 0, "out_of_stock": 0, "deadlocks": 0, "lock_errors": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def count(key):
+        with lock:
+            stats[key] += 1
+
+    def worker():
+        try:
+            while True:
+                try:
+                    order_id = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    order = Order.objects.get(id=order_id)
+                    OrderService.change_status(order, OrderState.NEW)
+                    count("completed")
+                except InventoryError:
+                    count("out_of_stock")
+                except DatabaseError as error:
+                    count(db_error_kind(error))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats.update(
+        checkouts=checkouts,
+        workers=workers,
+        hot_skus=hot_skus,
+        shards=shards,
+        seconds=round(elapsed, 3),
+        throughput=round(stats["completed"] / elapsed, 1) if elapsed else 0.0,
+    )
+    return stats
@@ -0,0 +1,71 @@
+"""
+Сценарий отправки писем: отдельное соединение на письмо против диспетчера очереди.
+"""
+
+import time
+
+from backend.models import OutgoingEmail
+from backend.services.email_dispatch import EmailDispatcher, QueuedEmailBackend
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.test.utils import override_settings
+
+from .smtp_sink import SmtpSink
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+def make_messages(count: int, domains: int) -> list:
+    """
+    Письма с HTML-версией на ``domains`` разных доменов.
+    """
+    messages = []
+    for number in range(count):
+        message = EmailMultiAlternatives(
+            subject=f"Статус заказа #{number} изменен",
+            body="Статус заказа изменен",
+            from_email="shop@example.com",
+            to=[f"buyer{number}@domain{number % domains}.example"],
+        )
+        message.attach_alternative("<p>Статус заказа изменен</p>", "text/html")
+        messages.append(message)
+    return messages
+
+
+def run(messages=500, domains=5, batch_size=200) -> list:
+    """
+    Отправляет письма на локальный SMTP-приемник двумя способами и возвращает сводки.
+    """
+    results = []
+    with SmtpSink() as sink:
+        started = time.perf_counter()
+        for message in make_messages(messages, domains):
+            # Прежнее поведение задач: новое соединение на каждое письмо
+            get_connection(SMTP_BACKEND, host="127.0.0.1", port=sink.port).send_messages(
+                [message]
+            )
+        results.append(summary("соединение на письмо", messages, started, sink))
+
+    OutgoingEmail.objects.all().delete()
+    QueuedEmailBackend().send_messages(make_messages(messages, domains))
+    with SmtpSink() as sink, override_settings(EMAIL_DOMAIN_RATE_LIMITS={"default": messages}):
+        started = time.perf_counter()
+        connection = get_connection(SMTP_BACKEND, host="127.0.0.1", port=sink.port)
+        while EmailDispatcher.drain(batch_size=batch_size, connection=connection)["sent"]:
+            pass
+        results.append(summary("диспетчер очереди", messages, started, sink))
+    return results
+
+
+def summary(mode: str, messages: int, started: float, sink: SmtpSink) -> dict:
+    """
+    Сводка замера одного способа отправки.
+    """
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "messages": messages,
+        "received": sink.received,
+        "connections": sink.connections,
+        "seconds": round(elapsed, 3),
+        "messages_per_sec": round(sink.received / elapsed, 1) if elapsed else None,
+    }
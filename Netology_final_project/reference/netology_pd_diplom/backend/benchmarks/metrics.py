@@ -0,0 +1,72 @@
+"""
+Сценарий накладных расходов middleware метрик запросов.
+"""
+
+import statistics
+import time
+
+from backend.benchmarks.connections import LOCAL_CACHE, percentile
+from backend.models import Category
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, override_settings
+
+METRICS_MIDDLEWARE = "backend.middleware.RequestMetricsMiddleware"
+
+
+def measure(mode: str, requests: int, path: str, middleware: list) -> dict:
+    """
+    Задержка ``requests`` GET-запросов к ``path`` с заданным списком middleware.
+    """
+    timings = []
+    with override_settings(MIDDLEWARE=middleware, METRICS_QUERY_COUNT_HEADER=False):
+        client = Client()
+        client.get(path)
+        for _ in range(requests):
+            # Лимиты запросов сбрасываются вне замера
+            cache.clear()
+            started = time.perf_counter()
+            client.get(path)
+            timings.append(time.perf_counter() - started)
+    return {
+        "mode": mode,
+        "requests": requests,
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": percentile(timings, 0.5),
+        "p95_ms": percentile(timings, 0.95),
+    }
+
+
+def run(requests: int = 2000, path: str = "/api/v1/categories/", cache_url: str = "") -> list:
+    """
+    Сравнивает задержку запросов без middleware метрик и с ним.
+
+    Режимы чередуются в два прохода, чтобы прогрев и фоновые колебания
+    не попадали только в один из них; в итоге берется лучший проход.
+    С ``cache_url`` метрики пишутся в Redis, как в production, иначе —
+    в память процесса.
+    """
+    Category.objects.bulk_create(
+        [Category(name=f"Категория {number}") for number in range(20)]
+    )
+    without = [name for name in settings.MIDDLEWARE if name != METRICS_MIDDLEWARE]
+    modes = [("без метрик", without), ("с метриками", list(settings.MIDDLEWARE))]
+    results = {}
+    caches = LOCAL_CACHE
+    if cache_url:
+        caches = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": cache_url,
+            }
+        }
+    with override_settings(CACHES=caches):
+        for _ in range(2):
+            for mode, middleware in modes:
+                result = measure(mode, requests, path, middleware)
+                if mode not in results or result["p50_ms"] < results[mode]["p50_ms"]:
+                    results[mode] = result
+    baseline = results["без метрик"]["p50_ms"]
+    for result in results.values():
+        result["overhead_p50_ms"] = round(result["p50_ms"] - baseline, 3)
+    return list(results.values())
@@ -0,0 +1,95 @@
+"""
+Сценарий рендеринга писем по заказам.
+"""
+
+import time
+import uuid
+
+from backend.models import Order, OrderItem, OrderState, Product, ProductInfo, Shop
+from backend.models.users import User
+from backend.services.email_render import ORDER_STATUS, OrderEmailRenderer
+from django.template.loader import render_to_string
+
+from . import count_queries
+
+
+def prepare(orders: int, items_per_order: int) -> list:
+    """
+    Создает заказы с позициями; возвращает их id.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    users = User.objects.bulk_create(
+        [
+            User(email=f"render-{run_id}-{number}@example.com", first_name=f"Покупатель {number}")
+            for number in range(max(1, orders // 10))
+        ]
+    )
+    shop = Shop.objects.create(name=f"Render {run_id}")
+    skus = []
+    for number in range(items_per_order):
+        product = Product.objects.create(name=f"Товар {number}")
+        skus.append(
+            ProductInfo.objects.create(
+                product=product, shop=shop, external_id=number, price=100 + number,
+                price_rrc=100, quantity=10,
+            )
+        )
+    created = Order.objects.bulk_create(
+        [
+            Order(user=users[number % len(users)], state=OrderState.SENT)
+            for number in range(orders)
+        ],
+        batch_size=1000,
+    )
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order_id=order.id, product_info_id=sku.id, quantity=1)
+            for order in created
+            for sku in skus
+        ],
+        batch_size=1000,
+    )
+    return [order.id for order in created]
+
+
+def run(orders=10000, items_per_order=3, batch_size=500, naive_limit=1000) -> list:
+    """
+    Рендерит письма по заказам поштучно и пачками, возвращает сводки.
+
+    Поштучный режим (прежнее поведение) ограничен ``naive_limit`` заказами:
+    его стоимость растет линейно, скорость в сводке сопоставима.
+    """
+    order_ids = prepare(orders, items_per_order)
+    results = []
+
+    sample = order_ids[:naive_limit]
+    with count_queries() as queries:
+        started = time.perf_counter()
+        for order_id in sample:
+            order = Order.objects.get(id=order_id)
+            render_to_string(
+                "emails/order_confirmation.html", {"order": order, "user": order.user}
+            )
+        results.append(summary("поштучно", len(sample), started, queries.count))
+
+    with count_queries() as queries:
+        started = time.perf_counter()
+        for start in range(0, len(order_ids), batch_size):
+            batch = OrderEmailRenderer.load_orders(order_ids[start:start + batch_size])
+            OrderEmailRenderer.render(ORDER_STATUS, batch)
+        results.append(summary(f"пачками по {batch_size}", len(order_ids), started, queries.count))
+    return results
+
+
+def summary(mode: str, orders: int, started: float, queries: int) -> dict:
+    """
+    Сводка замера одного режима рендеринга.
+    """
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "orders": orders,
+        "queries": queries,
+        "seconds": round(elapsed, 3),
+        "emails_per_sec": round(orders / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,96 @@
+"""
+Сценарий проверки лимитов запросов.
+"""
+
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import django
+from backend.api.throttling import SlidingWindowUserRateThrottle
+from django.conf import settings
+from rest_framework.throttling import UserRateThrottle
+
+THROTTLES = {
+    "SimpleRateThrottle": UserRateThrottle,
+    "скользящее окно": SlidingWindowUserRateThrottle,
+}
+
+
+def make_throttle(mode: str, rate: str):
+    """
+    Экземпляр лимита с заданной частотой, как на один запрос DRF.
+    """
+    throttle = THROTTLES[mode]()
+    throttle.rate = rate
+    throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+    return throttle
+
+
+def hammer(mode: str, ident: str, rate: str, calls: int) -> int:
+    """
+    Выполняет ``calls`` проверок одного ключа, возвращает число разрешенных.
+    """
+    request = SimpleNamespace(user=SimpleNamespace(is_authenticated=True, pk=ident), META={})
+    return sum(make_throttle(mode, rate).allow_request(request, None) for _ in range(calls))
+
+
+def measure(mode: str, requests: int) -> dict:
+    """
+    Стоимость проверки при росте числа запросов на ключ.
+    """
+    request = SimpleNamespace(
+        user=SimpleNamespace(is_authenticated=True, pk=uuid.uuid4().hex), META={}
+    )
+    rate = f"{requests * 10}/hour"
+    tenth = max(1, requests // 10)
+    timings = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        call_started = time.perf_counter()
+        make_throttle(mode, rate).allow_request(request, None)
+        timings.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "first_10pct_us": round(sum(timings[:tenth]) / tenth * 1e6, 1),
+        "last_10pct_us": round(sum(timings[-tenth:]) / tenth * 1e6, 1),
+    }
+
+
+def run(requests: int = 5000, workers: int = 8, limit: int = 100) -> list:
+    """
+    Замеряет стоимость проверки и соблюдение лимита несколькими процессами.
+
+    Каждый из ``workers`` процессов делает ``limit`` запросов по одному ключу
+    с лимитом ``limit`` в час: при общем кэше разрешено должно быть ровно
+    ``limit`` запросов, при кэше в памяти процесса — до ``workers * limit``.
+    """
+    results = [measure(mode, requests) for mode in THROTTLES]
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=django.setup) as pool:
+        for result in results:
+            ident = uuid.uuid4().hex
+            allowed = sum(
+                pool.map(
+                    hammer,
+                    [result["mode"]] * workers,
+                    [ident] * workers,
+                    [f"{limit}/hour"] * workers,
+                    [limit] * workers,
+                )
+            )
+            result.update(
+                {
+                    "processes": workers,
+                    "limit": limit,
+                    "allowed": allowed,
+                    "cache": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1],
+                }
+            )
+    return results
@@ -0,0 +1,34 @@
+"""
+Системные проверки конфигурации.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.database)
+def check_persistent_connections(app_configs, **kwargs):
+    """
+    Предупреждение о соединении с БД, которое открывается на каждый запрос.
+
+    При CONN_MAX_AGE=0 и без пула каждый запрос тратит время на установку
+    соединения (TCP, TLS, аутентификация); для SQLite это открытие файла,
+    поэтому он не проверяется.
+    """
+    warnings = []
+    for alias, database in settings.DATABASES.items():
+        if database.get("ENGINE", "").endswith("sqlite3"):
+            continue
+        if database.get("CONN_MAX_AGE", 0) or database.get("OPTIONS", {}).get("pool"):
+            continue
+        warnings.append(
+            Warning(
+                f"БД '{alias}' открывает новое соединение на каждый запрос.",
+                hint=(
+                    "Задайте CONN_MAX_AGE (DB_CONN_MAX_AGE) или включите пул соединений "
+                    "(DB_POOL_MAX_SIZE) в settings_production."
+                ),
+                id="backend.W001",
+            )
+        )
+    return warnings
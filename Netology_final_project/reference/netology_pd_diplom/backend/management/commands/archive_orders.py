@@ -0,0 +1,48 @@
+"""
+Архивация завершенных заказов.
+"""
+
+from backend.services.archive import ArchiveService
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Переносит доставленные и отмененные заказы в архивные таблицы.
+    Пример использования:
+    python manage.py archive_orders
+    python manage.py archive_orders --days 90 --batch-size 1000
+    """
+
+    help = "Перенос завершенных заказов в архив"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ORDER_ARCHIVE_AFTER_DAYS,
+            help="Архивировать заказы старше указанного количества дней",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.ORDER_ARCHIVE_BATCH,
+            help="Количество заказов в одной пачке",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Не больше указанного количества пачек за запуск (по умолчанию — все)",
+        )
+
+    def handle(self, *args, **options):
+        archived_total = ArchiveService.archive(
+            options["days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Архивация завершена. Заказов в архиве: {archived_total}")
+        )
@@ -0,0 +1,213 @@
+"""
+Запуск нагрузочных сценариев.
+"""
+
+import json
+import os
+
+from backend.benchmarks import (
+    api, connections, inventory, isolated_database, mail, metrics, muted_notifications, render,
+    throttle,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Прогоняет нагрузочный сценарий на временной тестовой БД.
+    Конкурентные сценарии имеют смысл на PostgreSQL: SQLite сериализует запись.
+    Пример использования:
+    python manage.py benchmark inventory
+    python manage.py benchmark inventory --checkouts 1000 --workers 32 --hot-skus 3
+    python manage.py benchmark inventory --shards 8
+    python manage.py benchmark email --messages 2000 --domains 10
+    python manage.py benchmark render --orders 10000
+    python manage.py benchmark throttle --requests 5000 --workers 8
+    DJANGO_ENV=production python manage.py benchmark connections --requests 2000
+    python manage.py benchmark metrics --requests 2000 --cache-url redis://localhost:6379/2
+    python manage.py benchmark api --iterations 500 --output results/api.json
+    python manage.py benchmark api --api-scenarios catalog checkout --compare results/api.json
+    """
+
+    help = "Нагрузочные сценарии (выполняются на временной тестовой БД)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", choices=["inventory", "email", "render", "throttle", "connections", "metrics", "api"], help="Сценарий")
+        parser.add_argument("--checkouts", type=int, default=200, help="Количество оформлений")
+        parser.add_argument("--workers", type=int, default=8, help="Параллельные потоки")
+        parser.add_argument("--hot-skus", type=int, default=5, help="Количество горячих товаров")
+        parser.add_argument("--items", type=int, default=3, help="Позиций в одной корзине")
+        parser.add_argument("--seed", type=int, default=None, help="Seed генератора корзин")
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=0,
+            help="Сравнить с шардированным остатком на указанное число шардов",
+        )
+        parser.add_argument("--messages", type=int, default=500, help="Количество писем")
+        parser.add_argument("--domains", type=int, default=5, help="Количество доменов получателей")
+        parser.add_argument("--batch-size", type=int, default=200, help="Размер пачки")
+        parser.add_argument("--orders", type=int, default=10000, help="Заказов для рендеринга писем")
+        parser.add_argument("--requests", type=int, default=5000, help="Запросов на один ключ лимита")
+        parser.add_argument(
+            "--api-scenarios",
+            nargs="+",
+            choices=list(api.SCENARIOS),
+            default=list(api.SCENARIOS),
+            help="Сценарии API",
+        )
+        parser.add_argument("--iterations", type=int, default=200, help="Итераций сценария API")
+        parser.add_argument("--offers", type=int, default=20000, help="Предложений в данных API")
+        parser.add_argument("--products", type=int, default=5000, help="Товаров в данных API")
+        parser.add_argument("--users", type=int, default=1000, help="Покупателей в данных API")
+        parser.add_argument("--buyers", type=int, default=20, help="Покупателей в сценариях API")
+        parser.add_argument(
+            "--import-offers", type=int, default=500, help="Предложений в прайс-листе импорта"
+        )
+        parser.add_argument(
+            "--cache-url", type=str, default="", help="Redis для метрик сценария metrics (иначе память)"
+        )
+        parser.add_argument("--output", type=str, default=None, help="Файл JSON для результата")
+        parser.add_argument(
+            "--compare", type=str, default=None, help="Файл JSON прошлого прогона для сравнения"
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Не удалять тестовую БД после замера"
+        )
+
+    def handle(self, *args, **options):
+        if options["scenario"] == "email":
+            self.handle_email(options)
+            return
+        if options["scenario"] == "render":
+            self.handle_render(options)
+            return
+        if options["scenario"] == "throttle":
+            self.handle_throttle(options)
+            return
+        if options["scenario"] == "connections":
+            self.handle_connections(options)
+            return
+        if options["scenario"] == "metrics":
+            self.handle_metrics(options)
+            return
+        if options["scenario"] == "api":
+            self.handle_api(options)
+            return
+
+        modes = [0] + ([options["shards"]] if options["shards"] > 0 else [])
+        results = []
+        with isolated_database(keepdb=options["keepdb"]), muted_notifications():
+            for shards in modes:
+                results.append(
+                    inventory.run(
+                        checkouts=options["checkouts"],
+                        workers=options["workers"],
+                        hot_skus=options["hot_skus"],
+                        items_per_order=options["items"],
+                        seed=options["seed"],
+                        shards=shards,
+                    )
+                )
+
+        for result in results:
+            title = f"шардов: {result['shards']}" if result["shards"] else "одна строка"
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Остаток: {title}"))
+            for key, value in result.items():
+                self.stdout.write(f"{key:>14}: {value}")
+            style = self.style.SUCCESS if not result["deadlocks"] else self.style.WARNING
+            self.stdout.write(style(f"Взаимных блокировок: {result['deadlocks']}"))
+
+    def handle_email(self, options):
+        with isolated_database(keepdb=options["keepdb"]):
+            results = mail.run(
+                messages=options["messages"],
+                domains=options["domains"],
+                batch_size=options["batch_size"],
+            )
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Отправка: {result.pop('mode')}"))
+            self.write_result(result)
+
+    def handle_render(self, options):
+        with isolated_database(keepdb=options["keepdb"]):
+            results = render.run(
+                orders=options["orders"],
+                items_per_order=options["items"],
+                batch_size=options["batch_size"],
+            )
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Рендеринг: {result.pop('mode')}"))
+            self.write_result(result)
+
+    def handle_throttle(self, options):
+        for result in throttle.run(requests=options["requests"], workers=options["workers"]):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Лимит: {result.pop('mode')}"))
+            self.write_result(result)
+            style = self.style.SUCCESS if result["allowed"] <= result["limit"] else self.style.WARNING
+            self.stdout.write(
+                style(f"Разрешено {result['allowed']} из {result['limit']} по лимиту")
+            )
+
+    def handle_connections(self, options):
+        with isolated_database(keepdb=options["keepdb"]):
+            results = connections.run(requests=options["requests"])
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"БД: {result.pop('mode')}"))
+            self.write_result(result)
+
+    def handle_metrics(self, options):
+        with isolated_database(keepdb=options["keepdb"]):
+            results = metrics.run(requests=options["requests"], cache_url=options["cache_url"])
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Запросы: {result.pop('mode')}"))
+            self.write_result(result)
+
+    def handle_api(self, options):
+        if options["compare"]:
+            try:
+                open(options["compare"], encoding="utf-8").close()
+            except OSError as error:
+                raise CommandError(f"Не удалось открыть {options['compare']}: {error}")
+        with isolated_database(keepdb=options["keepdb"]):
+            result = api.run(
+                options["api_scenarios"],
+                iterations=options["iterations"],
+                shops=10,
+                categories=50,
+                products=options["products"],
+                offers=options["offers"],
+                users=options["users"],
+                orders=options["orders"],
+                buyers=options["buyers"],
+                import_offers=options["import_offers"],
+                skew=1.1,
+                seed=42 if options["seed"] is None else options["seed"],
+            )
+        for scenario, summary in result["scenarios"].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"API: {scenario}"))
+            steps = summary.pop("steps")
+            self.write_result(summary)
+            for step, step_summary in steps.items():
+                self.stdout.write(
+                    f"{step:>24}: p50 {step_summary['p50_ms']} мс, "
+                    f"p95 {step_summary['p95_ms']} мс, p99 {step_summary['p99_ms']} мс, "
+                    f"SQL {step_summary['queries_per_request']}, ошибок {step_summary['errors']}"
+                )
+            summary["steps"] = steps
+        if options["compare"]:
+            deltas = api.compare(result, options["compare"])
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"Изменение относительно {deltas['baseline']}")
+            )
+            for scenario, delta in deltas["scenarios"].items():
+                self.stdout.write(f"{scenario:>16}: {delta}")
+        if options["output"]:
+            os.makedirs(os.path.dirname(options["output"]) or ".", exist_ok=True)
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(result, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результат записан в {options['output']}"))
+
+    def write_result(self, result):
+        for key, value in result.items():
+            self.stdout.write(f"{key:>16}: {value}")
@@ -0,0 +1,89 @@
+"""
+Генерация синтетических данных для нагрузочных проверок.
+"""
+
+import time
+
+from backend.services.synthetic import SyntheticDataGenerator
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Генерирует магазины, категории, товары, предложения с параметрами,
+    покупателей с контактами и заказы во всех статусах.
+    Пример использования:
+    python manage.py generate_data --offers 1000000 --orders 200000 --seed 1
+    python manage.py generate_data --shops 100 --offers 10000000 --products 1000000
+    python manage.py generate_data --offers 5000 --yaml-dir data --yaml-only
+    """
+
+    help = "Генерация синтетических магазинов, каталога, покупателей и заказов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shops", type=int, default=10, help="Количество магазинов")
+        parser.add_argument("--categories", type=int, default=50, help="Количество категорий")
+        parser.add_argument("--products", type=int, default=10000, help="Количество товаров")
+        parser.add_argument(
+            "--offers", type=int, default=100000, help="Количество предложений магазинов"
+        )
+        parser.add_argument(
+            "--parameters", type=int, default=4, help="Параметров у каждого предложения"
+        )
+        parser.add_argument("--users", type=int, default=1000, help="Количество покупателей")
+        parser.add_argument("--orders", type=int, default=10000, help="Количество заказов")
+        parser.add_argument("--items", type=int, default=5, help="Максимум позиций в заказе")
+        parser.add_argument(
+            "--days", type=int, default=365, help="Глубина дат заказов в днях"
+        )
+        parser.add_argument(
+            "--skew", type=float, default=1.1, help="Показатель распределения Ципфа"
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Seed генератора")
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Строк в одной пачке записи"
+        )
+        parser.add_argument(
+            "--yaml-dir", type=str, default=None,
+            help="Папка для фидов shop*.yaml в формате load_shop_data",
+        )
+        parser.add_argument(
+            "--yaml-only", action="store_true", help="Только фиды, без записи в БД"
+        )
+
+    def handle(self, *args, **options):
+        if options["yaml_only"] and not options["yaml_dir"]:
+            raise CommandError("--yaml-only требует --yaml-dir")
+        for name in ("shops", "categories", "products", "users"):
+            if options[name] < 1:
+                raise CommandError(f"--{name} должно быть больше нуля")
+
+        generator = SyntheticDataGenerator(
+            shops=options["shops"],
+            categories=options["categories"],
+            products=options["products"],
+            offers=options["offers"],
+            parameters=options["parameters"],
+            users=options["users"],
+            orders=options["orders"],
+            items=options["items"],
+            days=options["days"],
+            skew=options["skew"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            yaml_dir=options["yaml_dir"],
+            yaml_only=options["yaml_only"],
+        )
+        started = time.perf_counter()
+        counts = generator.run()
+        elapsed = time.perf_counter() - started
+
+        for model, count in counts.items():
+            self.stdout.write(f"{model:>18}: {count}")
+        if options["yaml_dir"]:
+            self.stdout.write(f"Фиды магазинов записаны в {options['yaml_dir']}")
+        self.stdout.write(self.style.SUCCESS(f"Данные сгенерированы за {elapsed:.1f} с"))
+        if not options["yaml_only"]:
+            self.stdout.write(
+                "Аналитика продаж по новым заказам: python manage.py rebuild_sales_rollups"
+            )
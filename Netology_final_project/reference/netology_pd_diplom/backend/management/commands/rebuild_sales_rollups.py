@@ -0,0 +1,40 @@
+"""
+Пересчет агрегатов продаж магазинов.
+"""
+
+from datetime import date
+
+from backend.services.analytics import SalesRollupService
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """
+    Заполняет дневные агрегаты продаж по рабочим и архивным заказам.
+    Пример использования:
+    python manage.py rebuild_sales_rollups
+    python manage.py rebuild_sales_rollups --date-from 2025-01-01 --date-to 2025-01-31
+    """
+
+    help = "Пересчет дневных агрегатов продаж магазинов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date-from", type=date.fromisoformat, default=None, help="Начальная дата (ГГГГ-ММ-ДД)"
+        )
+        parser.add_argument(
+            "--date-to", type=date.fromisoformat, default=None, help="Конечная дата (ГГГГ-ММ-ДД)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Количество строк в одной вставке"
+        )
+
+    def handle(self, *args, **options):
+        created = SalesRollupService.rebuild(
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Агрегаты продаж пересчитаны. Строк по магазинам: {created}")
+        )
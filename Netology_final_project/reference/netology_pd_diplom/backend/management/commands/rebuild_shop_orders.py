@@ -0,0 +1,65 @@
+"""
+Перестроение индекса заказов магазинов.
+"""
+
+from backend.models import Order, OrderItem, OrderState, ShopOrder
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    """
+    Заполняет индекс заказов магазинов по уже оформленным заказам.
+    Пример использования:
+    python manage.py rebuild_shop_orders
+    python manage.py rebuild_shop_orders --batch-size 5000
+    """
+
+    help = "Заполнение индекса заказов магазинов (ShopOrder)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Количество заказов в одной пачке"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        orders = Order.objects.exclude(state=OrderState.BASKET).order_by("id")
+        last_id = 0
+        created_total = 0
+
+        while True:
+            batch = list(
+                orders.filter(id__gt=last_id).values_list("id", "state", "dt")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            order_map = {order_id: (state, dt) for order_id, state, dt in batch}
+
+            pairs = (
+                OrderItem.objects.filter(order_id__in=order_map)
+                .values_list("order_id", "product_info__shop_id")
+                .distinct()
+            )
+            rows = [
+                ShopOrder(
+                    shop_id=shop_id,
+                    order_id=order_id,
+                    state=order_map[order_id][0],
+                    dt=order_map[order_id][1],
+                )
+                for order_id, shop_id in pairs
+            ]
+            with transaction.atomic():
+                ShopOrder.objects.bulk_create(rows, ignore_conflicts=True)
+                for state in {state for state, _ in order_map.values()}:
+                    ShopOrder.objects.filter(
+                        order_id__in=[oid for oid, (st, _) in order_map.items() if st == state]
+                    ).exclude(state=state).update(state=state)
+            created_total += len(rows)
+            self.stdout.write(f"  Обработаны заказы до #{last_id}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Индекс заказов магазинов обновлен. Связей: {created_total}")
+        )
@@ -0,0 +1,355 @@
+"""
+Метрики запросов в формате Prometheus.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpResponse, HttpResponseForbidden
+from django.urls import URLResolver, get_resolver
+from rest_framework.serializers import BaseSerializer
+
+# Метрики текущего запроса (см. RequestMetricsMiddleware)
+current_request = ContextVar("current_request_metrics", default=None)
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """
+    Гистограмма Prometheus с одной меткой.
+
+    Наблюдение — поиск корзины и увеличение счетчиков под блокировкой, без
+    выделения памяти. Значения накапливаются с запуска процесса, окна
+    считаются на стороне Prometheus (``rate``, ``histogram_quantile``).
+    """
+
+    def __init__(self, name: str, documentation: str, label: str, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        """
+        Учитывает значение в ряду с меткой ``label_value``.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> list:
+        """
+        Строки гистограммы в текстовом формате Prometheus.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_value, (counts, total, count) in sorted(self.snapshot().items()):
+            label = f'{self.label}="{escape(label_value)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+    def snapshot(self) -> dict:
+        """
+        Копия рядов: метка -> (счетчики корзин, сумма, количество).
+        """
+        with self._lock:
+            return {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            }
+
+
+def increment(key: str, delta: int) -> None:
+    """
+    Атомарно увеличивает счетчик в кэше, создавая его при первом обращении.
+    """
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def increment_many(deltas: dict) -> None:
+    """
+    Атомарно увеличивает несколько счетчиков в кэше.
+
+    Для Redis все ``INCRBY`` уходят одним конвейером (один сетевой обмен,
+    отсутствующий ключ создается с нуля), для других кэшей — по одному.
+    """
+    backend = caches["default"]
+    if not isinstance(backend, RedisCache):
+        for key, delta in deltas.items():
+            increment(key, delta)
+        return
+    with backend._cache.get_client(write=True).pipeline(transaction=False) as pipeline:
+        for key, delta in deltas.items():
+            pipeline.incrby(backend.make_and_validate_key(key), delta)
+        pipeline.execute()
+
+
+class SharedHistogram(Histogram):
+    """
+    Гистограмма, ряды которой хранятся в кэше Django.
+
+    Наблюдения всех процессов — воркеров gunicorn за одним портом и воркеров
+    Celery — складываются атомарным ``incr`` (в production кэш общий, Redis),
+    и ``/metrics`` любого веб-процесса отдает общие значения. Значения меток
+    берутся из ``labels()``, сумма хранится целым числом в миллионных долях.
+    """
+
+    SUM_SCALE = 10 ** 6
+
+    def __init__(self, name: str, documentation: str, label: str, buckets: tuple, labels):
+        super().__init__(name, documentation, label, buckets)
+        self.labels = labels
+
+    def key(self, label_value: str, suffix) -> str:
+        return f"metrics:{self.name}:{label_value}:{suffix}"
+
+    def deltas(self, label_value: str, value: float) -> dict:
+        """
+        Приращения счетчиков кэша для одного наблюдения.
+        """
+        return {
+            self.key(label_value, bisect_left(self.buckets, value)): 1,
+            self.key(label_value, "sum"): round(value * self.SUM_SCALE),
+            self.key(label_value, "count"): 1,
+        }
+
+    def observe(self, label_value: str, value: float) -> None:
+        """
+        Учитывает значение в ряду с меткой ``label_value``.
+        """
+        increment_many(self.deltas(label_value, value))
+
+    def snapshot(self) -> dict:
+        """
+        Ряды из кэша; метки без наблюдений пропускаются.
+
+        Сначала читаются счетчики наблюдений, корзины и сумма — только для
+        меток, у которых они есть.
+        """
+        count_keys = {self.key(label, "count"): label for label in self.labels()}
+        counts = {
+            count_keys[key]: count for key, count in cache.get_many(list(count_keys)).items() if count
+        }
+        labels = list(counts)
+        suffixes = list(range(len(self.buckets) + 1)) + ["sum"]
+        values = cache.get_many([self.key(label, suffix) for label in labels for suffix in suffixes])
+        series = {}
+        for label in labels:
+            buckets = [values.get(self.key(label, index), 0) for index in suffixes[:-1]]
+            total = values.get(self.key(label, "sum"), 0) / self.SUM_SCALE
+            series[label] = (buckets, total, counts[label])
+        return series
+
+
+class SharedCounter:
+    """
+    Счетчик Prometheus с одной меткой, хранящийся в кэше Django.
+
+    См. ``SharedHistogram``.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label: str, labels):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.labels = labels
+
+    def key(self, label_value: str) -> str:
+        return f"metrics:{self.name}:{label_value}"
+
+    def inc(self, label_value: str, amount: int = 1) -> None:
+        """
+        Увеличивает счетчик ряда ``label_value``.
+        """
+        increment(self.key(label_value), amount)
+
+    def collect(self) -> list:
+        """
+        Строки счетчика в текстовом формате Prometheus.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        labels = list(self.labels())
+        values = cache.get_many([self.key(label) for label in labels])
+        for label in sorted(labels):
+            value = values.get(self.key(label))
+            if value is not None:
+                lines.append(f'{self.name}{{{self.label}="{escape(label)}"}} {value}')
+        return lines
+
+
+class SharedGauge(SharedCounter):
+    """
+    Наибольшее наблюдавшееся значение, хранящееся в кэше Django.
+
+    Обновление — чтение и запись без блокировки: при одновременной
+    записи из двух процессов максимум может ненадолго занизиться.
+    """
+
+    kind = "gauge"
+
+    def set_max(self, label_value: str, value: int) -> None:
+        """
+        Запоминает ``value``, если оно больше сохраненного.
+        """
+        key = self.key(label_value)
+        if value > (cache.get(key) or 0):
+            cache.set(key, value, timeout=None)
+
+
+def escape(value: str) -> str:
+    """
+    Экранирование значения метки.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@lru_cache(maxsize=None)
+def view_names() -> tuple:
+    """
+    Имена представлений из URLconf — значения метки ``view``.
+
+    Имена строятся так же, как ``ResolverMatch.view_name``; для запросов
+    без совпадения используется ``unresolved``.
+    """
+    names = ["unresolved"]
+
+    def walk(patterns, namespaces):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                namespace = [pattern.namespace] if pattern.namespace else []
+                walk(pattern.url_patterns, namespaces + namespace)
+            else:
+                names.append(":".join(namespaces + [pattern.name or pattern.lookup_str]))
+
+    walk(get_resolver().url_patterns, [])
+    return tuple(dict.fromkeys(names))
+
+
+REQUEST_DURATION = SharedHistogram(
+    "http_request_duration_seconds", "Request wall time.", "view", TIME_BUCKETS, view_names
+)
+REQUEST_QUERIES = SharedHistogram(
+    "http_request_db_queries", "Database queries per request.", "view", QUERY_BUCKETS, view_names
+)
+REQUEST_DB_DURATION = SharedHistogram(
+    "http_request_db_duration_seconds",
+    "Database time per request.",
+    "view",
+    TIME_BUCKETS,
+    view_names,
+)
+REQUEST_SERIALIZER_DURATION = SharedHistogram(
+    "http_request_serializer_duration_seconds",
+    "Serializer time per request.",
+    "view",
+    TIME_BUCKETS,
+    view_names,
+)
+RESPONSE_SIZE = SharedHistogram(
+    "http_response_size_bytes", "Response body size.", "view", SIZE_BUCKETS, view_names
+)
+
+REGISTRY = [
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUEST_DB_DURATION,
+    REQUEST_SERIALIZER_DURATION,
+    RESPONSE_SIZE,
+]
+
+
+class RequestMetrics:
+    """
+    Счетчики одного запроса; используется как обертка выполнения SQL.
+    """
+
+    __slots__ = ("request", "queries", "db_time", "serializer_time", "serializing")
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def instrument_serializers() -> None:
+    """
+    Учитывает время сериализации во всех сериализаторах DRF.
+
+    Все сериализаторы получают результат через ``BaseSerializer.data``,
+    вложенные сериализаторы его не вызывают, поэтому замеряется только
+    внешний вызов. Вызывается один раз при запуске приложения.
+    """
+    original = BaseSerializer.data.fget
+
+    def data(self):
+        metrics = current_request.get()
+        if metrics is None or metrics.serializing:
+            return original(self)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
+
+    BaseSerializer.data = property(data)
+
+
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    Если задан METRICS_TOKEN, требуется заголовок ``Authorization: Bearer <token>``.
+    """
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponseForbidden()
+    lines = []
+    for histogram in REGISTRY:
+        lines.extend(histogram.collect())
+    return HttpResponse(
+        "\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
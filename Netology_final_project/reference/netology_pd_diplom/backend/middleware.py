@@ -0,0 +1,127 @@
+"""
+Middleware приложения.
+"""
+
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+
+from backend import metrics
+from backend.api.authentication import CachedTokenAuthentication
+from backend.profiling import PROFILERS, ProfileStorage
+
+
+class RequestMetricsMiddleware:
+    """
+    Метрики запроса по имени представления.
+
+    Время запроса, количество и время SQL-запросов, время сериализации
+    и размер ответа попадают в гистограммы ``/metrics``. При
+    METRICS_QUERY_COUNT_HEADER в ответ добавляется заголовок ``X-Query-Count``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == settings.METRICS_PATH:
+            return self.get_response(request)
+
+        request_metrics = metrics.RequestMetrics(request)
+        token = metrics.current_request.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(request_metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        observations = [
+            (metrics.REQUEST_DURATION, elapsed),
+            (metrics.REQUEST_QUERIES, request_metrics.queries),
+            (metrics.REQUEST_DB_DURATION, request_metrics.db_time),
+            (metrics.REQUEST_SERIALIZER_DURATION, request_metrics.serializer_time),
+        ]
+        if not response.streaming:
+            observations.append((metrics.RESPONSE_SIZE, len(response.content)))
+        # Все гистограммы запроса записываются в кэш одним обменом
+        deltas = {}
+        for histogram, value in observations:
+            deltas.update(histogram.deltas(view, value))
+        metrics.increment_many(deltas)
+
+        if settings.METRICS_QUERY_COUNT_HEADER:
+            response["X-Query-Count"] = str(request_metrics.queries)
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Профилирование запросов по требованию.
+
+    Запрос профилируется, если сотрудник (``is_staff``, сессия или токен)
+    передал заголовок ``X-Profile`` — ``1`` или режим ``cprofile``/``sampling``, —
+    либо попал в выборку с долей PROFILING_SAMPLE_RATE. Профиль сохраняется
+    через ``ProfileStorage`` с именем представления и id запроса
+    (заголовок ``X-Request-ID`` или новый), id возвращается в ``X-Profile-Id``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = self.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+
+        request_id = (request.headers.get("X-Request-ID") or uuid.uuid4().hex)[:64]
+        profiler = PROFILERS[mode]()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        ProfileStorage.save(profiler, request, response, view, request_id, duration)
+        response["X-Profile-Id"] = request_id
+        return response
+
+    def requested_mode(self, request):
+        """
+        Режим профилирования запроса или None.
+        """
+        header = request.headers.get("X-Profile")
+        if header and self.is_staff(request):
+            return header if header in PROFILERS else settings.PROFILING_MODE
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate and random.random() < rate:
+            return settings.PROFILING_MODE
+        return None
+
+    @staticmethod
+    def is_staff(request) -> bool:
+        """
+        Является ли пользователь запроса сотрудником; токен проверяется через кэш токенов.
+        """
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            result = CachedTokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return result is not None and result[0].is_staff
@@ -2,9 +2,18 @@ from .users import User, UserManager, Contact
 from .shops import Shop
 from .catalog import Category, Product, ProductInfo
 from .parameters import Parameter, ProductParameter
-from .orders import Order, OrderItem, OrderState, OrderStatusHistory
-from .logs import EmailLog
+from .orders import (
+    ORDER_TRANSITIONS, Order, OrderItem, OrderState, OrderStatusHistory, ShopOrder, can_transition
+)
+from .stock import StockHold, StockShard
+from .analytics import ShopSalesDaily, ShopProductSalesDaily
+from .archive import ArchivedOrder, ArchivedOrderItem, ArchivedOrderStatusHistory
+from .logs import EmailLog, RequestProfile, SlowQuery
+from .emails import OutgoingEmail
 from .tokens import ConfirmEmailToken
+from .idempotency import IdempotencyKey
+from .outbox import OutboxEvent
+from .notifications import PendingNotification
 
 __all__ = [
     "User",
@@ -24,7 +33,23 @@ __all__ = [
     "OrderItem",
     "OrderState",
     "OrderStatusHistory",
+    "ShopOrder",
+    "ORDER_TRANSITIONS",
+    "can_transition",
+    "StockHold",
+    "StockShard",
+    "ShopSalesDaily",
+    "ShopProductSalesDaily",
+    "ArchivedOrder",
+    "ArchivedOrderItem",
+    "ArchivedOrderStatusHistory",
 
     "EmailLog",
+    "RequestProfile",
+    "SlowQuery",
+    "OutgoingEmail",
     "ConfirmEmailToken",
+    "IdempotencyKey",
+    "OutboxEvent",
+    "PendingNotification",
 ]
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Модели агрегатов продаж магазинов.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .catalog import Product
+from .orders import OrderState
+from .shops import Shop
+
+
+class ShopSalesDaily(models.Model):
+    """
+    Продажи магазина за день в разрезе статуса заказа.
+
+    День — дата оформления заказа. При смене статуса заказ переходит из строки
+    старого статуса в строку нового, поэтому сумма по статусам за день равна
+    всем оформленным в этот день заказам магазина.
+    """
+    shop = models.ForeignKey(Shop, related_name="sales_daily", on_delete=models.CASCADE)
+    date = models.DateField(_("date"))
+    state = models.CharField(_("state"), max_length=20, choices=OrderState.choices)
+    orders_count = models.IntegerField(_("orders count"), default=0)
+    units = models.IntegerField(_("units"), default=0)
+    revenue = models.DecimalField(_("revenue"), max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        """
+        Метаданные модели ShopSalesDaily.
+        """
+        verbose_name = _("Продажи магазина за день")
+        verbose_name_plural = _("Продажи магазинов по дням")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shop", "date", "state"], name="unique_shop_sales_daily"
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели ShopSalesDaily.
+        """
+        return f"Магазин #{self.shop_id} {self.date} {self.state}: {self.revenue}"
+
+
+class ShopProductSalesDaily(models.Model):
+    """
+    Продажи товара магазина за день в разрезе статуса заказа.
+    """
+    shop = models.ForeignKey(Shop, related_name="product_sales_daily", on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name="sales_daily", on_delete=models.CASCADE)
+    date = models.DateField(_("date"))
+    state = models.CharField(_("state"), max_length=20, choices=OrderState.choices)
+    units = models.IntegerField(_("units"), default=0)
+    revenue = models.DecimalField(_("revenue"), max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        """
+        Метаданные модели ShopProductSalesDaily.
+        """
+        verbose_name = _("Продажи товара за день")
+        verbose_name_plural = _("Продажи товаров по дням")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shop", "date", "state", "product"],
+                name="unique_shop_product_sales_daily",
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели ShopProductSalesDaily.
+        """
+        return f"Товар #{self.product_id} магазина #{self.shop_id} {self.date}: {self.units} шт."
@@ -0,0 +1,105 @@
+"""
+Модели архива завершенных заказов.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .orders import OrderState
+from .users import User
+
+
+class ArchivedOrder(models.Model):
+    """
+    Архивная копия доставленного или отмененного заказа.
+
+    Хранит снимок заказа на момент переноса: сумму, количество товаров и адрес
+    доставки, поэтому не зависит от дальнейших изменений каталога и контактов.
+    Первичный ключ совпадает с id исходного заказа.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User, related_name="archived_orders", null=True, blank=True, on_delete=models.SET_NULL
+        )
+    dt = models.DateTimeField()
+    state = models.CharField(_("state"), max_length=20, choices=OrderState.choices)
+    total_sum = models.DecimalField(_("total sum"), max_digits=12, decimal_places=2, default=0)
+    items_count = models.PositiveIntegerField(_("items count"), default=0)
+    contact = models.JSONField(_("contact"), null=True, blank=True)
+    archived_at = models.DateTimeField(_("archived at"), auto_now_add=True)
+
+    class Meta:
+        """
+        Метаданные модели ArchivedOrder.
+        """
+        verbose_name = _("Архивный заказ")
+        verbose_name_plural = _("Архивные заказы")
+        ordering = ("-dt",)
+        indexes = [
+            models.Index(fields=["user", "dt", "id"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели ArchivedOrder.
+        """
+        return f"Архивный заказ #{self.pk} от {self.dt}"
+
+
+class ArchivedOrderItem(models.Model):
+    """
+    Позиция архивного заказа со снимком названия и цены товара.
+    """
+    order = models.ForeignKey(
+        ArchivedOrder, related_name="items", on_delete=models.CASCADE
+        )
+    product_info_id = models.BigIntegerField(_("product info id"))
+    product_id = models.BigIntegerField(_("product id"), null=True, blank=True)
+    shop_id = models.BigIntegerField(_("shop id"), null=True, blank=True)
+    product_name = models.CharField(_("product name"), max_length=80)
+    shop_name = models.CharField(_("shop name"), max_length=50, blank=True)
+    price = models.DecimalField(_("price"), max_digits=12, decimal_places=2)
+    quantity = models.PositiveIntegerField(_("quantity"))
+
+    class Meta:
+        """
+        Метаданные модели ArchivedOrderItem.
+        """
+        verbose_name = _("Позиция архивного заказа")
+        verbose_name_plural = _("Позиции архивных заказов")
+        indexes = [
+            models.Index(fields=["shop_id", "order"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели ArchivedOrderItem.
+        """
+        return f"{self.product_name} - {self.quantity} шт."
+
+
+class ArchivedOrderStatusHistory(models.Model):
+    """
+    История статусов архивного заказа.
+    """
+    order = models.ForeignKey(
+        ArchivedOrder, related_name="status_history", on_delete=models.CASCADE
+        )
+    old_status = models.CharField(_("old status"), max_length=20, choices=OrderState.choices)
+    new_status = models.CharField(_("new status"), max_length=20, choices=OrderState.choices)
+    changed_by_id = models.BigIntegerField(_("changed by"), null=True, blank=True)
+    changed_at = models.DateTimeField(_("changed at"))
+    comment = models.TextField(_("comment"), blank=True)
+
+    class Meta:
+        """
+        Метаданные модели ArchivedOrderStatusHistory.
+        """
+        verbose_name = _("История архивного заказа")
+        verbose_name_plural = _("История архивных заказов")
+        ordering = ("changed_at",)
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели ArchivedOrderStatusHistory.
+        """
+        return f"Order {self.order_id}: {self.old_status} → {self.new_status}"
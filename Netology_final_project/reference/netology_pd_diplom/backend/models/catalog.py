@@ -3,6 +3,9 @@
 """
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .shops import Shop
@@ -57,6 +60,48 @@ class Product(models.Model):
         return str(self.name)
 
 
+class ProductInfoQuerySet(models.QuerySet):
+    """
+    Набор запросов для информации о товарах.
+    """
+
+    def with_stock_total(self):
+        """
+        Аннотирует полный остаток: основная строка плюс шарды склада.
+        """
+        from .stock import StockShard
+
+        shards = (
+            StockShard.objects.filter(product_info=OuterRef("pk"))
+            .order_by()
+            .values("product_info")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.annotate(
+            stock_total=F("quantity")
+            + Coalesce(Subquery(shards, output_field=models.IntegerField()), Value(0))
+        )
+
+    def with_available(self):
+        """
+        Аннотирует полный остаток и остаток за вычетом активных удержаний в корзинах.
+        """
+        from .stock import StockHold
+
+        held = (
+            StockHold.objects.filter(product_info=OuterRef("pk"), expires_at__gt=timezone.now())
+            .order_by()
+            .values("product_info")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.with_stock_total().annotate(
+            available_quantity=F("stock_total")
+            - Coalesce(Subquery(held, output_field=models.IntegerField()), Value(0))
+        )
+
+
 class ProductInfo(models.Model):
     """
     Информация о продукте в конкретном магазине.
@@ -71,6 +116,13 @@ class ProductInfo(models.Model):
     quantity = models.PositiveIntegerField(_("quantity"), default=0)
     price = models.DecimalField(_("price"), max_digits=10, decimal_places=2)
     price_rrc = models.DecimalField(_("price rrc"), max_digits=10, decimal_places=2)
+    stock_shards = models.PositiveSmallIntegerField(
+        _("stock shards"),
+        default=0,
+        help_text=_("Количество шардов остатка для горячих товаров (0 — без шардирования)"),
+    )
+
+    objects = ProductInfoQuerySet.as_manager()
 
     class Meta:
         """
@@ -96,20 +148,51 @@ class ProductInfo(models.Model):
         """
         return f"{self.product.name} — {self.shop.name}"
 
+    @property
+    def total_quantity(self) -> int:
+        """
+        Полный остаток с учетом шардов склада.
+
+        Использует аннотацию ``stock_total``, если она есть; для шардированного
+        товара без аннотации выполняет один запрос.
+        """
+        if "stock_total" in self.__dict__:
+            return self.stock_total
+        if not self.stock_shards:
+            return self.quantity
+        shards = self.shards.aggregate(total=Sum("quantity"))["total"] or 0
+        return self.quantity + shards
+
     @property
     def available(self) -> bool:
         """
         Доступно ли для заказа.
         """
-        return self.quantity > 0
+        return self.total_quantity > 0
 
-    def check_availability(self, quantity: int) -> bool:
+    def held_quantity(self, exclude_order_id=None) -> int:
         """
-        Проверить доступность указанного количества.
+        Количество, удерживаемое активными резервами корзин.
+
+        Один запрос по индексу (product_info, expires_at).
+        """
+        holds = self.holds.filter(expires_at__gt=timezone.now())
+        if exclude_order_id is not None:
+            holds = holds.exclude(order_id=exclude_order_id)
+        return holds.aggregate(total=Sum("quantity"))["total"] or 0
+
+    def check_availability(self, quantity: int, exclude_order_id=None) -> bool:
+        """
+        Проверить доступность указанного количества с учетом резервов корзин.
+
+        Резервы заказа ``exclude_order_id`` (собственная корзина) не учитываются.
         """
         if not isinstance(quantity, int) or quantity < 0:
             return False
-        return self.quantity >= quantity
+        total = self.total_quantity
+        if total < quantity:
+            return False
+        return total - self.held_quantity(exclude_order_id) >= quantity
 
     def clean(self) -> None:
         """
@@ -0,0 +1,69 @@
+"""
+Модели очереди исходящих писем.
+"""
+from django.db import models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+from .orders import Order
+from .users import User
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+
+    Письма складываются в очередь почтовым бэкендом приложения и отправляются
+    диспетчером пачками через одно соединение с учетом лимитов по доменам.
+    """
+
+    class Status(models.TextChoices):
+        """
+        Статус письма в очереди.
+        """
+        PENDING = "pending", _("Ожидает отправки")
+        SENT = "sent", _("Отправлено")
+        FAILED = "failed", _("Ошибка")
+
+    from_email = models.CharField(_("from"), max_length=255)
+    to = models.JSONField(_("to"), default=list)
+    cc = models.JSONField(_("cc"), default=list, blank=True)
+    bcc = models.JSONField(_("bcc"), default=list, blank=True)
+    reply_to = models.JSONField(_("reply to"), default=list, blank=True)
+    headers = models.JSONField(_("headers"), default=dict, blank=True)
+    subject = models.CharField(_("subject"), max_length=255)
+    body = models.TextField(_("body"), blank=True)
+    html_body = models.TextField(_("html body"), blank=True)
+    domain = models.CharField(_("domain"), max_length=255)
+    email_type = models.CharField(_("email type"), max_length=50, blank=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(
+        _("status"), max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    error_message = models.TextField(_("error"), blank=True)
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+    send_after = models.DateTimeField(_("send after"))
+    sent_at = models.DateTimeField(_("sent at"), null=True, blank=True)
+
+    class Meta:
+        """
+        Метаданные модели OutgoingEmail.
+        """
+        verbose_name = _("Исходящее письмо")
+        verbose_name_plural = _("Исходящие письма")
+        indexes = [
+            models.Index(
+                fields=["send_after", "id"],
+                condition=Q(status="pending"),
+                name="outgoing_email_pending_idx",
+            ),
+            models.Index(fields=["status", "sent_at", "domain"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели OutgoingEmail.
+        """
+        return f"{', '.join(self.to)} — {self.subject}"
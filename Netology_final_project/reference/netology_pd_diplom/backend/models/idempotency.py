@@ -0,0 +1,44 @@
+"""
+Модели для идемпотентных запросов.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .users import User
+
+
+class IdempotencyKey(models.Model):
+    """
+    Результат запроса с заголовком ``Idempotency-Key``.
+
+    Запись создается до выполнения запроса (``status_code`` пуст, пока запрос
+    выполняется; ``created_at`` — время начала) и хранит ответ, который
+    возвращается при повторе с тем же ключом.
+    """
+    user = models.ForeignKey(
+        User, related_name="idempotency_keys", on_delete=models.CASCADE
+        )
+    key = models.CharField(_("key"), max_length=255)
+    method = models.CharField(_("method"), max_length=10)
+    path = models.CharField(_("path"), max_length=255)
+    request_hash = models.CharField(_("request hash"), max_length=64)
+    status_code = models.PositiveSmallIntegerField(_("status code"), null=True, blank=True)
+    response = models.JSONField(_("response"), null=True, blank=True)
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+
+    class Meta:
+        """
+        Метаданные модели IdempotencyKey.
+        """
+        verbose_name = _("Ключ идемпотентности")
+        verbose_name_plural = _("Ключи идемпотентности")
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_key")
+        ]
+        indexes = [models.Index(fields=["created_at"])]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели IdempotencyKey.
+        """
+        return f"{self.method} {self.path} [{self.key}]"
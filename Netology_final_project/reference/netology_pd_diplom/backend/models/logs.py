@@ -18,9 +18,11 @@ class EmailLog(models.Model):
     EMAIL_TYPE_CHOICES = (
         ("order_confirmation", _("Order confirmation")),
         ("order_status", _("Order status")),
+        ("shop_digest", _("Shop digest")),
         ("admin_notification", _("Admin notification")),
         ("password_reset", _("Password reset")),
         ("email_confirmation", _("Email confirmation")),
+        ("other", _("Other")),
     )
 
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
@@ -50,3 +52,91 @@ class EmailLog(models.Model):
         Строковое представление модели EmailLog.
         """
         return f"{self.email} — {self.subject}"
+
+
+class RequestProfile(models.Model):
+    """
+    Профиль выполнения запроса к API.
+
+    Сам профиль хранится файлом в каталоге PROFILING_DIR, запись содержит
+    метаданные для поиска в админке.
+    """
+    MODE_CHOICES = (
+        ("cprofile", _("cProfile (pstats)")),
+        ("sampling", _("Sampling (collapsed stacks)")),
+    )
+
+    view = models.CharField(_("view"), max_length=200)
+    request_id = models.CharField(_("request id"), max_length=64)
+    method = models.CharField(_("method"), max_length=10)
+    path = models.CharField(_("path"), max_length=255)
+    status_code = models.PositiveSmallIntegerField(_("status code"))
+    duration_ms = models.FloatField(_("duration, ms"))
+    mode = models.CharField(_("mode"), max_length=10, choices=MODE_CHOICES)
+    file_name = models.CharField(_("file name"), max_length=255)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+
+    class Meta:
+        """
+        Метаданные модели RequestProfile.
+        """
+        verbose_name = _("request profile")
+        verbose_name_plural = _("request profiles")
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["view"]),
+            ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели RequestProfile.
+        """
+        return f"{self.view} — {self.request_id}"
+
+
+class SlowQuery(models.Model):
+    """
+    Медленный SQL-запрос, агрегированный по отпечатку.
+
+    Отпечаток — хэш нормализованного текста запроса без литералов и
+    параметров, поэтому запросы, различающиеся только значениями, попадают
+    в одну запись. Представление, стек и план выполнения — последнего
+    замеченного запроса.
+    """
+    fingerprint = models.CharField(_("fingerprint"), max_length=40, unique=True)
+    sql = models.TextField(_("normalized SQL"))
+    calls = models.PositiveIntegerField(_("calls"), default=0)
+    total_ms = models.FloatField(_("total time, ms"), default=0)
+    max_ms = models.FloatField(_("max time, ms"), default=0)
+    last_ms = models.FloatField(_("last time, ms"), default=0)
+    last_view = models.CharField(_("last view"), max_length=200, blank=True)
+    stack = models.TextField(_("stack"), blank=True)
+    explain = models.TextField(_("query plan"), blank=True)
+    first_seen = models.DateTimeField(_("first seen"), auto_now_add=True)
+    last_seen = models.DateTimeField(_("last seen"))
+
+    class Meta:
+        """
+        Метаданные модели SlowQuery.
+        """
+        verbose_name = _("slow query")
+        verbose_name_plural = _("slow queries")
+        ordering = ("-total_ms",)
+        indexes = [
+            models.Index(fields=["last_seen"]),
+            ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели SlowQuery.
+        """
+        return f"{self.fingerprint} — {self.calls}"
+
+    @property
+    def avg_ms(self) -> float:
+        """
+        Среднее время запроса, мс.
+        """
+        return round(self.total_ms / self.calls, 2) if self.calls else 0.0
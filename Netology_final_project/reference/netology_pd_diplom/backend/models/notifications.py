@@ -0,0 +1,58 @@
+"""
+Модели отложенных уведомлений.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .orders import Order, OrderState
+from .users import User
+
+
+class PendingNotification(models.Model):
+    """
+    Уведомление о заказе, ожидающее отправки.
+
+    На каждую пару получатель-заказ хранится одна строка: повторные события
+    обновляют конечный статус, не сдвигая ``send_after``. Периодическая задача
+    отправляет получателю одно письмо по всем его накопленным заказам.
+    """
+
+    class Kind(models.TextChoices):
+        """
+        Вид уведомления.
+        """
+        ORDER_STATUS = "order_status", _("Статус заказа")
+        SHOP_DIGEST = "shop_digest", _("Сводка магазина")
+
+    kind = models.CharField(_("kind"), max_length=20, choices=Kind.choices)
+    user = models.ForeignKey(
+        User, related_name="pending_notifications", on_delete=models.CASCADE
+        )
+    order = models.ForeignKey(
+        Order, related_name="pending_notifications", on_delete=models.CASCADE
+        )
+    old_status = models.CharField(_("old status"), max_length=20, choices=OrderState.choices)
+    new_status = models.CharField(_("new status"), max_length=20, choices=OrderState.choices)
+    send_after = models.DateTimeField(_("send after"))
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+
+    class Meta:
+        """
+        Метаданные модели PendingNotification.
+        """
+        verbose_name = _("Отложенное уведомление")
+        verbose_name_plural = _("Отложенные уведомления")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "user", "order"], name="unique_pending_notification"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["send_after"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели PendingNotification.
+        """
+        return f"{self.kind} #{self.order_id} → {self.user_id}"
@@ -2,10 +2,11 @@
 Модели относящиеся к заказам.
 """
 from django.db import models
-from django.db.models import F, Sum
+from django.db.models import F, Prefetch, Q, Sum
 from django.utils.translation import gettext_lazy as _
 
 from .catalog import ProductInfo
+from .shops import Shop
 from .users import User
 
 
@@ -22,6 +23,62 @@ class OrderState(models.TextChoices):
     CANCELED = "canceled", _("Отменен")
 
 
+ORDER_TRANSITIONS = {
+    OrderState.BASKET: {OrderState.NEW},
+    OrderState.NEW: {
+        OrderState.CONFIRMED, OrderState.ASSEMBLED, OrderState.SENT, OrderState.CANCELED
+    },
+    OrderState.CONFIRMED: {OrderState.ASSEMBLED, OrderState.SENT, OrderState.CANCELED},
+    OrderState.ASSEMBLED: {OrderState.SENT, OrderState.CANCELED},
+    OrderState.SENT: {OrderState.DELIVERED},
+    OrderState.DELIVERED: set(),
+    OrderState.CANCELED: set(),
+}
+
+
+def can_transition(old_status: str, new_status: str) -> bool:
+    """
+    Допустим ли переход заказа из статуса ``old_status`` в ``new_status``.
+    """
+    return new_status in ORDER_TRANSITIONS.get(old_status, set())
+
+
+class OrderQuerySet(models.QuerySet):
+    """
+    Набор запросов для заказов.
+    """
+
+    def with_totals(self, shop_id=None):
+        """
+        Аннотирует сумму заказа и количество товаров.
+
+        Если указан магазин, учитываются только его позиции.
+        """
+        condition = Q(ordered_items__product_info__shop_id=shop_id) if shop_id else None
+        return self.annotate(
+            total_sum=Sum(
+                F("ordered_items__quantity") * F("ordered_items__product_info__price"),
+                filter=condition,
+            ),
+            items_count=Sum("ordered_items__quantity", filter=condition),
+        )
+
+    def with_items(self):
+        """
+        Догружает позиции заказов с товарами, параметрами и полным остатком.
+
+        Остаток шардированных товаров аннотируется в запросе предложений,
+        поэтому ``total_quantity`` не выполняет запрос на каждую позицию.
+        """
+        return self.prefetch_related(
+            Prefetch(
+                "ordered_items__product_info", queryset=ProductInfo.objects.with_stock_total()
+            ),
+            "ordered_items__product_info__product__category",
+            "ordered_items__product_info__product_parameters__parameter",
+        )
+
+
 class Order(models.Model):
     """
     Модель заказа.
@@ -46,6 +103,14 @@ class Order(models.Model):
 
     admin_email_sent = models.BooleanField(default=False)
     client_email_sent = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(
+        _("version"), default=0, help_text=_("Увеличивается при каждой смене статуса")
+    )
+
+    objects = OrderQuerySet.as_manager()
+
+    # Поля, изменение которых отслеживается между загрузкой и сохранением
+    TRACKED_FIELDS = ("state",)
 
     class Meta:
         """
@@ -67,6 +132,42 @@ class Order(models.Model):
         """
         return f"Заказ #{self.pk} создан {self.dt}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает загруженные значения отслеживаемых полей.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def get_dirty_fields(self) -> dict:
+        """
+        Отслеживаемые поля, измененные после загрузки: ``{поле: исходное значение}``.
+        """
+        loaded = getattr(self, "_loaded_values", {})
+        return {name: old for name, old in loaded.items() if getattr(self, name) != old}
+
+    def reset_tracking(self) -> None:
+        """
+        Считает текущие значения отслеживаемых полей сохраненными.
+        """
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: getattr(self, name) for name in self.TRACKED_FIELDS if name not in deferred
+        }
+
+    def save(self, *args, **kwargs):
+        """
+        Сохранение заказа; после него отслеживание изменений начинается заново.
+        """
+        super().save(*args, **kwargs)
+        self.reset_tracking()
+
     def get_total_sum(self):
         """
         Получить общую сумму заказа.
@@ -105,6 +206,10 @@ class OrderItem(models.Model):
         ProductInfo, related_name="ordered_items", on_delete=models.CASCADE
         )
     quantity = models.PositiveIntegerField(verbose_name="Количество")
+    # Цена на момент оформления; у позиций корзины не заполнена
+    price = models.DecimalField(
+        _("price"), max_digits=10, decimal_places=2, null=True, blank=True
+    )
 
     class Meta:
         """
@@ -139,6 +244,46 @@ class OrderItem(models.Model):
         except (AttributeError, TypeError):
             return 0
 
+
+class ShopOrder(models.Model):
+    """
+    Индекс заказов магазина.
+
+    Денормализованная связь магазина с заказами, содержащими его товары.
+    Заполняется при оформлении заказа и обновляется при смене статуса,
+    чтобы запросы партнёров выполнялись по одному индексу без соединения
+    позиций, товаров и магазинов.
+    """
+    shop = models.ForeignKey(
+        Shop, related_name="shop_orders", on_delete=models.CASCADE
+        )
+    order = models.ForeignKey(
+        Order, related_name="shop_orders", on_delete=models.CASCADE
+        )
+    state = models.CharField(_("state"), max_length=20, choices=OrderState.choices)
+    dt = models.DateTimeField()
+
+    class Meta:
+        """
+        Метаданные модели ShopOrder.
+        """
+        verbose_name = _("Заказ магазина")
+        verbose_name_plural = _("Заказы магазинов")
+        constraints = [
+            models.UniqueConstraint(fields=["shop", "order"], name="unique_shop_order")
+        ]
+        indexes = [
+            models.Index(fields=["shop", "dt", "order"]),
+            models.Index(fields=["shop", "state", "dt"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели ShopOrder.
+        """
+        return f"Заказ #{self.order_id} магазина #{self.shop_id}"
+
+
 class OrderStatusHistory(models.Model):
     """
     История изменений статуса заказа.
@@ -0,0 +1,45 @@
+"""
+Модели transactional outbox.
+"""
+from django.db import models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxEvent(models.Model):
+    """
+    Событие, записанное в той же транзакции, что и изменение данных.
+
+    Relay-задача пачками передает необработанные события обработчикам;
+    обработчик помечает событие ``processed_at`` в транзакции побочного
+    эффекта, поэтому повторная доставка того же события не дублирует письма.
+    Событие, не обработанное за OUTBOX_MAX_ATTEMPTS передач, получает
+    ``failed_at`` и ждет повторного запуска из админки.
+    """
+    topic = models.CharField(_("topic"), max_length=50)
+    aggregate_id = models.BigIntegerField(_("aggregate id"))
+    payload = models.JSONField(_("payload"), default=dict, blank=True)
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+    dispatched_at = models.DateTimeField(_("dispatched at"), null=True, blank=True)
+    processed_at = models.DateTimeField(_("processed at"), null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    failed_at = models.DateTimeField(_("failed at"), null=True, blank=True)
+
+    class Meta:
+        """
+        Метаданные модели OutboxEvent.
+        """
+        verbose_name = _("Событие outbox")
+        verbose_name_plural = _("События outbox")
+        indexes = [
+            models.Index(
+                fields=["id"], condition=Q(processed_at__isnull=True), name="outbox_pending_idx"
+            ),
+            models.Index(fields=["processed_at"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели OutboxEvent.
+        """
+        return f"{self.topic} #{self.aggregate_id}"
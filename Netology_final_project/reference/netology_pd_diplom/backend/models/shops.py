@@ -18,6 +18,7 @@ class Shop(models.Model):
     user = models.OneToOneField(
         User, verbose_name=_("user"), null=True, blank=True, on_delete=models.CASCADE)
     is_accepting_orders = models.BooleanField(_("accepting orders"), default=True)
+    order_digest = models.BooleanField(_("hourly order digest"), default=False)
 
     class Meta:
         """
@@ -0,0 +1,82 @@
+"""
+Модели относящиеся к складским резервам.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .catalog import ProductInfo
+from .orders import Order
+
+
+class StockHold(models.Model):
+    """
+    Временное удержание товара в корзине.
+
+    Создается при добавлении товара в корзину и действует до ``expires_at``.
+    Доступный остаток товара считается за вычетом активных удержаний;
+    просроченные записи удаляются периодической задачей.
+    """
+    product_info = models.ForeignKey(
+        ProductInfo, related_name="holds", on_delete=models.CASCADE
+        )
+    order = models.ForeignKey(
+        Order, related_name="stock_holds", on_delete=models.CASCADE
+        )
+    quantity = models.PositiveIntegerField(_("quantity"))
+    expires_at = models.DateTimeField(_("expires at"))
+
+    class Meta:
+        """
+        Метаданные модели StockHold.
+        """
+        verbose_name = _("Резерв товара")
+        verbose_name_plural = _("Резервы товаров")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "product_info"], name="unique_stock_hold"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["product_info", "expires_at"]),
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели StockHold.
+        """
+        return f"{self.quantity} шт. товара #{self.product_info_id} для заказа #{self.order_id}"
+
+
+class StockShard(models.Model):
+    """
+    Шард остатка горячего товара.
+
+    Остаток товара с ``stock_shards > 0`` распределяется по нескольким строкам,
+    чтобы одновременные резервы блокировали разные строки. Полный остаток —
+    ``ProductInfo.quantity`` плюс сумма шардов; периодическая консолидация
+    сворачивает шарды в основную строку и распределяет заново.
+    """
+    product_info = models.ForeignKey(
+        ProductInfo, related_name="shards", on_delete=models.CASCADE
+        )
+    shard_no = models.PositiveSmallIntegerField(_("shard number"))
+    quantity = models.PositiveIntegerField(_("quantity"), default=0)
+
+    class Meta:
+        """
+        Метаданные модели StockShard.
+        """
+        verbose_name = _("Шард остатка")
+        verbose_name_plural = _("Шарды остатков")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product_info", "shard_no"], name="unique_stock_shard"
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Строковое представление модели StockShard.
+        """
+        return f"Шард {self.shard_no} товара #{self.product_info_id}: {self.quantity} шт."
@@ -0,0 +1,151 @@
+"""
+Профилирование запросов по требованию.
+"""
+
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from backend.models import RequestProfile
+
+
+class CProfileProfiler:
+    """
+    Детерминированный профилировщик cProfile, результат — файл pstats.
+    """
+
+    mode = "cprofile"
+    extension = "pstats"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def dump(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler:
+    """
+    Семплирующий профилировщик потока запроса.
+
+    Фоновый поток раз в ``interval`` секунд снимает стек потока запроса
+    через ``sys._current_frames()`` и считает одинаковые стеки. Запрос
+    не замедляется трассировкой каждого вызова, как в cProfile; результат —
+    свернутые стеки (формат flamegraph.pl / speedscope), по строке на стек
+    от корня с числом выборок.
+    """
+
+    mode = "sampling"
+    extension = "collapsed"
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.PROFILING_SAMPLE_INTERVAL
+        self.stacks = Counter()
+        self.thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def start(self) -> None:
+        self.thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, samples in self.stacks.most_common():
+                file.write(f"{stack} {samples}\n")
+
+
+PROFILERS = {profiler.mode: profiler for profiler in (CProfileProfiler, SamplingProfiler)}
+
+
+class ProfileStorage:
+    """
+    Ограниченное хранилище профилей в каталоге PROFILING_DIR.
+
+    Хранится не более PROFILING_MAX_FILES последних профилей: после записи
+    нового профиля самые старые удаляются вместе с файлами.
+    """
+
+    @staticmethod
+    def path(file_name: str) -> str:
+        """
+        Полный путь к файлу профиля.
+        """
+        return os.path.join(settings.PROFILING_DIR, file_name)
+
+    @classmethod
+    def save(cls, profiler, request, response, view: str, request_id: str, duration: float):
+        """
+        Записывает профиль запроса и его метаданные.
+        """
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        # id запроса приходит из заголовка, поэтому в имя файла попадают только
+        # безопасные символы
+        tag = re.sub(r"[^\w.-]+", "_", f"{view}-{request_id}").lstrip(".")
+        file_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{tag}.{profiler.extension}"
+        profiler.dump(cls.path(file_name))
+        user = getattr(request, "user", None)
+        profile = RequestProfile.objects.create(
+            view=view,
+            request_id=request_id,
+            method=request.method,
+            path=request.path[:255],
+            status_code=response.status_code,
+            duration_ms=round(duration * 1000, 2),
+            mode=profiler.mode,
+            file_name=file_name,
+            user_id=user.id if user is not None and user.is_authenticated else None,
+        )
+        cls.prune()
+        return profile
+
+    @classmethod
+    def prune(cls) -> None:
+        """
+        Удаляет профили сверх PROFILING_MAX_FILES, начиная со старых.
+        """
+        stale = list(
+            RequestProfile.objects.order_by("-created_at", "-id")
+            .values_list("id", flat=True)[settings.PROFILING_MAX_FILES:]
+        )
+        if stale:
+            # Файлы удаляет обработчик post_delete
+            RequestProfile.objects.filter(id__in=stale).delete()
+
+    @classmethod
+    def remove(cls, file_name: str) -> None:
+        """
+        Удаляет файл профиля, если он еще есть.
+        """
+        try:
+            os.remove(cls.path(file_name))
+        except FileNotFoundError:
+            pass
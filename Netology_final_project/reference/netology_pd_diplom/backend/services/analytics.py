@@ -0,0 +1,232 @@
+"""
+Сервис агрегатов продаж магазинов.
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from backend.models.analytics import ShopProductSalesDaily, ShopSalesDaily
+from backend.models.archive import ArchivedOrderItem
+from backend.models.catalog import Product
+from backend.models.orders import OrderItem, OrderState
+from backend.models.shops import Shop
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+# Цена позиции на момент оформления; у заказов, оформленных до появления
+# поля, — текущая цена товара
+ITEM_PRICE = Coalesce(F("price"), F("product_info__price"))
+
+
+class SalesRollupService:
+    """
+    Инкрементальное обновление дневных агрегатов продаж.
+
+    Агрегаты меняются в той же транзакции, что и статус заказа: строки старого
+    статуса уменьшаются, строки нового — увеличиваются атомарным
+    ``UPDATE ... SET x = x + delta``, без чтения текущих значений. Выручка
+    считается по цене, записанной в позицию при оформлении, поэтому
+    уменьшение и увеличение всегда используют одну и ту же сумму.
+    """
+
+    @staticmethod
+    def _increment(model, keys: dict, deltas: dict, count_field: str) -> None:
+        """
+        Прибавляет значения к строке агрегата, создавая её при отсутствии.
+
+        Строка, у которой после уменьшения ``count_field`` стал нулем, удаляется.
+        """
+        increments = {field: F(field) + value for field, value in deltas.items()}
+        if model.objects.filter(**keys).update(**increments):
+            if deltas[count_field] < 0:
+                model.objects.filter(**keys, **{count_field: 0}).delete()
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**keys, **deltas)
+        except IntegrityError:
+            # Строку успел создать параллельный запрос
+            model.objects.filter(**keys).update(**increments)
+
+    @classmethod
+    def apply_transitions(cls, transitions: Iterable[tuple]) -> None:
+        """
+        Учитывает смены статуса ``(order_id, old_status, new_status)`` в агрегатах.
+
+        Позиции всех заказов читаются одним запросом, разницы суммируются по
+        строкам агрегатов; корзина в агрегаты не входит.
+        """
+        moves = {order_id: (old, new) for order_id, old, new in transitions}
+        if not moves:
+            return
+        rows = (
+            OrderItem.objects.filter(order_id__in=moves)
+            .values(
+                "order_id", "order__dt", "product_info__shop_id", "product_info__product_id"
+            )
+            .annotate(
+                units=Sum("quantity"),
+                revenue=Sum(F("quantity") * ITEM_PRICE),
+            )
+            .order_by()
+        )
+
+        shop_deltas = defaultdict(lambda: [0, 0, 0])
+        product_deltas = defaultdict(lambda: [0, 0])
+        counted = set()
+        for row in rows:
+            date = timezone.localdate(row["order__dt"])
+            shop_id = row["product_info__shop_id"]
+            for state, sign in zip(moves[row["order_id"]], (-1, 1)):
+                if state == OrderState.BASKET:
+                    continue
+                shop_delta = shop_deltas[(shop_id, date, state)]
+                if (row["order_id"], shop_id, state) not in counted:
+                    counted.add((row["order_id"], shop_id, state))
+                    shop_delta[0] += sign
+                shop_delta[1] += sign * row["units"]
+                shop_delta[2] += sign * row["revenue"]
+                product_delta = product_deltas[
+                    (shop_id, row["product_info__product_id"], date, state)
+                ]
+                product_delta[0] += sign * row["units"]
+                product_delta[1] += sign * row["revenue"]
+
+        # Встречные переходы в одном пакете взаимно гасятся: строки с нулевой
+        # разницей не обновляются. Строки меняются в порядке ключей, чтобы
+        # параллельные пакеты блокировали их в одном порядке
+        for (shop_id, date, state), (orders, units, revenue) in sorted(shop_deltas.items()):
+            if not (orders or units or revenue):
+                continue
+            cls._increment(
+                ShopSalesDaily,
+                {"shop_id": shop_id, "date": date, "state": state},
+                {"orders_count": orders, "units": units, "revenue": revenue},
+                "orders_count",
+            )
+        for (shop_id, product_id, date, state), (units, revenue) in sorted(product_deltas.items()):
+            if not (units or revenue):
+                continue
+            cls._increment(
+                ShopProductSalesDaily,
+                {"shop_id": shop_id, "product_id": product_id, "date": date, "state": state},
+                {"units": units, "revenue": revenue},
+                "units",
+            )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(date_from=None, date_to=None, batch_size: int = 1000) -> int:
+        """
+        Пересчитывает агрегаты за период по рабочим и архивным заказам.
+
+        Возвращает количество созданных строк дневных агрегатов магазинов.
+        """
+        live = OrderItem.objects.exclude(order__state=OrderState.BASKET)
+        archived = ArchivedOrderItem.objects.filter(
+            shop_id__in=Shop.objects.values("id"), product_id__in=Product.objects.values("id")
+        )
+        rollups = [ShopSalesDaily.objects.all(), ShopProductSalesDaily.objects.all()]
+        if date_from:
+            live = live.filter(order__dt__date__gte=date_from)
+            archived = archived.filter(order__dt__date__gte=date_from)
+            rollups = [rollup.filter(date__gte=date_from) for rollup in rollups]
+        if date_to:
+            live = live.filter(order__dt__date__lte=date_to)
+            archived = archived.filter(order__dt__date__lte=date_to)
+            rollups = [rollup.filter(date__lte=date_to) for rollup in rollups]
+        for rollup in rollups:
+            rollup.delete()
+
+        shop_rows = defaultdict(lambda: [0, 0, 0])
+        product_rows = defaultdict(lambda: [0, 0])
+        sources = (
+            (live, "product_info__shop_id", "product_info__product_id", ITEM_PRICE),
+            (archived, "shop_id", "product_id", F("price")),
+        )
+        for queryset, shop_field, product_field, price in sources:
+            queryset = queryset.annotate(day=TruncDate("order__dt")).order_by()
+            revenue = Sum(F("quantity") * price)
+            for row in queryset.values(shop_field, "day", "order__state").annotate(
+                orders=Count("order_id", distinct=True), units=Sum("quantity"), revenue=revenue
+            ):
+                shop_row = shop_rows[(row[shop_field], row["day"], row["order__state"])]
+                shop_row[0] += row["orders"]
+                shop_row[1] += row["units"]
+                shop_row[2] += row["revenue"]
+            for row in queryset.values(shop_field, product_field, "day", "order__state").annotate(
+                units=Sum("quantity"), revenue=revenue
+            ):
+                product_row = product_rows[
+                    (row[shop_field], row[product_field], row["day"], row["order__state"])
+                ]
+                product_row[0] += row["units"]
+                product_row[1] += row["revenue"]
+
+        ShopSalesDaily.objects.bulk_create(
+            [
+                ShopSalesDaily(
+                    shop_id=shop_id, date=date, state=state,
+                    orders_count=orders, units=units, revenue=revenue,
+                )
+                for (shop_id, date, state), (orders, units, revenue) in shop_rows.items()
+            ],
+            batch_size=batch_size,
+        )
+        ShopProductSalesDaily.objects.bulk_create(
+            [
+                ShopProductSalesDaily(
+                    shop_id=shop_id, product_id=product_id, date=date, state=state,
+                    units=units, revenue=revenue,
+                )
+                for (shop_id, product_id, date, state), (units, revenue) in product_rows.items()
+            ],
+            batch_size=batch_size,
+        )
+        return len(shop_rows)
+
+    @staticmethod
+    def report(
+        shop_id: int, date_from, date_to, group_by: str = "day",
+        states: Optional[list] = None, limit: int = 20,
+    ) -> dict:
+        """
+        Итоги и строки отчета по агрегатам магазина за период.
+
+        ``group_by``: ``day``, ``status`` или ``product``.
+        """
+        shop_rollup = ShopSalesDaily.objects.filter(
+            shop_id=shop_id, date__gte=date_from, date__lte=date_to
+        )
+        if states:
+            shop_rollup = shop_rollup.filter(state__in=states)
+        totals = shop_rollup.aggregate(
+            orders=Sum("orders_count"), units=Sum("units"), revenue=Sum("revenue")
+        )
+
+        if group_by == "product":
+            product_rollup = ShopProductSalesDaily.objects.filter(
+                shop_id=shop_id, date__gte=date_from, date__lte=date_to
+            )
+            if states:
+                product_rollup = product_rollup.filter(state__in=states)
+            rows = list(
+                product_rollup.values("product_id", name=F("product__name"))
+                .annotate(units=Sum("units"), revenue=Sum("revenue"))
+                .order_by("-revenue", "product_id")[:limit]
+            )
+        else:
+            field = "date" if group_by == "day" else "state"
+            rows = list(
+                shop_rollup.values(field)
+                .annotate(
+                    orders=Sum("orders_count"), units=Sum("units"), revenue=Sum("revenue")
+                )
+                .order_by(field)
+            )
+        return {
+            "totals": {key: value or 0 for key, value in totals.items()},
+            "rows": rows,
+        }
@@ -0,0 +1,153 @@
+"""
+Сервис архивации завершенных заказов.
+"""
+
+from datetime import timedelta
+
+from backend.models.archive import ArchivedOrder, ArchivedOrderItem, ArchivedOrderStatusHistory
+from backend.models.notifications import PendingNotification
+from backend.models.orders import Order, OrderItem, OrderState, OrderStatusHistory
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+CONTACT_FIELDS = ("city", "street", "house", "structure", "building", "apartment", "phone")
+
+
+class ArchiveService:
+    """
+    Перенос доставленных и отмененных заказов в архивные таблицы.
+
+    Заказ копируется вместе с позициями и историей статусов и удаляется
+    из рабочих таблиц в той же транзакции; связанные строки ShopOrder
+    и StockHold удаляются каскадом. Заказы с неотправленными отложенными
+    уведомлениями пропускаются до следующего запуска, чтобы каскад не
+    удалил уведомления.
+    """
+
+    FINAL_STATES = (OrderState.DELIVERED, OrderState.CANCELED)
+
+    @staticmethod
+    def cutoff(days: int):
+        """
+        Граница архивации: заказы, последний статус которых установлен раньше,
+        переносятся в архив.
+        """
+        return timezone.now() - timedelta(days=days)
+
+    @staticmethod
+    def _snapshot_contact(contact) -> dict:
+        """
+        Снимок адреса доставки на момент архивации.
+        """
+        if contact is None:
+            return None
+        return {field: getattr(contact, field) for field in CONTACT_FIELDS}
+
+    @classmethod
+    def archive_batch(cls, before, batch_size: int = 500) -> int:
+        """
+        Переносит в архив одну пачку заказов, возвращает их количество.
+        """
+        with transaction.atomic():
+            changed_since = OrderStatusHistory.objects.filter(
+                order=OuterRef("pk"), changed_at__gte=before
+            )
+            pending = PendingNotification.objects.filter(order=OuterRef("pk"))
+            orders = list(
+                Order.objects.filter(state__in=cls.FINAL_STATES, dt__lt=before)
+                .exclude(Exists(changed_since))
+                .exclude(Exists(pending))
+                .select_related("contact")
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("id")[:batch_size]
+            )
+            if not orders:
+                return 0
+            order_ids = [order.id for order in orders]
+
+            items = list(
+                OrderItem.objects.filter(order_id__in=order_ids)
+                .order_by("id")
+                .values_list(
+                    "order_id",
+                    "product_info_id",
+                    "product_info__product_id",
+                    "product_info__shop_id",
+                    "product_info__product__name",
+                    "product_info__shop__name",
+                    Coalesce("price", "product_info__price"),
+                    "quantity",
+                )
+            )
+            totals = {order_id: [0, 0] for order_id in order_ids}
+            for order_id, *_, price, quantity in items:
+                totals[order_id][0] += price * quantity
+                totals[order_id][1] += quantity
+
+            ArchivedOrder.objects.bulk_create(
+                ArchivedOrder(
+                    id=order.id,
+                    user_id=order.user_id,
+                    dt=order.dt,
+                    state=order.state,
+                    total_sum=totals[order.id][0],
+                    items_count=totals[order.id][1],
+                    contact=cls._snapshot_contact(order.contact),
+                )
+                for order in orders
+            )
+            ArchivedOrderItem.objects.bulk_create(
+                ArchivedOrderItem(
+                    order_id=order_id,
+                    product_info_id=product_info_id,
+                    product_id=product_id,
+                    shop_id=shop_id,
+                    product_name=product_name,
+                    shop_name=shop_name or "",
+                    price=price,
+                    quantity=quantity,
+                )
+                for (
+                    order_id, product_info_id, product_id, shop_id,
+                    product_name, shop_name, price, quantity,
+                ) in items
+            )
+            ArchivedOrderStatusHistory.objects.bulk_create(
+                ArchivedOrderStatusHistory(
+                    order_id=order_id,
+                    old_status=old_status,
+                    new_status=new_status,
+                    changed_by_id=changed_by_id,
+                    changed_at=changed_at,
+                    comment=comment,
+                )
+                for order_id, old_status, new_status, changed_by_id, changed_at, comment
+                in OrderStatusHistory.objects.filter(order_id__in=order_ids)
+                .order_by("id")
+                .values_list(
+                    "order_id", "old_status", "new_status", "changed_by_id", "changed_at", "comment"
+                )
+            )
+            Order.objects.filter(id__in=order_ids).delete()
+        return len(orders)
+
+    @classmethod
+    def archive(cls, days: int, batch_size: int = 500, max_batches: int = None) -> int:
+        """
+        Переносит в архив заказы старше ``days`` дней пачками по ``batch_size``.
+
+        Каждая пачка выполняется в отдельной транзакции, чтобы не держать
+        блокировки на всё время архивации. Возвращает общее количество заказов.
+        """
+        before = cls.cutoff(days)
+        archived_total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            archived = cls.archive_batch(before, batch_size)
+            archived_total += archived
+            batches += 1
+            if archived < batch_size:
+                break
+        return archived_total
@@ -0,0 +1,272 @@
+"""
+Очередь исходящих писем и пакетный диспетчер отправки.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+from email.utils import parseaddr
+
+from backend.models.emails import OutgoingEmail
+from backend.models.logs import EmailLog
+from backend.models.users import User
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+# Служебные заголовки: сохраняются в очереди и не попадают в письмо
+EMAIL_TYPE_HEADER = "X-Email-Type"
+ORDER_HEADER = "X-Order-Id"
+
+RATE_WINDOW = timedelta(minutes=1)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Почтовый бэкенд, складывающий письма в очередь ``OutgoingEmail``.
+
+    Подключается через EMAIL_BACKEND; реальная отправка выполняется
+    диспетчером через EMAIL_DISPATCH_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        rows = [
+            EmailDispatcher.to_row(message)
+            for message in email_messages
+            if message.recipients()
+        ]
+        EmailDispatcher.assign_users(rows)
+        OutgoingEmail.objects.bulk_create(rows)
+        return len(rows)
+
+
+class EmailDispatcher:
+    """
+    Отправка писем из очереди пачками через одно соединение.
+
+    За один проход выбирается пачка ожидающих писем (``SKIP LOCKED``), письма
+    доменов, исчерпавших лимит EMAIL_DOMAIN_RATE_LIMITS за последнюю минуту,
+    остаются в очереди. Результаты пишутся в ``EmailLog`` одним ``bulk_create``.
+    """
+
+    @staticmethod
+    def domain(address: str) -> str:
+        """
+        Домен адреса получателя в нижнем регистре.
+        """
+        return parseaddr(address)[1].rpartition("@")[2].lower()
+
+    @staticmethod
+    def rate_limit(domain: str) -> int:
+        """
+        Лимит писем в минуту для домена.
+        """
+        limits = settings.EMAIL_DOMAIN_RATE_LIMITS
+        return limits.get(domain, limits["default"])
+
+    @classmethod
+    def to_row(cls, message) -> OutgoingEmail:
+        """
+        Строка очереди для письма Django.
+        """
+        headers = dict(message.extra_headers)
+        email_type = headers.pop(EMAIL_TYPE_HEADER, "")
+        order_id = headers.pop(ORDER_HEADER, None)
+        html_body = next(
+            (content for content, mimetype in getattr(message, "alternatives", [])
+             if mimetype == "text/html"),
+            "",
+        )
+        return OutgoingEmail(
+            from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            headers=headers,
+            subject=message.subject,
+            body=message.body,
+            html_body=html_body,
+            domain=cls.domain(message.recipients()[0]),
+            email_type=email_type,
+            order_id=order_id,
+            send_after=timezone.now(),
+        )
+
+    @staticmethod
+    def assign_users(rows: list) -> None:
+        """
+        Проставляет пользователя по первому адресату письма одним запросом.
+        """
+        recipients = {(row.to + row.cc + row.bcc)[0] for row in rows}
+        users = dict(User.objects.filter(email__in=recipients).values_list("email", "id"))
+        for row in rows:
+            row.user_id = users.get((row.to + row.cc + row.bcc)[0])
+
+    @staticmethod
+    def to_message(email: OutgoingEmail, connection=None) -> EmailMultiAlternatives:
+        """
+        Письмо Django по строке очереди.
+        """
+        message = EmailMultiAlternatives(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=email.to,
+            cc=email.cc,
+            bcc=email.bcc,
+            reply_to=email.reply_to,
+            headers=email.headers,
+            connection=connection,
+        )
+        if email.html_body:
+            message.attach_alternative(email.html_body, "text/html")
+        return message
+
+    @classmethod
+    def _budgets(cls, now) -> dict:
+        """
+        Отправленные за последнюю минуту письма по доменам.
+        """
+        return dict(
+            OutgoingEmail.objects.filter(
+                status=OutgoingEmail.Status.SENT, sent_at__gte=now - RATE_WINDOW
+            )
+            .values("domain")
+            .annotate(sent=Count("id"))
+            .values_list("domain", "sent")
+        )
+
+    @classmethod
+    def claim(cls, batch_size: int, now) -> list:
+        """
+        Забирает пачку писем на отправку с учетом лимитов доменов.
+
+        Забранные письма откладываются на EMAIL_DISPATCH_LEASE секунд: если
+        процесс упадет, письма вернутся в очередь после истечения аренды.
+        """
+        sent_recently = cls._budgets(now)
+        exhausted = [
+            domain for domain, sent in sent_recently.items() if sent >= cls.rate_limit(domain)
+        ]
+        with transaction.atomic():
+            candidates = list(
+                OutgoingEmail.objects.filter(
+                    status=OutgoingEmail.Status.PENDING, send_after__lte=now
+                )
+                .exclude(domain__in=exhausted)
+                .select_for_update(skip_locked=True)
+                .order_by("send_after", "id")[:batch_size]
+            )
+            taken = Counter()
+            emails = []
+            for email in candidates:
+                if sent_recently.get(email.domain, 0) + taken[email.domain] < cls.rate_limit(
+                    email.domain
+                ):
+                    taken[email.domain] += 1
+                    email.attempts += 1
+                    emails.append(email)
+            OutgoingEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                send_after=now + timedelta(seconds=settings.EMAIL_DISPATCH_LEASE),
+                attempts=F("attempts") + 1,
+            )
+        return emails
+
+    @classmethod
+    def drain(cls, batch_size: int = None, connection=None) -> dict:
+        """
+        Отправляет одну пачку писем, возвращает количество отправленных и ошибок.
+        """
+        now = timezone.now()
+        emails = cls.claim(batch_size or settings.EMAIL_DISPATCH_BATCH, now)
+        if not emails:
+            return {"sent": 0, "failed": 0}
+
+        connection = connection or get_connection(settings.EMAIL_DISPATCH_BACKEND)
+        sent, errors = [], {}
+        with connection:
+            for email in emails:
+                # По одному письму на вызов через открытое соединение: ошибка одного
+                # письма не требует повторной отправки остальных писем пачки
+                try:
+                    connection.send_messages([cls.to_message(email, connection)])
+                except Exception as error:
+                    errors[email.id] = str(error) or error.__class__.__name__
+                else:
+                    sent.append(email)
+
+        cls._finish(sent, [email for email in emails if email.id in errors], errors)
+        return {"sent": len(sent), "failed": len(errors)}
+
+    @classmethod
+    def drain_all(cls, max_batches: int = 10, connection=None) -> int:
+        """
+        Отправляет пачки, пока очередь не опустеет или не исчерпан лимит пачек.
+        """
+        sent_total = 0
+        for _ in range(max_batches):
+            result = cls.drain(connection=connection)
+            sent_total += result["sent"]
+            if not result["sent"] + result["failed"]:
+                break
+        return sent_total
+
+    @staticmethod
+    def sweep(days: int) -> int:
+        """
+        Удаляет отправленные и неотправленные окончательно письма старше ``days`` дней.
+        """
+        before = timezone.now() - timedelta(days=days)
+        return OutgoingEmail.objects.filter(
+            status__in=[OutgoingEmail.Status.SENT, OutgoingEmail.Status.FAILED],
+            created_at__lt=before,
+        ).delete()[0]
+
+    @classmethod
+    def _finish(cls, sent: list, failed: list, errors: dict) -> None:
+        """
+        Фиксирует результат отправки в очереди и в EmailLog.
+        """
+        now = timezone.now()
+        OutgoingEmail.objects.filter(id__in=[email.id for email in sent]).update(
+            status=OutgoingEmail.Status.SENT, sent_at=now, error_message=""
+        )
+
+        final_failures = []
+        failures_by_error = defaultdict(list)
+        retries = defaultdict(list)
+        for email in failed:
+            if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                final_failures.append(email)
+                failures_by_error[errors[email.id]].append(email.id)
+            else:
+                retries[email.attempts].append(email.id)
+        for error_message, ids in failures_by_error.items():
+            OutgoingEmail.objects.filter(id__in=ids).update(
+                status=OutgoingEmail.Status.FAILED, error_message=error_message
+            )
+        for attempts, ids in retries.items():
+            OutgoingEmail.objects.filter(id__in=ids).update(
+                send_after=now + timedelta(minutes=attempts)
+            )
+
+        logged = sent + final_failures
+        if not logged:
+            return
+        EmailLog.objects.bulk_create(
+            [
+                EmailLog(
+                    user_id=email.user_id,
+                    email=(email.to + email.cc + email.bcc)[0],
+                    subject=email.subject[:255],
+                    email_type=email.email_type or "other",
+                    status=email.id not in errors,
+                    error_message=errors.get(email.id, ""),
+                    order_id=email.order_id,
+                )
+                for email in logged
+            ]
+        )
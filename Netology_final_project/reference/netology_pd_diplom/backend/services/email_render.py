@@ -0,0 +1,78 @@
+"""
+Рендеринг писем по заказам.
+"""
+
+from typing import Iterable
+
+from backend.models.orders import Order, OrderItem
+from backend.services.email_dispatch import EMAIL_TYPE_HEADER, ORDER_HEADER
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import Prefetch
+from django.template.loader import get_template
+
+ORDER_CONFIRMATION = "order_confirmation"
+ORDER_STATUS = "order_status"
+
+
+class OrderEmailRenderer:
+    """
+    Рендеринг писем покупателям по заказам пачкой.
+
+    Шаблоны берутся через кешируемый загрузчик и компилируются один раз на процесс.
+    Заказы пачки загружаются вместе с покупателями и позициями двумя запросами,
+    поэтому шаблон не обращается к базе при обходе ``order.user`` и позиций.
+    """
+
+    EMAILS = {
+        ORDER_CONFIRMATION: ("emails/order_confirmation.html", "Заказ #{id} подтвержден"),
+        ORDER_STATUS: ("emails/order_status.html", "Статус заказа #{id} изменен"),
+    }
+
+    @staticmethod
+    def load_orders(order_ids: Iterable[int]) -> list:
+        """
+        Заказы с покупателями, позициями и товарами в порядке id.
+        """
+        items = OrderItem.objects.select_related("product_info__product").order_by("id")
+        return list(
+            Order.objects.filter(id__in=list(order_ids), user__isnull=False)
+            .select_related("user")
+            .prefetch_related(Prefetch("ordered_items", queryset=items))
+            .order_by("id")
+        )
+
+    @classmethod
+    def render(cls, kind: str, orders: Iterable[Order]) -> list:
+        """
+        Пары ``(тема, html)`` для заказов, уже загруженных через ``load_orders``.
+        """
+        template_name, subject = cls.EMAILS[kind]
+        template = get_template(template_name)
+        return [
+            (
+                subject.format(id=order.id),
+                template.render({"order": order, "user": order.user}),
+            )
+            for order in orders
+        ]
+
+    @classmethod
+    def build_messages(cls, kind: str, orders: Iterable[Order], connection=None) -> list:
+        """
+        Письма Django по заказам пачки.
+        """
+        orders = list(orders)
+        messages = []
+        for order, (subject, html) in zip(orders, cls.render(kind, orders)):
+            message = EmailMultiAlternatives(
+                subject=subject,
+                body=html,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[order.user.email],
+                headers={EMAIL_TYPE_HEADER: kind, ORDER_HEADER: str(order.id)},
+                connection=connection,
+            )
+            message.attach_alternative(html, "text/html")
+            messages.append(message)
+        return messages
@@ -3,8 +3,9 @@
 """
 
 from backend.models import ConfirmEmailToken
+from backend.services.email_render import ORDER_CONFIRMATION, ORDER_STATUS, OrderEmailRenderer
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import get_connection, send_mail
 from django.template.loader import render_to_string
 
 
@@ -40,49 +41,35 @@ def send_confirmation_email(user):
         return False
 
 
-def send_order_confirmation_email(order):
+def send_order_emails(kind, order_ids, connection=None) -> int:
     """
-    Отправка email о подтверждении заказа.
-    """
-    subject = f"Заказ #{order.id} подтвержден"
-
-    message = render_to_string(
-        "emails/order_confirmation.html",
-        {
-            "order": order,
-            "user": order.user,
-        },
-    )
+    Отправка писем одного вида по нескольким заказам.
 
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[order.user.email],
-        html_message=message,
-        fail_silently=False,
+    Заказы загружаются и рендерятся пачкой, письма передаются
+    в соединение одним вызовом. Возвращает количество писем.
+    """
+    orders = OrderEmailRenderer.load_orders(order_ids)
+    if not orders:
+        return 0
+    connection = connection or get_connection()
+    return connection.send_messages(
+        OrderEmailRenderer.build_messages(kind, orders, connection=connection)
     )
 
 
-def send_order_status_email(order):
+def send_order_confirmation_email(order, connection=None):
     """
-    Отправка email об изменении статуса заказа.
+    Отправка email о подтверждении заказа.
+
+    Для пакетной отправки можно передать открытое соединение.
     """
-    subject = f"Статус заказа #{order.id} изменен"
+    send_order_emails(ORDER_CONFIRMATION, [order.id], connection)
 
-    message = render_to_string(
-        "emails/order_status.html",
-        {
-            "order": order,
-            "user": order.user,
-        },
-    )
 
-    send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[order.user.email],
-        html_message=message,
-        fail_silently=False,
-    )
+def send_order_status_email(order, connection=None):
+    """
+    Отправка email об изменении статуса заказа.
+
+    Для пакетной отправки можно передать открытое соединение.
+    """
+    send_order_emails(ORDER_STATUS, [order.id], connection)
@@ -2,10 +2,16 @@
 Сервисы отвечающие за бизнес логику.
 """
 
+import random
+from datetime import timedelta
+
 from backend.models.catalog import ProductInfo
 from backend.models.orders import Order
+from backend.models.stock import StockHold, StockShard
+from django.conf import settings
 from django.db import transaction
-from django.db.models import F
+from django.db.models import Case, F, PositiveIntegerField, Q, Sum, When
+from django.utils import timezone
 
 
 class InventoryError(Exception):
@@ -19,29 +25,101 @@ class InventoryService:
     Сервис для управления складскими запасами и резервированием товаров.
     """
 
+    @staticmethod
+    def _required_quantities(order: Order) -> tuple:
+        """
+        Суммарное количество каждого товара в заказе.
+
+        Возвращает пару словарей: обычные товары и шардированные товары
+        (для последних значение — пара ``(количество, число шардов)``).
+        """
+        rows = (
+            order.ordered_items.order_by()
+            .values("product_info_id", "product_info__stock_shards")
+            .annotate(need=Sum("quantity"))
+        )
+        plain, sharded = {}, {}
+        for row in rows:
+            shards = row["product_info__stock_shards"]
+            if shards:
+                sharded[row["product_info_id"]] = (row["need"], shards)
+            else:
+                plain[row["product_info_id"]] = row["need"]
+        return plain, sharded
+
+    @staticmethod
+    def _quantity_delta(required: dict, sign: int) -> Case:
+        """
+        Выражение изменения остатка сразу для нескольких товаров.
+        """
+        return Case(
+            *[
+                When(id=pid, then=F("quantity") + sign * qty)
+                for pid, qty in required.items()
+            ],
+            default=F("quantity"),
+            output_field=PositiveIntegerField(),
+        )
+
+    @staticmethod
+    def _lock_sorted(product_ids) -> dict:
+        """
+        Блокирует строки товаров в порядке возрастания id и возвращает остатки.
+
+        Единый порядок захвата блокировок исключает взаимные блокировки
+        при одновременном оформлении пересекающихся корзин.
+        """
+        return dict(
+            ProductInfo.objects.filter(id__in=product_ids)
+            .order_by("id")
+            .select_for_update()
+            .values_list("id", "quantity")
+        )
+
     @staticmethod
     def reserve_for_order(order: Order) -> None:
         """
         Резервирует товары для заказа атомарно.
+
+        Остаток проверяется за вычетом резервов чужих корзин. Списания
+        обычных товаров выполняются одним условным UPDATE: строка меняется,
+        только если остатка хватает. Шардированные товары списываются
+        с одного из шардов (см. ``StockShardService``).
         """
         with transaction.atomic():
-            required = {}
-            for item in order.ordered_items.select_related("product_info"):
-                pid = item.product_info_id
-                required.setdefault(pid, 0)
-                required[pid] += item.quantity
+            required, sharded = InventoryService._required_quantities(order)
+            if not required and not sharded:
+                return
 
-            qset = ProductInfo.objects.filter(
-                id__in=required.keys()
-            ).select_for_update()
-            avail_map = {p.id: p.quantity for p in qset}
+            held = StockHoldService.held_by_others(order, [*required, *sharded])
+            if required:
+                InventoryService._reserve_plain(required, held)
+            for pid in sorted(sharded):
+                need, shards = sharded[pid]
+                StockShardService.reserve(pid, need, shards, held.get(pid, 0))
 
-            for pid, need in required.items():
-                if avail_map.get(pid, 0) < need:
-                    raise InventoryError(f"Not enough stock for product_info {pid}")
+    @staticmethod
+    def _reserve_plain(required: dict, held: dict) -> None:
+        """
+        Списывает обычные товары одним условным UPDATE.
+        """
+        stock = InventoryService._lock_sorted(required.keys())
+        short = sorted(
+            pid for pid, need in required.items()
+            if stock.get(pid, 0) - held.get(pid, 0) < need
+        )
+        if short:
+            raise InventoryError(f"Not enough stock for product_info {short}")
 
-            for pid, need in required.items():
-                ProductInfo.objects.filter(id=pid).update(quantity=F("quantity") - need)
+        condition = Q()
+        for pid, need in required.items():
+            condition |= Q(id=pid, quantity__gte=need)
+
+        updated = ProductInfo.objects.filter(condition).update(
+            quantity=InventoryService._quantity_delta(required, -1)
+        )
+        if updated != len(required):
+            raise InventoryError("Stock changed during reservation")
 
     @staticmethod
     def release_for_order(order: Order) -> None:
@@ -49,11 +127,223 @@ class InventoryService:
         Возвращает резерв назад на склад.
         """
         with transaction.atomic():
-            required = {}
-            for item in order.ordered_items.select_related("product_info"):
-                pid = item.product_info_id
-                required.setdefault(pid, 0)
-                required[pid] += item.quantity
-
-            for pid, qty in required.items():
-                ProductInfo.objects.filter(id=pid).update(quantity=F("quantity") + qty)
+            required, sharded = InventoryService._required_quantities(order)
+            if required:
+                InventoryService._lock_sorted(required.keys())
+                ProductInfo.objects.filter(id__in=required.keys()).update(
+                    quantity=InventoryService._quantity_delta(required, 1)
+                )
+            for pid in sorted(sharded):
+                need, shards = sharded[pid]
+                StockShardService.release(pid, need, shards)
+
+
+class StockShardService:
+    """
+    Сервис шардированных остатков горячих товаров.
+
+    Резерв пытается списать количество одним условным UPDATE со случайного
+    шарда, поэтому одновременные оформления блокируют разные строки.
+    Если остаток раздроблен и ни одного шарда не хватает, строка товара
+    и все шарды блокируются и списание идет из суммы.
+    """
+
+    @staticmethod
+    def _take(product_id: int, shard_no: int, need: int) -> bool:
+        """
+        Условное списание с одного шарда.
+        """
+        return bool(
+            StockShard.objects.filter(
+                product_info_id=product_id, shard_no=shard_no, quantity__gte=need
+            ).update(quantity=F("quantity") - need)
+        )
+
+    @staticmethod
+    def reserve(product_id: int, need: int, shards: int, held: int = 0) -> None:
+        """
+        Списывает количество с шардов товара.
+        """
+        if held:
+            total = ProductInfo.objects.with_stock_total().values_list(
+                "stock_total", flat=True
+            ).get(id=product_id)
+            if total - held < need:
+                raise InventoryError(f"Not enough stock for product_info [{product_id}]")
+
+        if StockShardService._take(product_id, random.randrange(shards), need):
+            return
+
+        candidate = (
+            StockShard.objects.filter(product_info_id=product_id, quantity__gte=need)
+            .order_by("-quantity")
+            .values_list("shard_no", flat=True)
+            .first()
+        )
+        if candidate is not None and StockShardService._take(product_id, candidate, need):
+            return
+
+        product, shard_rows = StockShardService._lock(product_id)
+        total = product.quantity + sum(shard.quantity for shard in shard_rows)
+        if total < need:
+            raise InventoryError(f"Not enough stock for product_info [{product_id}]")
+        StockShard.objects.filter(product_info_id=product_id).update(quantity=0)
+        ProductInfo.objects.filter(id=product_id).update(quantity=total - need)
+
+    @staticmethod
+    def release(product_id: int, quantity: int, shards: int) -> None:
+        """
+        Возвращает количество на случайный шард (или в основную строку).
+        """
+        returned = StockShard.objects.filter(
+            product_info_id=product_id, shard_no=random.randrange(shards)
+        ).update(quantity=F("quantity") + quantity)
+        if not returned:
+            ProductInfo.objects.filter(id=product_id).update(quantity=F("quantity") + quantity)
+
+    @staticmethod
+    def _lock(product_id: int) -> tuple:
+        """
+        Блокирует строку товара, затем его шарды по возрастанию номера.
+        """
+        product = ProductInfo.objects.select_for_update().get(id=product_id)
+        shard_rows = list(
+            StockShard.objects.filter(product_info_id=product_id)
+            .order_by("shard_no")
+            .select_for_update()
+        )
+        return product, shard_rows
+
+    @staticmethod
+    def consolidate(product_id: int) -> None:
+        """
+        Сворачивает шарды в основную строку и распределяет остаток заново.
+
+        Количество шардов берется из ``ProductInfo.stock_shards``; лишние
+        шарды удаляются, при ``stock_shards = 0`` весь остаток остается
+        в основной строке.
+        """
+        with transaction.atomic():
+            product, shard_rows = StockShardService._lock(product_id)
+            total = product.quantity + sum(shard.quantity for shard in shard_rows)
+            count = product.stock_shards
+            per_shard, remainder = divmod(total, count) if count else (0, total)
+
+            StockShard.objects.filter(
+                product_info_id=product_id, shard_no__gte=count
+            ).delete()
+            StockShard.objects.bulk_create(
+                [
+                    StockShard(product_info_id=product_id, shard_no=number, quantity=per_shard)
+                    for number in range(count)
+                ],
+                update_conflicts=True,
+                unique_fields=["product_info", "shard_no"],
+                update_fields=["quantity"],
+            )
+            ProductInfo.objects.filter(id=product_id).update(quantity=remainder)
+
+    @staticmethod
+    def consolidate_all() -> int:
+        """
+        Консолидирует все шардированные товары, возвращает их количество.
+        """
+        product_ids = list(
+            ProductInfo.objects.filter(Q(stock_shards__gt=0) | Q(shards__isnull=False))
+            .order_by("id")
+            .values_list("id", flat=True)
+            .distinct()
+        )
+        for product_id in product_ids:
+            StockShardService.consolidate(product_id)
+        return len(product_ids)
+
+
+class StockHoldService:
+    """
+    Сервис временных резервов товаров в корзинах.
+    """
+
+    @staticmethod
+    def expires_at():
+        """
+        Срок действия нового или продленного резерва.
+        """
+        return timezone.now() + timedelta(seconds=settings.STOCK_HOLD_TTL)
+
+    @staticmethod
+    def held_by_others(order: Order, product_ids) -> dict:
+        """
+        Активные резервы других корзин по товарам одним запросом.
+        """
+        rows = (
+            StockHold.objects.filter(
+                product_info_id__in=product_ids, expires_at__gt=timezone.now()
+            )
+            .exclude(order_id=order.id)
+            .order_by()
+            .values("product_info_id")
+            .annotate(total=Sum("quantity"))
+        )
+        return {row["product_info_id"]: row["total"] for row in rows}
+
+    @staticmethod
+    def sync_basket(order: Order, product_ids) -> None:
+        """
+        Приводит резервы корзины по указанным товарам к её содержимому.
+
+        Затронутые резервы продлеваются на ``STOCK_HOLD_TTL`` секунд,
+        резервы удаленных позиций снимаются.
+        """
+        product_ids = list(product_ids)
+        quantities = dict(
+            order.ordered_items.filter(product_info_id__in=product_ids)
+            .values_list("product_info_id", "quantity")
+        )
+        StockHold.objects.filter(order_id=order.id, product_info_id__in=product_ids).exclude(
+            product_info_id__in=quantities.keys()
+        ).delete()
+        if not quantities:
+            return
+
+        expires_at = StockHoldService.expires_at()
+        StockHold.objects.bulk_create(
+            [
+                StockHold(
+                    order_id=order.id,
+                    product_info_id=pid,
+                    quantity=quantity,
+                    expires_at=expires_at,
+                )
+                for pid, quantity in quantities.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["order", "product_info"],
+            update_fields=["quantity", "expires_at"],
+        )
+
+    @staticmethod
+    def release(order: Order) -> None:
+        """
+        Снимает все резервы корзины.
+        """
+        StockHold.objects.filter(order_id=order.id).delete()
+
+    @staticmethod
+    def sweep_expired(batch_size: int = 1000) -> int:
+        """
+        Удаляет просроченные резервы пачками, возвращает количество удаленных.
+        """
+        deleted_total = 0
+        now = timezone.now()
+        while True:
+            ids = list(
+                StockHold.objects.filter(expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted_total
+            deleted_total += StockHold.objects.filter(id__in=ids).delete()[0]
+            if len(ids) < batch_size:
+                return deleted_total
@@ -0,0 +1,169 @@
+"""
+Сервис объединения уведомлений о заказах.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable
+
+from backend.models.notifications import PendingNotification
+from backend.models.orders import Order, OrderState, ShopOrder
+from backend.services.email_dispatch import EMAIL_TYPE_HEADER, ORDER_HEADER
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+Kind = PendingNotification.Kind
+
+
+class NotificationService:
+    """
+    Накопление событий заказов и отправка объединенных писем.
+
+    Смены статуса заказа копятся в ``PendingNotification``: покупатель получает
+    одно письмо по всем своим заказам, изменившимся за окно
+    NOTIFICATION_COALESCE_SECONDS, с конечным статусом каждого заказа.
+    Администраторы магазинов с включенной сводкой получают письмо о заказах
+    магазина раз в час.
+    """
+
+    EMAILS = {
+        Kind.ORDER_STATUS: "emails/order_status_summary.html",
+        Kind.SHOP_DIGEST: "emails/shop_digest.html",
+    }
+
+    @staticmethod
+    def _coalesce(transitions: Iterable[tuple]) -> dict:
+        """
+        Первый старый и последний новый статус каждого заказа.
+        """
+        moves = {}
+        for order_id, old_status, new_status in transitions:
+            first_status = moves[order_id][0] if order_id in moves else old_status
+            moves[order_id] = (first_status, new_status)
+        return moves
+
+    @classmethod
+    def enqueue(cls, transitions: Iterable[tuple], now=None) -> int:
+        """
+        Накапливает смены статуса ``(order_id, old_status, new_status)``.
+
+        Оформление заказа покупателю не копится: на него уходит
+        письмо-подтверждение. Уже ожидающие строки получают новый конечный
+        статус одним ``INSERT ... ON CONFLICT`` без сдвига срока отправки.
+        Возвращает количество записанных строк.
+        """
+        moves = cls._coalesce(transitions)
+        if not moves:
+            return 0
+        now = now or timezone.now()
+        status_after = now + timedelta(seconds=settings.NOTIFICATION_COALESCE_SECONDS)
+        digest_after = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+        buyers = Order.objects.filter(id__in=moves, user__isnull=False).values_list(
+            "id", "user_id"
+        )
+        admins = ShopOrder.objects.filter(
+            order_id__in=moves, shop__order_digest=True, shop__user__isnull=False
+        ).values_list("order_id", "shop__user_id")
+        rows = [
+            PendingNotification(
+                kind=Kind.ORDER_STATUS, user_id=user_id, order_id=order_id,
+                old_status=moves[order_id][0], new_status=moves[order_id][1],
+                send_after=status_after,
+            )
+            for order_id, user_id in buyers
+            if moves[order_id][0] != OrderState.BASKET
+        ]
+        rows += [
+            PendingNotification(
+                kind=Kind.SHOP_DIGEST, user_id=user_id, order_id=order_id,
+                old_status=moves[order_id][0], new_status=moves[order_id][1],
+                send_after=digest_after,
+            )
+            for order_id, user_id in admins
+        ]
+        PendingNotification.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["kind", "user", "order"],
+            update_fields=["new_status"],
+        )
+        return len(rows)
+
+    @classmethod
+    def build_message(cls, kind: str, notifications: list, connection=None):
+        """
+        Одно письмо получателю по всем его накопленным заказам.
+        """
+        user = notifications[0].user
+        if kind == Kind.SHOP_DIGEST:
+            subject = f"Сводка заказов магазина {user.shop.name}"
+        elif len(notifications) == 1:
+            subject = f"Статус заказа #{notifications[0].order_id} изменен"
+        else:
+            subject = f"Изменены статусы заказов ({len(notifications)})"
+        html = get_template(cls.EMAILS[kind]).render(
+            {"user": user, "notifications": notifications}
+        )
+        headers = {EMAIL_TYPE_HEADER: kind}
+        if len(notifications) == 1:
+            headers[ORDER_HEADER] = str(notifications[0].order_id)
+        message = EmailMultiAlternatives(
+            subject=subject,
+            body=html,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[user.email],
+            headers=headers,
+            connection=connection,
+        )
+        message.attach_alternative(html, "text/html")
+        return message
+
+    @classmethod
+    def flush(cls, batch_size: int = 500, now=None, connection=None) -> int:
+        """
+        Отправляет письма получателям, у которых наступил срок отправки.
+
+        Вместе с наступившими уходят и остальные накопленные заказы получателя.
+        Строки удаляются, а письма ставятся в очередь в одной транзакции.
+        Возвращает количество писем.
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            due = defaultdict(list)
+            for kind, user_id in (
+                PendingNotification.objects.filter(send_after__lte=now)
+                .values_list("kind", "user_id")
+                .order_by("kind", "user_id")
+                .distinct()[:batch_size]
+            ):
+                due[kind].append(user_id)
+            if not due:
+                return 0
+            recipients = Q()
+            for kind, user_ids in due.items():
+                recipients |= Q(kind=kind, user_id__in=user_ids)
+            notifications = list(
+                PendingNotification.objects.filter(recipients)
+                .select_related("user__shop", "order")
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("order_id")
+            )
+            PendingNotification.objects.filter(
+                id__in=[notification.id for notification in notifications]
+            ).delete()
+
+            groups = defaultdict(list)
+            for notification in notifications:
+                groups[(notification.kind, notification.user_id)].append(notification)
+            connection = connection or get_connection()
+            return connection.send_messages(
+                [
+                    cls.build_message(kind, group, connection=connection)
+                    for (kind, _), group in groups.items()
+                ]
+            )
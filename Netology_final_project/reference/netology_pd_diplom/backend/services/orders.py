@@ -3,12 +3,16 @@
 """
 
 # pylint: disable=no-member
-from typing import Optional
+from typing import Iterable, Optional
 
-from backend.models.orders import Order, OrderState, OrderStatusHistory
-from backend.services.inventory import InventoryService
-from backend.signals import order_status_changed
+from backend.models.catalog import ProductInfo
+from backend.models.orders import (
+    Order, OrderItem, OrderState, OrderStatusHistory, ShopOrder, can_transition
+)
+from backend.services.inventory import InventoryService, StockHoldService
+from backend.signals import order_status_changed, order_statuses_changed
 from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
 
 
 class OrderServiceError(Exception):
@@ -19,11 +23,48 @@ class OrderServiceError(Exception):
     pass
 
 
+class OrderTransitionError(OrderServiceError):
+    """
+    Недопустимый переход статуса заказа.
+    """
+
+
+class OrderConflictError(OrderServiceError):
+    """
+    Заказ изменен параллельно: версия в базе не совпала с ожидаемой.
+    """
+
+
 class OrderService:
     """
     Сервис для управления заказами и их статусами.
+
+    Смена статуса — условный ``UPDATE ... WHERE id = ? AND version = ?``
+    без ``SELECT FOR UPDATE``: проигравший параллельный писатель получает
+    ``OrderConflictError``.
     """
 
+    @staticmethod
+    def check_transition(old_status: str, new_status: str) -> None:
+        """
+        Проверяет переход по таблице ORDER_TRANSITIONS.
+        """
+        if not can_transition(old_status, new_status):
+            raise OrderTransitionError(
+                f"Недопустимый переход статуса: {old_status} → {new_status}"
+            )
+
+    @staticmethod
+    def _versioned_update(order: Order, new_status: str, fields: Optional[dict] = None) -> bool:
+        """
+        Меняет статус, только если версия и статус заказа не изменились.
+        """
+        return bool(
+            Order.objects.filter(id=order.id, version=order.version, state=order.state).update(
+                state=new_status, version=F("version") + 1, **(fields or {})
+            )
+        )
+
     @staticmethod
     @transaction.atomic
     def change_status(
@@ -31,35 +72,175 @@ class OrderService:
         new_status: str,
         changed_by: Optional[int] = None,
         comment: str = "",
+        fields: Optional[dict] = None,
+        notify: bool = True,
     ) -> None:
         """
         Изменяет статус заказа с автоматическим управлением складскими запасами.
+
+        ``fields`` — дополнительные поля, записываемые тем же UPDATE
+        (например, контакт при оформлении). При ``notify=False`` получатели
+        сигнала не отправляют письмо покупателю.
         """
         old_status = order.state
 
         if old_status == new_status:
             return
+        OrderService.check_transition(old_status, new_status)
 
-        if old_status == OrderState.BASKET and new_status == OrderState.NEW:
-            InventoryService.reserve_for_order(order)
-
-        if old_status != OrderState.CANCELED and new_status == OrderState.CANCELED:
-            InventoryService.release_for_order(order)
+        if not OrderService._versioned_update(order, new_status, fields):
+            raise OrderConflictError(f"Заказ #{order.id} был изменен, повторите запрос")
 
+        # При ошибке резервирования транзакция откатывается, и объект
+        # вызывающего кода возвращается к значениям из базы
+        saved = {"state": order.state, "version": order.version}
+        saved.update({name: getattr(order, name) for name in fields or {}})
+        loaded_values = getattr(order, "_loaded_values", {})
         order.state = new_status
-        order.save(update_fields=["state"])
+        order.version += 1
+        for name, value in (fields or {}).items():
+            setattr(order, name, value)
+        order.reset_tracking()
 
-        OrderStatusHistory.objects.create(
-            order=order,
-            old_status=old_status,
-            new_status=new_status,
-            changed_by_id=changed_by,
-            comment=comment,
-        )
+        try:
+            if old_status == OrderState.BASKET and new_status == OrderState.NEW:
+                InventoryService.reserve_for_order(order)
+                StockHoldService.release(order)
+                OrderService.fix_prices(order)
+
+            if old_status != OrderState.CANCELED and new_status == OrderState.CANCELED:
+                InventoryService.release_for_order(order)
+
+            if old_status == OrderState.BASKET:
+                OrderService.index_shop_orders(order)
+            else:
+                OrderService.update_shop_orders_state(order)
+
+            OrderStatusHistory.objects.create(
+                order=order,
+                old_status=old_status,
+                new_status=new_status,
+                changed_by_id=changed_by,
+                comment=comment,
+            )
+        except Exception:
+            for name, value in saved.items():
+                setattr(order, name, value)
+            order._loaded_values = loaded_values
+            raise
 
         order_status_changed.send(
             sender=OrderService,
             order_id=order.id,
             old_status=old_status,
             new_status=new_status,
+            notify=notify,
+        )
+
+    @staticmethod
+    def bulk_change_status(
+        order_ids: Iterable[int],
+        new_status: str,
+        shop_id: int,
+        changed_by: Optional[int] = None,
+        comment: str = "",
+    ) -> list:
+        """
+        Переводит несколько заказов магазина в новый статус одной транзакцией.
+
+        Каждый заказ обновляется условным UPDATE по версии (без блокировок),
+        индекс магазина — одним UPDATE, история — ``bulk_create``. Получатели
+        сигнала ``order_statuses_changed`` записывают события outbox и
+        агрегаты продаж один раз на весь пакет.
+        Возвращает результат по каждому заказу в порядке запроса.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        with transaction.atomic():
+            orders = {
+                order.id: order
+                for order in Order.objects.filter(
+                    id__in=order_ids, shop_orders__shop_id=shop_id
+                ).only("id", "state", "version")
+            }
+
+            # Строки обновляются по возрастанию id, чтобы встречные пакеты не блокировали друг друга
+            results, history = {}, []
+            for order_id in sorted(order_ids):
+                order = orders.get(order_id)
+                if order is None:
+                    results[order_id] = {"status": False, "errors": "Заказ не найден"}
+                    continue
+                if order.state != new_status:
+                    if not can_transition(order.state, new_status):
+                        results[order_id] = {
+                            "status": False,
+                            "errors": f"Недопустимый переход статуса: {order.state} → {new_status}",
+                        }
+                        continue
+                    if not OrderService._versioned_update(order, new_status):
+                        results[order_id] = {
+                            "status": False,
+                            "errors": "Заказ был изменен, повторите запрос",
+                        }
+                        continue
+                    history.append(
+                        OrderStatusHistory(
+                            order_id=order.id,
+                            old_status=order.state,
+                            new_status=new_status,
+                            changed_by_id=changed_by,
+                            comment=comment,
+                        )
+                    )
+                results[order_id] = {"status": True, "state": new_status}
+
+            if history:
+                changed_ids = [item.order_id for item in history]
+                ShopOrder.objects.filter(order_id__in=changed_ids).update(state=new_status)
+                OrderStatusHistory.objects.bulk_create(history)
+                order_statuses_changed.send(
+                    sender=OrderService,
+                    transitions=[(item.order_id, item.old_status, new_status) for item in history],
+                )
+        return [{"order_id": order_id, **results[order_id]} for order_id in order_ids]
+
+    @staticmethod
+    def fix_prices(order: Order) -> None:
+        """
+        Записывает в позиции оформляемого заказа текущие цены товаров.
+
+        Агрегаты продаж считают выручку по этой цене, поэтому изменение
+        прайса после оформления не меняет уже учтенные суммы.
+        """
+        OrderItem.objects.filter(order_id=order.id).update(
+            price=Subquery(
+                ProductInfo.objects.filter(id=OuterRef("product_info_id")).values("price")[:1]
+            )
+        )
+
+    @staticmethod
+    def index_shop_orders(order: Order) -> None:
+        """
+        Записывает оформленный заказ в индекс заказов магазинов.
+        """
+        shop_ids = set(
+            OrderItem.objects.filter(order_id=order.id)
+            .values_list("product_info__shop_id", flat=True)
+        )
+        ShopOrder.objects.bulk_create(
+            [
+                ShopOrder(shop_id=shop_id, order_id=order.id, state=order.state, dt=order.dt)
+                for shop_id in shop_ids
+            ],
+            ignore_conflicts=True,
+        )
+        OrderService.update_shop_orders_state(order)
+
+    @staticmethod
+    def update_shop_orders_state(order: Order) -> None:
+        """
+        Синхронизирует статус заказа в индексе заказов магазинов.
+        """
+        ShopOrder.objects.filter(order_id=order.id).exclude(state=order.state).update(
+            state=order.state
         )
@@ -0,0 +1,146 @@
+"""
+Сервис transactional outbox.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from backend.models.outbox import OutboxEvent
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger("backend.outbox")
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+class OutboxService:
+    """
+    Запись событий в outbox и их передача обработчикам.
+
+    Событие создается в транзакции изменения данных, поэтому при откате
+    уведомление не уходит, а после фиксации не теряется. Relay выбирает
+    необработанные события пачкой и отправляет по одному сообщению Celery
+    на каждую тему.
+    """
+
+    @staticmethod
+    def publish(topic: str, aggregate_id: int, payload: Optional[dict] = None) -> OutboxEvent:
+        """
+        Записывает событие в outbox в текущей транзакции.
+        """
+        return OutboxEvent.objects.create(
+            topic=topic, aggregate_id=aggregate_id, payload=payload or {}
+        )
+
+    @staticmethod
+    def publish_many(events: Iterable[tuple]) -> list:
+        """
+        Записывает события ``(topic, aggregate_id, payload)`` одним INSERT.
+        """
+        return OutboxEvent.objects.bulk_create(
+            OutboxEvent(topic=topic, aggregate_id=aggregate_id, payload=payload or {})
+            for topic, aggregate_id, payload in events
+        )
+
+    @staticmethod
+    def relay(dispatch, batch_size: int = 500) -> int:
+        """
+        Передает пачку необработанных событий в ``dispatch(topic, event_ids)``.
+
+        Повторно передаются события, не обработанные за OUTBOX_REDISPATCH_AFTER
+        секунд после прошлой передачи, пока не исчерпано OUTBOX_MAX_ATTEMPTS;
+        после этого событие помечается неудавшимся. ``dispatch`` вызывается
+        после фиксации транзакции. Возвращает количество событий.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.OUTBOX_REDISPATCH_AFTER)
+        OutboxService.mark_failed(now, stale)
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.filter(
+                    processed_at__isnull=True, attempts__lt=settings.OUTBOX_MAX_ATTEMPTS
+                )
+                .filter(Q(dispatched_at__isnull=True) | Q(dispatched_at__lt=stale))
+                .select_for_update(skip_locked=True)
+                .order_by("id")
+                .values_list("id", "topic")[:batch_size]
+            )
+            if not events:
+                return 0
+            by_topic = defaultdict(list)
+            for event_id, topic in events:
+                by_topic[topic].append(event_id)
+            OutboxEvent.objects.filter(id__in=[event_id for event_id, _ in events]).update(
+                dispatched_at=now, attempts=F("attempts") + 1
+            )
+            transaction.on_commit(
+                lambda: [dispatch(topic, ids) for topic, ids in by_topic.items()]
+            )
+        return len(events)
+
+    @staticmethod
+    def mark_failed(now, stale) -> int:
+        """
+        Помечает ``failed_at`` события, исчерпавшие попытки, и пишет их в лог.
+        """
+        failed = list(
+            OutboxEvent.objects.filter(
+                processed_at__isnull=True,
+                failed_at__isnull=True,
+                attempts__gte=settings.OUTBOX_MAX_ATTEMPTS,
+                dispatched_at__lt=stale,
+            ).values_list("id", "topic", "aggregate_id")
+        )
+        if not failed:
+            return 0
+        OutboxEvent.objects.filter(id__in=[event_id for event_id, *_ in failed]).update(
+            failed_at=now
+        )
+        for event_id, topic, aggregate_id in failed:
+            logger.error(
+                "Outbox event %s (%s #%s) failed after %s attempts",
+                event_id, topic, aggregate_id, settings.OUTBOX_MAX_ATTEMPTS,
+            )
+        return len(failed)
+
+    @staticmethod
+    def replay(event_ids: Iterable[int]) -> int:
+        """
+        Возвращает неудавшиеся события в очередь relay с новым счетчиком попыток.
+        """
+        return OutboxEvent.objects.filter(
+            id__in=list(event_ids), processed_at__isnull=True
+        ).update(failed_at=None, attempts=0, dispatched_at=None)
+
+    @staticmethod
+    def claim(event_ids: Iterable[int]) -> list:
+        """
+        Помечает события обработанными и возвращает те, что еще не были обработаны.
+
+        Вызывается в транзакции обработки: при ее откате отметка снимается
+        вместе с результатом, и relay передаст события повторно. Повторная
+        доставка уже обработанных id вернет пустой список.
+        """
+        events = list(
+            OutboxEvent.objects.filter(id__in=list(event_ids), processed_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+        )
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            processed_at=timezone.now()
+        )
+        return events
+
+    @staticmethod
+    def sweep_processed(days: int) -> int:
+        """
+        Удаляет обработанные события старше ``days`` дней.
+        """
+        before = timezone.now() - timedelta(days=days)
+        return OutboxEvent.objects.filter(processed_at__lt=before).delete()[0]
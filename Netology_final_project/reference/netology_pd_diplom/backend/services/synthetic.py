@@ -0,0 +1,504 @@
+"""
+Генерация синтетических данных каталога и заказов.
+"""
+
+import json
+import math
+import os
+import random
+from bisect import bisect_right
+from datetime import timedelta
+
+from backend.models import (
+    Category, Contact, Order, OrderItem, OrderState, Parameter, Product, ProductInfo,
+    ProductParameter, Shop, ShopOrder, User
+)
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+CATEGORY_NAMES = (
+    "Смартфоны", "Ноутбуки", "Телевизоры", "Наушники", "Планшеты", "Аксессуары",
+    "Мониторы", "Фотоаппараты", "Flash-накопители", "Колонки", "Часы", "Принтеры",
+)
+BRANDS = ("Apple", "Samsung", "Xiaomi", "Sony", "LG", "Huawei", "Lenovo", "Asus", "Philips")
+COLORS = ("черный", "белый", "серебристый", "синий", "красный", "золотистый")
+PARAMETER_NAMES = (
+    "Цвет", "Вес (г)", "Гарантия (мес)", "Встроенная память (Гб)", "Диагональ (дюйм)",
+    "Разрешение (пикс)", "Страна производства", "Материал корпуса",
+)
+CITIES = ("Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Екатеринбург", "Самара")
+STREETS = ("Ленина", "Тверская", "Садовая", "Мира", "Гагарина", "Центральная")
+
+# Доли статусов заказов; корзина у пользователя одна, лишние корзины становятся новыми
+STATE_WEIGHTS = {
+    OrderState.BASKET: 5,
+    OrderState.NEW: 10,
+    OrderState.CONFIRMED: 8,
+    OrderState.ASSEMBLED: 5,
+    OrderState.SENT: 10,
+    OrderState.DELIVERED: 50,
+    OrderState.CANCELED: 12,
+}
+# Версия заказа — число смен статуса по пути от корзины
+STATE_VERSIONS = {
+    OrderState.BASKET: 0,
+    OrderState.NEW: 1,
+    OrderState.CONFIRMED: 2,
+    OrderState.ASSEMBLED: 3,
+    OrderState.SENT: 4,
+    OrderState.DELIVERED: 5,
+    OrderState.CANCELED: 2,
+}
+
+
+def zipf_rank(rng: random.Random, n: int, skew: float) -> int:
+    """
+    Ранг от 1 до ``n`` с вероятностью, убывающей как ``1 / rank ** skew``.
+
+    Обратная функция непрерывного приближения распределения Ципфа: память
+    не зависит от ``n``, один вызов ``rng.random()`` на значение.
+    """
+    u = rng.random()
+    if abs(skew - 1) < 1e-9:
+        rank = int((n + 1) ** u)
+    else:
+        exponent = 1 - skew
+        rank = int((((n + 1) ** exponent - 1) * u + 1) ** (1 / exponent))
+    return min(max(rank, 1), n)
+
+
+def zipf_sizes(total: int, parts: int, skew: float) -> list:
+    """
+    Разбивает ``total`` на ``parts`` частей, убывающих по закону Ципфа.
+    """
+    weights = [1 / rank ** skew for rank in range(1, parts + 1)]
+    weight_sum = sum(weights)
+    sizes = [int(total * weight / weight_sum) for weight in weights]
+    for index in range(total - sum(sizes)):
+        sizes[index % parts] += 1
+    return sizes
+
+
+def yaml_string(value: str) -> str:
+    """
+    Строка YAML в двойных кавычках.
+
+    Строка JSON — допустимый скаляр YAML, а запись напрямую на миллионах
+    товаров намного быстрее ``yaml.dump``.
+    """
+    return json.dumps(value, ensure_ascii=False)
+
+
+class TableWriter:
+    """
+    Потоковая запись строк в таблицу модели с явными первичными ключами.
+
+    На PostgreSQL (psycopg 3) строки передаются через ``COPY FROM STDIN``,
+    на остальных базах — ``executemany`` пачками по ``batch_size``. Сигналы
+    и ``save()`` моделей не вызываются, незаданные поля получают значения
+    по умолчанию модели. При ``dry_run`` строки только считаются.
+    """
+
+    def __init__(self, model, fields: list, batch_size: int = 10000, dry_run: bool = False):
+        self.model = model
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.count = 0
+        opts = model._meta
+        columns = [opts.get_field(name) for name in fields]
+        defaults = [
+            field for field in opts.concrete_fields
+            if field not in columns and not field.primary_key
+        ]
+        self.defaults = tuple(field.get_default() for field in defaults)
+        self.columns = columns + defaults
+        self.sql_columns = ", ".join(
+            connection.ops.quote_name(field.column) for field in self.columns
+        )
+        self.table = connection.ops.quote_name(opts.db_table)
+
+    def write(self, rows) -> int:
+        """
+        Записывает кортежи значений полей ``fields``, возвращает их количество.
+        """
+        if self.dry_run:
+            written = sum(1 for _ in rows)
+            self.count += written
+            return written
+        rows = (row + self.defaults for row in rows)
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if connection.vendor == "postgresql" and hasattr(raw, "copy"):
+                written = self._copy(raw, rows)
+            else:
+                written = self._insert(cursor, rows)
+        self.count += written
+        return written
+
+    def _copy(self, raw, rows) -> int:
+        written = 0
+        with raw.copy(f"COPY {self.table} ({self.sql_columns}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                written += 1
+        return written
+
+    def _insert(self, cursor, rows) -> int:
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        sql = f"INSERT INTO {self.table} ({self.sql_columns}) VALUES ({placeholders})"
+        prepare = [
+            (index, field) for index, field in enumerate(self.columns)
+            if isinstance(field, models.DateTimeField)
+        ]
+        written = 0
+        batch = []
+        for row in rows:
+            if prepare:
+                row = list(row)
+                for index, field in prepare:
+                    row[index] = field.get_db_prep_save(row[index], connection)
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                cursor.executemany(sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            written += len(batch)
+        return written
+
+
+class SyntheticDataGenerator:
+    """
+    Синтетические магазины, каталог, покупатели и заказы.
+
+    Результат детерминирован для одного ``seed``. Размеры магазинов и
+    категорий, популярность товаров, предложений и активность покупателей
+    распределены по закону Ципфа с показателем ``skew``. Первичные ключи
+    назначаются от текущего максимума таблиц, строки пишутся потоком через
+    ``TableWriter`` без загрузки объектов в память; в памяти остаются только
+    границы магазинов и массивы на товар и пользователя.
+    """
+
+    def __init__(
+        self,
+        shops: int = 10,
+        categories: int = 50,
+        products: int = 10000,
+        offers: int = 100000,
+        parameters: int = 4,
+        users: int = 1000,
+        orders: int = 10000,
+        items: int = 5,
+        days: int = 365,
+        skew: float = 1.1,
+        seed: int = 42,
+        batch_size: int = 10000,
+        yaml_dir: str = None,
+        yaml_only: bool = False,
+    ):
+        self.shops = shops
+        self.categories = categories
+        self.products = products
+        self.offers = offers
+        self.parameters = parameters
+        self.parameter_names = [
+            PARAMETER_NAMES[number] if number < len(PARAMETER_NAMES) else f"Параметр {number + 1}"
+            for number in range(parameters)
+        ]
+        self.users = users
+        self.orders = orders
+        self.items = items
+        self.days = days
+        self.skew = skew
+        self.seed = seed
+        self.batch_size = batch_size
+        self.yaml_dir = yaml_dir
+        self.yaml_only = yaml_only
+        self.rng = random.Random(seed)
+        self.now = timezone.now().replace(microsecond=0)
+        self.counts = {}
+
+    def run(self) -> dict:
+        """
+        Генерирует данные в одной транзакции, возвращает число строк по моделям.
+        """
+        if self.yaml_only:
+            self.ids = {model: 1 for model in (Shop, Category, Product, ProductInfo, Parameter)}
+            self.generate_catalog()
+            return self.counts
+
+        self.ids = {
+            model: (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+            for model in (
+                Shop, Category, Product, ProductInfo, Parameter, User, Contact, Order
+            )
+        }
+        with transaction.atomic():
+            self.generate_catalog()
+            self.generate_users()
+            self.generate_orders()
+            self.reset_sequences()
+        return self.counts
+
+    def writer(self, model, fields: list) -> TableWriter:
+        """
+        Запись в таблицу модели; при ``yaml_only`` строки только считаются.
+        """
+        return TableWriter(model, fields, self.batch_size, dry_run=self.yaml_only)
+
+    def count(self, model, written: int) -> None:
+        """
+        Учитывает записанные строки модели в итоге.
+        """
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + written
+
+    def generate_catalog(self) -> None:
+        """
+        Магазины, категории, товары, предложения с параметрами и фиды YAML.
+        """
+        rng = self.rng
+        shop_id, category_id, product_id, parameter_id = (
+            self.ids[Shop], self.ids[Category], self.ids[Product], self.ids[Parameter]
+        )
+        self.shop_ids = list(range(shop_id, shop_id + self.shops))
+        self.category_ids = category_ids = list(range(category_id, category_id + self.categories))
+        category_names = {
+            category: f"{CATEGORY_NAMES[index % len(CATEGORY_NAMES)]} {category}"[:40]
+            for index, category in enumerate(category_ids)
+        }
+        parameter_ids = list(range(parameter_id, parameter_id + self.parameters))
+
+        self.count(Shop, self.writer(Shop, ["id", "name", "is_accepting_orders"]).write(
+            (shop, f"Магазин {shop}", True) for shop in self.shop_ids
+        ))
+        self.count(Category, self.writer(Category, ["id", "name"]).write(
+            (category, category_names[category]) for category in category_ids
+        ))
+        self.count(Parameter, self.writer(Parameter, ["id", "name"]).write(
+            (parameter, self.parameter_names[index])
+            for index, parameter in enumerate(parameter_ids)
+        ))
+
+        # Категория и базовая цена товара; крупные категории содержат больше товаров
+        product_category = [
+            category_ids[zipf_rank(rng, self.categories, self.skew) - 1]
+            for _ in range(self.products)
+        ]
+        product_price = [
+            max(100, int(rng.lognormvariate(8.5, 1.0)) // 10 * 10) for _ in range(self.products)
+        ]
+        product_names = [
+            f"{CATEGORY_NAMES[(product_category[index] - category_id) % len(CATEGORY_NAMES)]} "
+            f"{BRANDS[index % len(BRANDS)]} {product_id + index} "
+            f"({COLORS[index % len(COLORS)]})"
+            for index in range(self.products)
+        ]
+        self.count(Product, self.writer(Product, ["id", "name", "category"]).write(
+            (product_id + index, product_names[index], product_category[index])
+            for index in range(self.products)
+        ))
+
+        offer_writer = self.writer(
+            ProductInfo,
+            ["id", "product", "shop", "external_id", "model", "price", "price_rrc", "quantity"],
+        )
+        parameter_writer = self.writer(
+            ProductParameter, ["product_info", "parameter", "value"]
+        )
+        links_writer = self.writer(Category.shops.through, ["category", "shop"])
+
+        # Границы предложений магазинов: у крупных магазинов больше предложений
+        offer_id = self.ids[ProductInfo]
+        self.offer_start = offer_id
+        self.shop_bounds = []
+        for shop_index, size in enumerate(zipf_sizes(self.offers, self.shops, self.skew)):
+            shop = self.shop_ids[shop_index]
+            feed = self.open_feed(shop_index + 1, shop)
+            shop_categories = set()
+            for chunk in range(0, size, self.batch_size):
+                goods = []
+                for _ in range(min(self.batch_size, size - chunk)):
+                    # Популярные товары продаются в большем числе магазинов
+                    index = zipf_rank(rng, self.products, self.skew) - 1
+                    price = product_price[index] * rng.randint(90, 110) // 100
+                    goods.append((
+                        offer_id, index, shop, offer_id,
+                        f"{BRANDS[index % len(BRANDS)].lower()}/{product_id + index}",
+                        price, price + price // 10, rng.randint(0, 100),
+                    ))
+                    offer_id += 1
+                offer_writer.write(
+                    (offer, product_id + index, *rest) for offer, index, *rest in goods
+                )
+                parameter_writer.write(
+                    (offer, parameter, self.parameter_value(index, number))
+                    for offer, index, *_ in goods
+                    for number, parameter in enumerate(parameter_ids)
+                )
+                shop_categories.update(product_category[row[1]] for row in goods)
+                if feed:
+                    for offer, index, _, external_id, model, price, price_rrc, quantity in goods:
+                        feed.write(
+                            f"  - id: {external_id}\n"
+                            f"    category: {product_category[index]}\n"
+                            f"    model: {yaml_string(model)}\n"
+                            f"    name: {yaml_string(product_names[index])}\n"
+                            f"    price: {price}\n"
+                            f"    price_rrc: {price_rrc}\n"
+                            f"    quantity: {quantity}\n"
+                            f"    parameters:\n"
+                        )
+                        for number, name in enumerate(self.parameter_names):
+                            value = yaml_string(self.parameter_value(index, number))
+                            feed.write(f"      {yaml_string(name)}: {value}\n")
+            self.shop_bounds.append(offer_id)
+
+            shop_categories = sorted(shop_categories)
+            links_writer.write((category, shop) for category in shop_categories)
+            if feed:
+                feed.write("\ncategories:\n")
+                for category in shop_categories:
+                    feed.write(
+                        f"  - id: {category}\n    name: {yaml_string(category_names[category])}\n"
+                    )
+                feed.close()
+        self.offer_end = offer_id
+        self.count(ProductInfo, offer_writer.count)
+        self.count(ProductParameter, parameter_writer.count)
+
+    def parameter_value(self, index: int, number: int) -> str:
+        """
+        Значение параметра товара; одинаково во всех магазинах.
+        """
+        if number == 0:
+            return COLORS[index % len(COLORS)]
+        return str((index * 7919 + number * 104729) % 1000 + 1)
+
+    def open_feed(self, number: int, shop: int):
+        """
+        Открывает фид магазина ``shop<number>.yaml`` в формате ``load_shop_data``.
+
+        Товары пишутся в фид по мере генерации, категории — в конце файла,
+        когда они известны. Возвращает None, если фиды не нужны.
+        """
+        if not self.yaml_dir:
+            return None
+        os.makedirs(self.yaml_dir, exist_ok=True)
+        feed = open(os.path.join(self.yaml_dir, f"shop{number}.yaml"), "w", encoding="utf-8")
+        feed.write(f"shop: {yaml_string(f'Магазин {shop}')}\n\ngoods:\n")
+        return feed
+
+    def generate_users(self) -> None:
+        """
+        Покупатели с одним-тремя контактами; пароль общий для всех.
+        """
+        rng = self.rng
+        user_id, contact_id = self.ids[User], self.ids[Contact]
+        password = make_password(f"generated-{self.seed}")
+        self.user_ids = list(range(user_id, user_id + self.users))
+        self.count(User, self.writer(
+            User,
+            ["id", "email", "password", "first_name", "last_name", "is_active", "date_joined"],
+        ).write(
+            (
+                user, f"user{user}@example.com", password, "Покупатель", str(user), True,
+                self.now - timedelta(days=self.days),
+            )
+            for user in self.user_ids
+        ))
+
+        self.first_contact = {}
+        contacts = []
+        for user in self.user_ids:
+            for _ in range(rng.randint(1, 3)):
+                self.first_contact.setdefault(user, contact_id)
+                contacts.append((
+                    contact_id, user, rng.choice(CITIES), rng.choice(STREETS),
+                    str(rng.randint(1, 150)), f"+7900{rng.randint(0, 9999999):07d}",
+                ))
+                contact_id += 1
+        self.count(Contact, self.writer(
+            Contact, ["id", "user", "city", "street", "house", "phone"]
+        ).write(iter(contacts)))
+
+    def generate_orders(self) -> None:
+        """
+        Заказы во всех статусах с позициями и индексом заказов магазинов.
+        """
+        rng = self.rng
+        order_id = self.ids[Order]
+        states = list(STATE_WEIGHTS)
+        cum_weights = []
+        total = 0
+        for state in states:
+            total += STATE_WEIGHTS[state]
+            cum_weights.append(total)
+
+        offers = self.offer_end - self.offer_start
+        # Перестановка рангов, чтобы популярные предложения были в разных магазинах
+        step = 7919
+        while offers and math.gcd(step, offers) != 1:
+            step += 2
+
+        order_writer = self.writer(
+            Order, ["id", "user", "dt", "state", "contact", "version",
+                    "admin_email_sent", "client_email_sent"]
+        )
+        item_writer = self.writer(OrderItem, ["order", "product_info", "quantity"])
+        index_writer = self.writer(ShopOrder, ["shop", "order", "state", "dt"])
+        baskets = set()
+        window = self.days * 86400
+        for start in range(0, self.orders, self.batch_size):
+            orders, items, index = [], [], []
+            for _ in range(min(self.batch_size, self.orders - start)):
+                user = self.user_ids[zipf_rank(rng, self.users, self.skew) - 1]
+                state = rng.choices(states, cum_weights=cum_weights)[0]
+                if state == OrderState.BASKET:
+                    if user in baskets:
+                        state = OrderState.NEW
+                    else:
+                        baskets.add(user)
+                basket = state == OrderState.BASKET
+                dt = self.now - timedelta(
+                    seconds=rng.randrange(3600 if basket else window)
+                )
+                orders.append((
+                    order_id, user, dt, state.value,
+                    None if basket else self.first_contact[user],
+                    STATE_VERSIONS[state], not basket, not basket,
+                ))
+                offer_ids = {
+                    self.offer_start
+                    + (zipf_rank(rng, offers, self.skew) * step) % offers
+                    for _ in range(rng.randint(1, self.items))
+                } if offers else set()
+                shops = set()
+                for offer in sorted(offer_ids):
+                    items.append((order_id, offer, rng.randint(1, 3)))
+                    shops.add(self.shop_ids[bisect_right(self.shop_bounds, offer)])
+                if not basket:
+                    index.extend((shop, order_id, state.value, dt) for shop in sorted(shops))
+                order_id += 1
+            order_writer.write(iter(orders))
+            item_writer.write(iter(items))
+            index_writer.write(iter(index))
+        self.count(Order, order_writer.count)
+        self.count(OrderItem, item_writer.count)
+        self.count(ShopOrder, index_writer.count)
+
+    def reset_sequences(self) -> None:
+        """
+        Сдвигает последовательности первичных ключей после явной записи id.
+        """
+        models_list = [
+            Shop, Category, Product, ProductInfo, Parameter, ProductParameter, User, Contact,
+            Order, OrderItem, ShopOrder, Category.shops.through,
+        ]
+        statements = connection.ops.sequence_reset_sql(no_style(), models_list)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -2,20 +2,26 @@
 # pylint: disable=no-member,unused-argument
 
 from django.conf import settings
-from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import Signal, receiver
 from django_rest_passwordreset.signals import reset_password_token_created
+from rest_framework.authtoken.models import Token
 
-from backend.models import Order
-from backend.tasks.celery_tasks import send_order_status_email_task
+from backend.api.authentication import TokenCache
+from backend.models import Order, OrderState, RequestProfile, User
+from backend.profiling import ProfileStorage
+from backend.services.analytics import SalesRollupService
+from backend.services.outbox import ORDER_CREATED, ORDER_STATUS_CHANGED, OutboxService
+from backend.slow_queries import install as install_slow_query_logger
 from backend.tasks.celery_tasks import send_generic_email_task
 
 
 # Кастомные сигналы
 new_user_registered = Signal()
-new_order = Signal()
 order_status_changed = Signal()
+# Пакет смен статуса (transitions: список (order_id, old_status, new_status))
+order_statuses_changed = Signal()
 
 
 @receiver(reset_password_token_created)
@@ -35,13 +41,116 @@ def password_reset_token_created_handler(sender, instance, reset_password_token,
     )
 
 
+@receiver(post_save, sender=User)
+def user_saved_handler(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Сброс кэша токенов при изменении пользователя: смене пароля,
+    деактивации, правке данных. Обновление только last_login при входе
+    кэш не сбрасывает.
+
+    """
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    TokenCache.invalidate_user(instance.id)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted_handler(sender, instance, **kwargs):
+    """
+    Сброс кэша удаленного токена (выход, удаление пользователя).
+
+    """
+    TokenCache.invalidate(instance.key)
+
+
+@receiver(post_delete, sender=RequestProfile)
+def request_profile_deleted_handler(sender, instance, **kwargs):
+    """
+    Удаление файла профиля вместе с записью (в том числе из админки).
+
+    """
+    ProfileStorage.remove(instance.file_name)
+
+
+@receiver(connection_created)
+def connection_created_handler(sender, connection, **kwargs):
+    """
+    Подключение журнала медленных запросов к новому соединению с БД.
+
+    """
+    install_slow_query_logger(connection)
+
+
+@receiver(order_status_changed)
+def order_status_changed_handler(sender, order_id, old_status, new_status, notify=True, **kwargs):
+    """
+    Запись события о смене статуса заказа в outbox в транзакции смены статуса.
+
+    """
+    if not notify or new_status == OrderState.BASKET:
+        return
+    OutboxService.publish(*order_event(order_id, old_status, new_status))
+
+
+@receiver(order_statuses_changed)
+def order_statuses_changed_handler(sender, transitions, notify=True, **kwargs):
+    """
+    Запись событий о пакете смен статуса в outbox одним INSERT.
+
+    """
+    if not notify:
+        return
+    OutboxService.publish_many(
+        order_event(order_id, old_status, new_status)
+        for order_id, old_status, new_status in transitions
+        if new_status != OrderState.BASKET
+    )
+
+
+def order_event(order_id: int, old_status: str, new_status: str) -> tuple:
+    """
+    Тема, заказ и данные события outbox о смене статуса.
+
+    Оформление (статус new) публикуется отдельной темой: покупатель получает
+    письмо-подтверждение, а не уведомление о статусе.
+    """
+    topic = ORDER_CREATED if new_status == OrderState.NEW else ORDER_STATUS_CHANGED
+    return topic, order_id, {"old_status": old_status, "new_status": new_status}
+
+
 @receiver(post_save, sender=Order)
-def order_status_changed_handler(sender, instance, created, **kwargs):
+def order_saved_handler(sender, instance, created, update_fields=None, **kwargs):
     """
-    Асинхронная отправка уведомлений при изменении статуса заказа через Celery.
-    
+    Смена статуса сохранением заказа в обход OrderService.
+    Сигнал отправляется только при реальном изменении статуса, а не при
+    каждом сохранении.
+
     """
-    if not created and instance.state != 'basket':
-        transaction.on_commit(
-            lambda: send_order_status_email_task.delay(instance.id)
+    if created or (update_fields is not None and "state" not in update_fields):
+        return
+    dirty = instance.get_dirty_fields()
+    if "state" in dirty:
+        order_status_changed.send(
+            sender=Order,
+            order_id=instance.id,
+            old_status=dirty["state"],
+            new_status=instance.state,
         )
+
+
+@receiver(order_status_changed)
+def sales_rollup_handler(sender, order_id, old_status, new_status, **kwargs):
+    """
+    Обновление дневных агрегатов продаж магазинов в транзакции смены статуса.
+
+    """
+    SalesRollupService.apply_transitions([(order_id, old_status, new_status)])
+
+
+@receiver(order_statuses_changed)
+def sales_rollups_handler(sender, transitions, **kwargs):
+    """
+    Обновление дневных агрегатов продаж для пакета смен статуса одним проходом.
+
+    """
+    SalesRollupService.apply_transitions(transitions)
@@ -0,0 +1,284 @@
+"""
+Журнал медленных SQL-запросов.
+"""
+
+import hashlib
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from backend import metrics
+from backend.models import SlowQuery
+
+logger = logging.getLogger("backend.slow_queries")
+
+# Литералы, параметры и имена точек сохранения заменяются на ?, списки значений
+# сворачиваются, чтобы запросы с разными значениями и длиной IN (...) давали
+# один отпечаток
+NORMALIZERS = (
+    (re.compile(r'(SAVEPOINT )"?\w+"?', re.IGNORECASE), r"\1?"),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%s|%\(\w+\)s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),
+    (re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+"), "(?)"),
+    (re.compile(r"\s+"), " "),
+)
+EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+STACK_DEPTH = 8
+
+
+def normalize(sql: str) -> str:
+    """
+    Текст запроса без значений.
+    """
+    for pattern, replacement in NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    """
+    Отпечаток нормализованного запроса.
+    """
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def stack_summary() -> str:
+    """
+    Вызовы кода проекта, приведшие к запросу, от внешнего к внутреннему.
+
+    Кадры Django, DRF и других библиотек пропускаются.
+    """
+    root = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(root)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return "\n".join(
+        f"{os.path.relpath(frame.filename, root)}:{frame.lineno} in {frame.name}"
+        for frame in frames[-STACK_DEPTH:]
+    )
+
+
+def explain(alias: str, sql: str, params) -> str:
+    """
+    План выполнения запроса: EXPLAIN или EXPLAIN QUERY PLAN на SQLite.
+
+    Запрос не выполняется; для служебных команд (BEGIN, SAVEPOINT и т.п.)
+    возвращается пустая строка.
+    """
+    if not EXPLAINABLE.match(sql):
+        return ""
+    connection = connections[alias]
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    # В PostgreSQL план — одна колонка, в SQLite текст шага — последняя
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+class SlowQueryLogger:
+    """
+    Обертка выполнения SQL, записывающая запросы дольше SLOW_QUERY_THRESHOLD_MS.
+
+    Медленный запрос сразу пишется в лог ``backend.slow_queries`` с
+    отпечатком, представлением и стеком, а план выполнения и агрегат
+    ``SlowQuery`` сохраняются фоновым потоком через отдельное соединение,
+    чтобы не задерживать запрос. План снимается не чаще раза в
+    SLOW_QUERY_EXPLAIN_INTERVAL секунд на отпечаток. Учитываются только
+    запросы с планом (SELECT, INSERT, UPDATE, DELETE, WITH), служебные
+    команды транзакций пропускаются.
+
+    При SLOW_QUERY_ASYNC=False (тесты, отладка) запись выполняется в том же
+    соединении после фиксации текущей транзакции (``on_commit``), а вне
+    транзакции — сразу после запроса; запросы откаченной транзакции
+    остаются только в логе.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.explained = {}
+        self.local = threading.local()
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if (
+            not threshold
+            or getattr(self.local, "capturing", False)
+            or not EXPLAINABLE.match(sql)
+        ):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= threshold:
+                self.record(context["connection"].alias, sql, params, many, duration)
+
+    def record(self, alias: str, sql: str, params, many: bool, duration: float) -> None:
+        """
+        Пишет медленный запрос в лог и передает его на сохранение.
+        """
+        request_metrics = metrics.current_request.get()
+        match = getattr(request_metrics.request, "resolver_match", None) if request_metrics else None
+        normalized = normalize(sql)
+        entry = {
+            "alias": alias,
+            "sql": sql,
+            "params": None if many else params,
+            "normalized": normalized,
+            "fingerprint": fingerprint(normalized),
+            "duration": round(duration, 2),
+            "view": match.view_name if match else "",
+            "stack": stack_summary(),
+        }
+        logger.warning(
+            "Slow query %.1f ms [%s] view=%s: %s",
+            duration, entry["fingerprint"][:12], entry["view"] or "-", normalized[:1000],
+        )
+        if not settings.SLOW_QUERY_ASYNC:
+            transaction.on_commit(lambda: self.save_inline(entry), using=alias)
+            return
+        try:
+            self.pending.put_nowait(entry)
+        except queue.Full:
+            logger.warning("Slow query queue is full, query %s dropped", entry["fingerprint"])
+            return
+        self.start_worker()
+
+    def save_inline(self, entry: dict) -> None:
+        """
+        Сохраняет запрос в потоке, выполнившем его; свои запросы не учитываются.
+        """
+        self.local.capturing = True
+        try:
+            self.save(entry)
+        except Exception:
+            logger.exception("Failed to save slow query %s", entry["fingerprint"])
+        finally:
+            self.local.capturing = False
+
+    def start_worker(self) -> None:
+        """
+        Запускает фоновый поток, если его нет (в том числе после fork).
+        """
+        if self.worker is not None and self.worker.is_alive():
+            return
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(
+                    target=self.run, name="slow-query-logger", daemon=True
+                )
+                self.worker.start()
+
+    def run(self) -> None:
+        """
+        Цикл фонового потока: сохраняет запросы из очереди.
+        """
+        self.local.capturing = True
+        while True:
+            entry = self.pending.get()
+            try:
+                self.save(entry)
+            except Exception:
+                logger.exception("Failed to save slow query %s", entry["fingerprint"])
+            finally:
+                self.pending.task_done()
+            if self.pending.empty():
+                close_old_connections()
+
+    def flush(self) -> None:
+        """
+        Дожидается сохранения всех запросов из очереди.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            self.pending.join()
+
+    def explain_due(self, key: str) -> bool:
+        """
+        Пора ли снова снимать план запроса с отпечатком ``key``.
+        """
+        now = time.monotonic()
+        last = self.explained.get(key)
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        self.explained[key] = now
+        return True
+
+    def save(self, entry: dict) -> None:
+        """
+        Снимает план выполнения и обновляет агрегат по отпечатку.
+
+        Транзакции не открываются: сохранение идет в autocommit фонового
+        потока или после фиксации транзакции запроса.
+        """
+        key = entry["fingerprint"]
+        plan = ""
+        if settings.SLOW_QUERY_EXPLAIN and self.explain_due(key):
+            try:
+                plan = explain(entry["alias"], entry["sql"], entry["params"])
+            except Exception as error:
+                logger.warning("EXPLAIN failed for slow query %s: %s", key, error)
+
+        duration = entry["duration"]
+        now = timezone.now()
+        fields = {
+            "calls": F("calls") + 1,
+            "total_ms": F("total_ms") + duration,
+            "max_ms": Greatest("max_ms", Value(duration)),
+            "last_ms": duration,
+            "last_view": entry["view"][:200],
+            "stack": entry["stack"],
+            "last_seen": now,
+        }
+        if plan:
+            fields["explain"] = plan
+        if SlowQuery.objects.filter(fingerprint=key).update(**fields):
+            return
+        try:
+            SlowQuery.objects.create(
+                fingerprint=key,
+                sql=entry["normalized"],
+                calls=1,
+                total_ms=duration,
+                max_ms=duration,
+                last_ms=duration,
+                last_view=entry["view"][:200],
+                stack=entry["stack"],
+                explain=plan,
+                last_seen=now,
+            )
+        except IntegrityError:
+            # Запись успел создать другой процесс
+            SlowQuery.objects.filter(fingerprint=key).update(**fields)
+
+
+slow_query_logger = SlowQueryLogger()
+
+
+def install(connection) -> None:
+    """
+    Подключает журнал медленных запросов к соединению.
+
+    Обертка ставится первой: ``connection.execute_wrapper()`` снимает
+    обертки с конца списка.
+    """
+    if slow_query_logger not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, slow_query_logger)
@@ -0,0 +1,169 @@
+"""
+Метрики задач Celery.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from celery.signals import before_task_publish, task_postrun, task_prerun, task_retry
+from django.conf import settings
+
+from backend import metrics
+from netology_pd_diplom_project.celery import app as celery_app
+
+logger = logging.getLogger("backend.tasks")
+
+# Заголовок сообщения со временем постановки задачи в очередь (unix time)
+ENQUEUED_AT_HEADER = "enqueued_at"
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+RUNTIME_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def task_names() -> list:
+    """
+    Имена зарегистрированных задач проекта — значения метки ``task``.
+
+    Веб-процесс импортирует не все модули задач, поэтому модули из
+    CELERY_IMPORTS загружаются так же, как при запуске воркера.
+    """
+    celery_app.loader.import_default_modules()
+    return [name for name in celery_app.tasks if not name.startswith("celery.")]
+
+
+TASK_QUEUE_LATENCY = metrics.SharedHistogram(
+    "celery_task_queue_latency_seconds",
+    "Time from enqueue (or ETA) to task start.",
+    "task",
+    LATENCY_BUCKETS,
+    task_names,
+)
+TASK_RUNTIME = metrics.SharedHistogram(
+    "celery_task_runtime_seconds", "Task execution time.", "task", RUNTIME_BUCKETS, task_names
+)
+TASK_FAILURES = metrics.SharedCounter(
+    "celery_task_failures_total", "Tasks finished with FAILURE.", "task", task_names
+)
+TASK_RETRIES = metrics.SharedCounter(
+    "celery_task_retries_total", "Task retries.", "task", task_names
+)
+TASK_LATENCY_ALERTS = metrics.SharedCounter(
+    "celery_task_queue_latency_alerts_total",
+    "Tasks that waited in queue longer than TASK_QUEUE_LATENCY_ALERT.",
+    "task",
+    task_names,
+)
+TASK_RSS_GROWTH = metrics.SharedGauge(
+    "celery_task_max_rss_growth_bytes",
+    "Largest worker process RSS growth over one task run.",
+    "task",
+    task_names,
+)
+
+metrics.REGISTRY.extend([
+    TASK_QUEUE_LATENCY,
+    TASK_RUNTIME,
+    TASK_FAILURES,
+    TASK_RETRIES,
+    TASK_LATENCY_ALERTS,
+    TASK_RSS_GROWTH,
+])
+
+# task_id -> (время начала выполнения, RSS процесса воркера перед задачей)
+_started = {}
+
+
+def current_rss() -> int:
+    """
+    Текущий RSS процесса в байтах или 0, если он недоступен (нет /proc).
+
+    ``ru_maxrss`` не подходит: это пик за всю жизнь процесса, и задача,
+    выполненная после тяжелой, унаследовала бы ее память.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def queue_latency(request, now: float):
+    """
+    Время ожидания задачи в очереди или None, если время постановки неизвестно.
+
+    Для задач с ``countdown``/``eta`` (в том числе повторов) ожидание
+    считается от ETA: отложенный запуск — не задержка очереди.
+    """
+    enqueued_at = getattr(request, ENQUEUED_AT_HEADER, None)
+    if enqueued_at is None:
+        enqueued_at = (getattr(request, "headers", None) or {}).get(ENQUEUED_AT_HEADER)
+    if enqueued_at is None:
+        return None
+    ready_at = float(enqueued_at)
+    eta = getattr(request, "eta", None)
+    if eta:
+        eta = datetime.fromisoformat(eta) if isinstance(eta, str) else eta
+        if eta.tzinfo is None:
+            eta = eta.replace(tzinfo=timezone.utc)
+        ready_at = max(ready_at, eta.timestamp())
+    return max(now - ready_at, 0.0)
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(sender=None, headers=None, **kwargs):
+    """
+    Добавляет в сообщение время постановки в очередь.
+
+    """
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def task_started(sender=None, task_id=None, task=None, **kwargs):
+    """
+    Учитывает ожидание в очереди и запоминает время начала задачи.
+
+    При ожидании дольше TASK_QUEUE_LATENCY_ALERT пишет ошибку в лог.
+
+    """
+    _started[task_id] = (time.perf_counter(), current_rss())
+    latency = queue_latency(task.request, time.time())
+    if latency is None:
+        return
+    TASK_QUEUE_LATENCY.observe(task.name, latency)
+    threshold = settings.TASK_QUEUE_LATENCY_ALERT
+    if threshold and latency > threshold:
+        TASK_LATENCY_ALERTS.inc(task.name)
+        logger.error(
+            "Task %s[%s] waited %.1f s in queue (alert threshold %s s)",
+            task.name, task_id, latency, threshold,
+        )
+
+
+@task_postrun.connect
+def task_finished(sender=None, task_id=None, task=None, state=None, **kwargs):
+    """
+    Учитывает время выполнения, ошибку и прирост памяти процесса за задачу.
+
+    """
+    started = _started.pop(task_id, None)
+    if started is not None:
+        started_at, rss_before = started
+        TASK_RUNTIME.observe(task.name, time.perf_counter() - started_at)
+        rss_after = current_rss()
+        if rss_before and rss_after:
+            TASK_RSS_GROWTH.set_max(task.name, max(rss_after - rss_before, 0))
+    if state == "FAILURE":
+        TASK_FAILURES.inc(task.name)
+
+
+@task_retry.connect
+def task_retried(sender=None, **kwargs):
+    """
+    Учитывает повтор задачи.
+
+    """
+    TASK_RETRIES.inc(sender.name)
@@ -5,12 +5,13 @@ Celery задачи для асинхронного выполнения.
 import yaml
 from backend.models import ConfirmEmailToken
 from backend.models.catalog import Category, Product, ProductInfo
-from backend.models.orders import Order
 from backend.models.parameters import Parameter, ProductParameter
 from backend.models.shops import Shop
 from backend.models.users import User
-from backend.services.emails import send_order_status_email
+from backend.services.email_dispatch import EMAIL_TYPE_HEADER, EmailDispatcher
+from backend.services.notifications import NotificationService
 from celery import shared_task
+from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
 from requests import get
 from yaml import Loader as YamlLoader
@@ -37,32 +38,44 @@ def send_confirmation_email_task(self, user_id: int) -> None:
     from_email = "noreply@example.com"
 
     msg = EmailMultiAlternatives(
-        subject=subject, body=message, from_email=from_email, to=recipient_list
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        to=recipient_list,
+        headers={EMAIL_TYPE_HEADER: "email_confirmation"},
     )
     msg.send()
 
 
-@shared_task(
-    bind=True,
-    autoretry_for=(Exception,),
-    retry_kwargs={"max_retries": 3, "countdown": 10},
-)
-def send_order_status_email_task(self, order_id: int) -> None:
+@shared_task(ignore_result=True)
+def dispatch_emails_task() -> int:
     """
-    Отправка email при изменении статуса заказа.
+    Отправка писем из очереди пачками через одно соединение.
     """
-    order = Order.objects.get(id=order_id)
-    send_order_status_email(order)
+    return EmailDispatcher.drain_all(max_batches=settings.EMAIL_DISPATCH_MAX_BATCHES)
+
+
+@shared_task(ignore_result=True)
+def flush_notifications_task() -> int:
+    """
+    Отправка объединенных уведомлений о заказах, у которых наступил срок.
+    """
+    return NotificationService.flush(batch_size=settings.NOTIFICATION_FLUSH_BATCH)
 
 
 @shared_task(
     bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
     autoretry_for=(Exception,),
     retry_kwargs={"max_retries": 3, "countdown": 30},
 )
 def do_import(self, url: str) -> None:
     """
     Асинхронный импорт товаров из YAML-файла.
+
+    Подтверждается после выполнения: импорт, прерванный падением воркера,
+    будет выполнен заново (он перезаписывает товары магазина целиком).
     """
     response = get(url, timeout=30)
     response.raise_for_status()
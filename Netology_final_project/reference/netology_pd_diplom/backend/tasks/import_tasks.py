@@ -7,7 +7,7 @@ from backend.services.import_export import ImportExportService
 from celery import shared_task
 
 
-@shared_task(bind=True, max_retries=3)
+@shared_task(bind=True, max_retries=3, acks_late=True, reject_on_worker_lost=True)
 def handle_import(self, task_id: int):
     """
     Обрабатывает задачу импорта данных в фоновом режиме.
@@ -0,0 +1,91 @@
+"""
+Периодические задачи обслуживания данных.
+"""
+
+from datetime import timedelta
+
+from backend.models import IdempotencyKey
+from backend.services.archive import ArchiveService
+from backend.services.email_dispatch import EmailDispatcher
+from backend.services.inventory import StockHoldService, StockShardService
+from backend.services.outbox import OutboxService
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 30},
+)
+def sweep_expired_stock_holds_task(self) -> int:
+    """
+    Удаление просроченных резервов товаров в корзинах.
+    """
+    return StockHoldService.sweep_expired(settings.STOCK_HOLD_SWEEP_BATCH)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 30},
+)
+def consolidate_stock_shards_task(self) -> int:
+    """
+    Консолидация шардированных остатков горячих товаров.
+    """
+    return StockShardService.consolidate_all()
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 30},
+)
+def sweep_idempotency_keys_task(self) -> int:
+    """
+    Удаление ключей идемпотентности старше IDEMPOTENCY_KEY_TTL.
+    """
+    expired = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    return IdempotencyKey.objects.filter(created_at__lt=expired).delete()[0]
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 30},
+)
+def sweep_outbox_events_task(self) -> int:
+    """
+    Удаление обработанных событий outbox старше OUTBOX_RETENTION_DAYS.
+    """
+    return OutboxService.sweep_processed(settings.OUTBOX_RETENTION_DAYS)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 30},
+)
+def sweep_outgoing_emails_task(self) -> int:
+    """
+    Удаление отправленных и окончательно неотправленных писем старше EMAIL_RETENTION_DAYS.
+    """
+    return EmailDispatcher.sweep(settings.EMAIL_RETENTION_DAYS)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 300},
+)
+def archive_orders_task(self) -> int:
+    """
+    Перенос завершенных заказов старше ORDER_ARCHIVE_AFTER_DAYS в архив.
+    """
+    return ArchiveService.archive(
+        settings.ORDER_ARCHIVE_AFTER_DAYS,
+        batch_size=settings.ORDER_ARCHIVE_BATCH,
+        max_batches=settings.ORDER_ARCHIVE_MAX_BATCHES,
+    )
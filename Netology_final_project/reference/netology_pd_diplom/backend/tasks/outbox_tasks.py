@@ -0,0 +1,50 @@
+"""
+Задачи передачи и обработки событий outbox.
+"""
+
+from backend.services.email_render import ORDER_CONFIRMATION
+from backend.services.emails import send_order_emails
+from backend.services.notifications import NotificationService
+from backend.services.outbox import ORDER_CREATED, OutboxService
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 5},
+)
+def relay_outbox_task(self) -> int:
+    """
+    Передача пачки необработанных событий outbox: одна задача на тему.
+    """
+    return OutboxService.relay(
+        lambda topic, event_ids: process_outbox_events_task.delay(topic, event_ids),
+        batch_size=settings.OUTBOX_RELAY_BATCH,
+    )
+
+
+@shared_task(ignore_result=True)
+def process_outbox_events_task(topic: str, event_ids: list) -> None:
+    """
+    Обработка пачки событий заказов.
+
+    На оформление заказа письмо-подтверждение ставится в очередь сразу,
+    смены статуса копятся в отложенных уведомлениях и отправляются
+    объединенными письмами задачей ``flush_notifications_task``. Отметка
+    об обработке и постановка писем в очередь выполняются одной транзакцией:
+    при ошибке откатываются обе, и relay передаст события повторно. Уже
+    обработанные события пропускаются.
+    """
+    with transaction.atomic():
+        events = OutboxService.claim(event_ids)
+        if not events:
+            return
+        if topic == ORDER_CREATED:
+            send_order_emails(ORDER_CONFIRMATION, {event.aggregate_id for event in events})
+        NotificationService.enqueue(
+            (event.aggregate_id, event.payload.get("old_status"), event.payload.get("new_status"))
+            for event in events
+        )
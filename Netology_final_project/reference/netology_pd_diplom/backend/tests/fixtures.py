@@ -0,0 +1,54 @@
+"""Общие данные для тестов: пользователи, магазин с товаром и заказы"""
+from backend.models import Order, OrderItem, Product, ProductInfo, Shop
+from backend.models.users import User
+from backend.services.orders import OrderService
+
+PASSWORD = 'TestPass123'
+
+
+def create_user(email, **fields):
+    """Активный пользователь с паролем PASSWORD"""
+    return User.objects.create_user(email=email, password=PASSWORD, is_active=True, **fields)
+
+
+def create_product_info(shop, quantity=10, external_id=1, product=None, name='Товар', **fields):
+    """Предложение товара в магазине, по умолчанию по цене 100"""
+    fields.setdefault('price', 100)
+    fields.setdefault('price_rrc', 100)
+    return ProductInfo.objects.create(
+        product=product or Product.objects.create(name=name),
+        shop=shop, external_id=external_id, quantity=quantity, **fields,
+    )
+
+
+class OrderFixturesMixin:
+    """
+    Покупатель ``buyer``, магазин ``shop`` партнера ``partner`` с товаром
+    ``product_info`` и создание заказов.
+
+    Атрибуты класса: ``shop_name`` — название магазина, ``product_fields`` —
+    аргументы create_product_info, ``order_state`` — статус новых заказов,
+    ``index_shop_orders`` — запись заказов в индекс заказов магазинов.
+    """
+    shop_name = 'Склад'
+    product_fields = {}
+    order_state = 'basket'
+    index_shop_orders = False
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.buyer = create_user('buyer@gmail.com')
+        cls.partner = create_user('partner@gmail.com', type='shop')
+        cls.shop = Shop.objects.create(name=cls.shop_name, user=cls.partner)
+        cls.product_info = create_product_info(cls.shop, **cls.product_fields)
+
+    def make_order(self, *items, state=None, **fields):
+        """Заказ покупателя с позициями ``(product_info, quantity)``, по умолчанию одна единица товара"""
+        fields.setdefault('user', self.buyer)
+        order = Order.objects.create(state=state or self.order_state, **fields)
+        for product_info, quantity in items or [(self.product_info, 1)]:
+            OrderItem.objects.create(order=order, product_info=product_info, quantity=quantity)
+        if self.index_shop_orders:
+            OrderService.index_shop_orders(order)
+        return order
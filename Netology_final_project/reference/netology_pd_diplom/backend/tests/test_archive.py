@@ -0,0 +1,121 @@
+"""Тесты архивации заказов"""
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import (
+    ArchivedOrder, ArchivedOrderStatusHistory, Contact, Order, OrderItem, OrderStatusHistory,
+    PendingNotification, Shop, ShopOrder
+)
+from backend.services.archive import ArchiveService
+from backend.tests.fixtures import OrderFixturesMixin, create_product_info, create_user
+
+
+class OrderArchiveTestCase(OrderFixturesMixin, TestCase):
+    """Тесты переноса завершенных заказов в архив"""
+
+    shop_name = 'Архивный магазин'
+    product_fields = {'name': 'Старый товар', 'price': 250, 'price_rrc': 300}
+    index_shop_orders = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.contact = Contact.objects.create(
+            user=cls.buyer, city='Москва', street='Тверская', phone='+79991234567'
+        )
+        cls.other_info = create_product_info(
+            Shop.objects.create(name='Другой магазин'), product=cls.product_info.product
+        )
+
+    def make_order(self, state, days_ago, changed_days_ago=None):
+        order = super().make_order((self.product_info, 2), state=state, contact=self.contact)
+        Order.objects.filter(id=order.id).update(dt=timezone.now() - timedelta(days=days_ago))
+        history = OrderStatusHistory.objects.create(order=order, old_status='sent', new_status=state)
+        changed_days_ago = days_ago if changed_days_ago is None else changed_days_ago
+        OrderStatusHistory.objects.filter(id=history.id).update(
+            changed_at=timezone.now() - timedelta(days=changed_days_ago)
+        )
+        return order
+
+    def test_archive_moves_old_final_orders(self):
+        """Тест переноса старых заказов пачками с позициями и историей"""
+        old = [self.make_order('delivered', 200), self.make_order('canceled', 300)]
+        recent = self.make_order('delivered', 10)
+        active = self.make_order('sent', 400)
+
+        self.assertEqual(ArchiveService.archive(180, batch_size=1), 2)
+
+        self.assertEqual(
+            set(Order.objects.values_list('id', flat=True)), {recent.id, active.id}
+        )
+        self.assertFalse(ShopOrder.objects.filter(order_id__in=[o.id for o in old]).exists())
+        archived = ArchivedOrder.objects.get(id=old[0].id)
+        self.assertEqual((archived.total_sum, archived.items_count), (500, 2))
+        self.assertEqual(archived.contact['city'], 'Москва')
+        self.assertEqual(archived.items.get().product_name, 'Старый товар')
+        self.assertEqual(ArchivedOrderStatusHistory.objects.count(), 2)
+
+    def test_archive_skips_recent_and_pending_orders(self):
+        """Тест отсчета от последней смены статуса и пропуска заказов с уведомлениями"""
+        recently_delivered = self.make_order('delivered', 400, changed_days_ago=5)
+        pending = self.make_order('canceled', 400)
+        PendingNotification.objects.create(
+            kind=PendingNotification.Kind.ORDER_STATUS, user=self.buyer, order=pending,
+            old_status='sent', new_status='canceled', send_after=timezone.now(),
+        )
+
+        self.assertEqual(ArchiveService.archive(180), 0)
+        self.assertEqual(PendingNotification.objects.count(), 1)
+
+        PendingNotification.objects.all().delete()
+        self.assertEqual(ArchiveService.archive(180), 1)
+        self.assertEqual(
+            list(Order.objects.values_list('id', flat=True)), [recently_delivered.id]
+        )
+
+    def test_archive_endpoints(self):
+        """Тест чтения архивных заказов через API"""
+        order = self.make_order('delivered', 200)
+        ArchiveService.archive(180)
+        client = APIClient()
+        client.force_authenticate(self.buyer)
+
+        response = client.get(reverse('api:order-archive'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.json()], [order.id])
+
+        response = client.get(reverse('api:order-archive-detail', args=[order.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status_history'][0]['new_status'], 'delivered')
+
+        stranger = create_user('other@gmail.com')
+        client.force_authenticate(stranger)
+        response = client.get(reverse('api:order-archive-detail', args=[order.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_partner_archive_endpoint(self):
+        """Тест архивных заказов магазина только с его позициями"""
+        order = self.make_order('delivered', 200)
+        OrderItem.objects.create(order=order, product_info=self.other_info, quantity=3)
+        self.make_order('delivered', 10)
+        ArchiveService.archive(180)
+        client = APIClient()
+        client.force_authenticate(self.partner)
+
+        response = client.get(reverse('api:partner-orders-archive'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual([item['id'] for item in data], [order.id])
+        self.assertEqual((data[0]['total_sum'], data[0]['items_count']), ('500.00', 2))
+        self.assertEqual([item['shop_name'] for item in data[0]['items']], ['Архивный магазин'])
+
+        response = client.get(reverse('api:partner-orders-archive'), {'summary': 'true'})
+        self.assertEqual(response.json()[0]['total_sum'], '500.00')
+
+        client.force_authenticate(self.buyer)
+        response = client.get(reverse('api:partner-orders-archive'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,8 +1,12 @@
 """Тесты для аутентификации"""
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.test import APIClient
 from rest_framework import status
+from backend.api.authentication import CachedTokenAuthentication, TokenCache
 from backend.models import ConfirmEmailToken
 from backend.models.users import User
 
@@ -115,4 +119,66 @@ class AuthTestCase(TestCase):
         response = self.client.post(self.login_url, login_data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertFalse(response.json()['Status'])
\ No newline at end of file
+        self.assertFalse(response.json()['Status'])
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    """Тесты кэширования токенов"""
+
+    def setUp(self):
+        cache.clear()
+        TokenCache.clear_local()
+        self.user = User.objects.create_user(
+            email='cached@gmail.com', password='TestPass123', is_active=True
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_cached_lookup(self):
+        """Тест проверки токена без запросов к базе после первого обращения"""
+        with self.assertNumQueries(1):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+
+        user.first_name = 'Изменено'
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user.first_name, '')
+
+        TokenCache.clear_local()
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_invalidation(self):
+        """Тест сброса кэша при смене пароля, деактивации и выходе"""
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.set_password('NewPass456')
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = True
+        self.user.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = client.post(reverse('api:user-logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_invalidation_during_lookup(self):
+        """Тест пропуска записи в кэш, если токен инвалидирован во время чтения из базы"""
+        version = TokenCache.version(self.token.key)
+        token = Token.objects.select_related('user').get(key=self.token.key)
+        TokenCache.invalidate(self.token.key)
+
+        self.assertFalse(TokenCache.set(token, version))
+        self.assertIsNone(TokenCache.get(self.token.key))
+        with self.assertNumQueries(1):
+            self.auth.authenticate_credentials(self.token.key)
+        self.assertIsNotNone(TokenCache.get(self.token.key))
@@ -0,0 +1,43 @@
+"""Тесты маршрутизации задач Celery по очередям"""
+from django.test import SimpleTestCase
+from netology_pd_diplom_project.celery import WORKER_PROFILES, app
+
+# Задача -> ожидаемая очередь
+ROUTES = {
+    'backend.tasks.celery_tasks.do_import': 'imports',
+    'backend.tasks.import_tasks.handle_import': 'imports',
+    'backend.tasks.celery_tasks.send_generic_email_task': 'notifications',
+    'backend.tasks.celery_tasks.send_confirmation_email_task': 'notifications',
+    'backend.tasks.celery_tasks.dispatch_emails_task': 'notifications',
+    'backend.tasks.maintenance_tasks.archive_orders_task': 'maintenance',
+    'backend.tasks.outbox_tasks.relay_outbox_task': 'default',
+}
+
+
+class CeleryRoutingTestCase(SimpleTestCase):
+    """Тесты очередей задач и профилей воркеров"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        app.loader.import_default_modules()
+
+    def test_tasks_are_routed_to_queues(self):
+        """Тест очереди каждой группы задач"""
+        for task, queue in ROUTES.items():
+            with self.subTest(task=task):
+                self.assertIn(task, app.tasks)
+                self.assertEqual(app.amqp.router.route({}, task)['queue'].name, queue)
+
+    def test_imports_are_acknowledged_late(self):
+        """Тест подтверждения импортов после выполнения"""
+        for task in ('backend.tasks.celery_tasks.do_import', 'backend.tasks.import_tasks.handle_import'):
+            with self.subTest(task=task):
+                self.assertTrue(app.tasks[task].acks_late)
+                self.assertTrue(app.tasks[task].reject_on_worker_lost)
+        self.assertEqual(WORKER_PROFILES['imports']['prefetch_multiplier'], 1)
+
+    def test_profiles_cover_all_queues(self):
+        """Тест профилей воркеров для всех очередей"""
+        queues = {queue for profile in WORKER_PROFILES.values() for queue in profile['queues']}
+        self.assertEqual(queues, set(app.amqp.queues))
@@ -0,0 +1,25 @@
+"""Тесты системных проверок конфигурации"""
+from django.test import SimpleTestCase, override_settings
+from backend.checks import check_persistent_connections
+
+
+POSTGRES = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'netology'}
+
+
+class PersistentConnectionsCheckTestCase(SimpleTestCase):
+    """Тесты предупреждения о соединении на каждый запрос"""
+
+    @override_settings(DATABASES={'default': dict(POSTGRES, CONN_MAX_AGE=0)})
+    def test_per_request_connection_warns(self):
+        """Тест предупреждения при CONN_MAX_AGE=0 без пула"""
+        warnings = check_persistent_connections(None)
+        self.assertEqual([warning.id for warning in warnings], ['backend.W001'])
+
+    @override_settings(DATABASES={
+        'default': dict(POSTGRES, CONN_MAX_AGE=600),
+        'pooled': dict(POSTGRES, CONN_MAX_AGE=0, OPTIONS={'pool': {'max_size': 8}}),
+        'local': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+    })
+    def test_persistent_and_pooled_connections(self):
+        """Тест отсутствия предупреждения для постоянных соединений, пула и SQLite"""
+        self.assertEqual(check_persistent_connections(None), [])
@@ -0,0 +1,136 @@
+"""Тесты очереди исходящих писем"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from backend.models import (
+    EmailLog, Order, OrderItem, OutgoingEmail, Product, ProductInfo, Shop
+)
+from backend.models.users import User
+from backend.services.email_dispatch import (
+    EMAIL_TYPE_HEADER, EmailDispatcher, QueuedEmailBackend
+)
+from backend.services.email_render import ORDER_CONFIRMATION, OrderEmailRenderer
+
+
+@override_settings(
+    EMAIL_DISPATCH_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_DOMAIN_RATE_LIMITS={'default': 10, 'slow.example': 2},
+)
+class EmailDispatcherTestCase(TestCase):
+    """Тесты пакетной отправки писем из очереди"""
+
+    def enqueue(self, *addresses):
+        QueuedEmailBackend().send_messages([
+            EmailMessage(
+                subject='Тема', body='Текст', to=[address],
+                headers={EMAIL_TYPE_HEADER: 'order_status'},
+            )
+            for address in addresses
+        ])
+
+    def test_drain_respects_domain_limits(self):
+        """Тест отправки пачкой с лимитом по домену и записью в EmailLog"""
+        self.enqueue('a@slow.example', 'b@slow.example', 'c@slow.example', 'd@fast.example')
+        self.assertEqual(len(mail.outbox), 0)
+
+        with self.assertNumQueries(7):  # лимиты, захват пачки, статусы, EmailLog
+            result = EmailDispatcher.drain()
+        self.assertEqual(result, {'sent': 3, 'failed': 0})
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['a@slow.example', 'b@slow.example', 'd@fast.example'],
+        )
+        self.assertNotIn(EMAIL_TYPE_HEADER, mail.outbox[0].extra_headers)
+
+        self.assertEqual(EmailDispatcher.drain(), {'sent': 0, 'failed': 0})
+        self.assertEqual(
+            OutgoingEmail.objects.get(status=OutgoingEmail.Status.PENDING).to, ['c@slow.example']
+        )
+        self.assertEqual(
+            EmailLog.objects.filter(status=True, email_type='order_status').count(), 3
+        )
+
+    def test_enqueue_assigns_user(self):
+        """Тест привязки письма и записи EmailLog к пользователю по адресу получателя"""
+        user = User.objects.create_user(email='a@fast.example', password='TestPass123')
+        self.enqueue('a@fast.example', 'b@fast.example')
+
+        self.assertEqual(
+            sorted((email.to[0], email.user_id) for email in OutgoingEmail.objects.all()),
+            [('a@fast.example', user.id), ('b@fast.example', None)],
+        )
+        EmailDispatcher.drain()
+        self.assertEqual(EmailLog.objects.get(email='a@fast.example').user_id, user.id)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=1)
+    def test_final_failures_are_updated_per_error(self):
+        """Тест одного UPDATE на сообщение об ошибке для окончательно неотправленных писем"""
+        self.enqueue('a@fast.example', 'b@fast.example', 'c@fast.example')
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=ConnectionError('SMTP недоступен'),
+        ), CaptureQueriesContext(connection) as queries:
+            result = EmailDispatcher.drain()
+
+        self.assertEqual(result, {'sent': 0, 'failed': 3})
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE') and "'failed'" in query['sql']
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            set(OutgoingEmail.objects.values_list('status', 'error_message')),
+            {(OutgoingEmail.Status.FAILED, 'SMTP недоступен')},
+        )
+
+    def test_sweep_removes_finished_emails(self):
+        """Тест удаления отправленных и неотправленных писем старше срока хранения"""
+        self.enqueue('a@fast.example', 'b@fast.example', 'c@fast.example')
+        EmailDispatcher.drain()
+        self.enqueue('d@fast.example')
+        OutgoingEmail.objects.filter(to__0='c@fast.example').update(
+            status=OutgoingEmail.Status.FAILED
+        )
+        OutgoingEmail.objects.update(created_at=timezone.now() - timedelta(days=8))
+        OutgoingEmail.objects.filter(to__0='b@fast.example').update(created_at=timezone.now())
+
+        self.assertEqual(EmailDispatcher.sweep(days=7), 2)
+        self.assertEqual(
+            sorted(email.to[0] for email in OutgoingEmail.objects.all()),
+            ['b@fast.example', 'd@fast.example'],
+        )
+
+
+class OrderEmailRendererTestCase(TestCase):
+    """Тесты пакетного рендеринга писем по заказам"""
+
+    def test_render_batch_in_two_queries(self):
+        """Тест загрузки пачки заказов двумя запросами и рендеринга без обращений к БД"""
+        user = User.objects.create_user(
+            email='render@gmail.com', password='TestPass123', first_name='Анна'
+        )
+        shop = Shop.objects.create(name='Склад')
+        product = Product.objects.create(name='Чайник')
+        product_info = ProductInfo.objects.create(
+            product=product, shop=shop, external_id=1, price=990, price_rrc=990, quantity=5
+        )
+        orders = [Order.objects.create(user=user, state='new') for _ in range(3)]
+        for order in orders:
+            OrderItem.objects.create(order=order, product_info=product_info, quantity=2)
+
+        with self.assertNumQueries(2):
+            loaded = OrderEmailRenderer.load_orders([order.id for order in orders])
+            rendered = OrderEmailRenderer.render(ORDER_CONFIRMATION, loaded)
+
+        self.assertEqual(len(rendered), 3)
+        subject, html = rendered[0]
+        self.assertEqual(subject, f'Заказ #{orders[0].id} подтвержден')
+        self.assertIn('Чайник - 2 шт.', html)
+        self.assertIn('Анна', html)
@@ -0,0 +1,81 @@
+"""Тесты генерации синтетических данных"""
+import filecmp
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from backend.models import (
+    Category, Contact, Order, OrderItem, OrderState, Product, ProductInfo, ProductParameter,
+    Shop, ShopOrder
+)
+from backend.models.users import User
+
+
+class GenerateDataTestCase(TestCase):
+    """Тесты команды generate_data"""
+
+    options = {
+        'shops': 3, 'categories': 5, 'products': 40, 'offers': 200, 'parameters': 3,
+        'users': 20, 'orders': 300, 'batch_size': 64, 'stdout': StringIO(),
+    }
+
+    def test_generate_catalog_and_orders(self):
+        """Тест объема данных, статусов заказов и индекса заказов магазинов"""
+        call_command('generate_data', **self.options)
+
+        self.assertEqual(Shop.objects.count(), 3)
+        self.assertEqual(Product.objects.count(), 40)
+        self.assertEqual(ProductInfo.objects.count(), 200)
+        self.assertEqual(ProductParameter.objects.count(), 600)
+        self.assertEqual(User.objects.count(), 20)
+        self.assertTrue(Contact.objects.exists())
+        self.assertEqual(Order.objects.count(), 300)
+        self.assertEqual(set(Order.objects.values_list('state', flat=True)), set(OrderState.values))
+        self.assertFalse(
+            Order.objects.filter(state='basket').values('user')
+            .annotate(baskets=Count('id')).filter(baskets__gt=1).exists()
+        )
+        self.assertFalse(Order.objects.exclude(state='basket').filter(contact=None).exists())
+
+        # Крупнейший магазин по закону Ципфа содержит больше всего предложений
+        sizes = list(
+            ProductInfo.objects.values('shop').annotate(offers=Count('id'))
+            .order_by('shop').values_list('offers', flat=True)
+        )
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+        pairs = set(
+            OrderItem.objects.exclude(order__state='basket')
+            .values_list('order_id', 'product_info__shop_id')
+        )
+        self.assertEqual(set(ShopOrder.objects.values_list('order_id', 'shop_id')), pairs)
+
+        # Повторный запуск дописывает данные после существующих ключей
+        call_command('generate_data', **self.options)
+        self.assertEqual(ProductInfo.objects.count(), 400)
+        self.assertEqual(Order.objects.count(), 600)
+
+    def test_yaml_feeds_are_deterministic_and_loadable(self):
+        """Тест одинаковых фидов для одного seed и их загрузки командой load_shop_data"""
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            for directory in (first, second):
+                call_command('generate_data', yaml_dir=directory, yaml_only=True, **self.options)
+            names = sorted(os.listdir(first))
+            self.assertEqual(names, ['shop1.yaml', 'shop2.yaml', 'shop3.yaml'])
+            self.assertEqual(filecmp.cmpfiles(first, second, names, shallow=False)[0], names)
+            self.assertFalse(ProductInfo.objects.exists())
+
+            call_command(
+                'load_shop_data', file=os.path.join(first, 'shop1.yaml'), stdout=StringIO()
+            )
+        shop = Shop.objects.get()
+        goods = ProductInfo.objects.filter(shop=shop)
+        self.assertGreater(goods.count(), 200 // 3)
+        self.assertEqual(ProductParameter.objects.count(), goods.count() * 3)
+        self.assertEqual(
+            set(Category.objects.values_list('id', flat=True)),
+            set(goods.values_list('product__category_id', flat=True)),
+        )
@@ -0,0 +1,149 @@
+"""Тесты резервирования складских остатков"""
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from backend.models import OrderItem, ProductInfo, StockHold, StockShard
+from backend.services.inventory import (
+    InventoryError, InventoryService, StockHoldService, StockShardService
+)
+from backend.services.orders import OrderService
+from backend.tests.fixtures import OrderFixturesMixin, create_product_info, create_user
+
+
+class InventoryServiceTestCase(OrderFixturesMixin, TestCase):
+    """Тесты InventoryService"""
+
+    product_fields = {'quantity': 5}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.first = cls.product_info
+        cls.second = create_product_info(
+            cls.shop, quantity=2, external_id=2, product=cls.first.product
+        )
+
+    def test_reserve_and_release(self):
+        """Тест списания и возврата остатков одним запросом на все позиции"""
+        order = self.make_order((self.first, 3), (self.second, 2))
+
+        with self.assertNumQueries(6):  # savepoint, агрегат, блокировка, резервы, UPDATE, release
+            InventoryService.reserve_for_order(order)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.quantity, self.second.quantity), (2, 0))
+
+        InventoryService.release_for_order(order)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.quantity, self.second.quantity), (5, 2))
+
+    def test_reserve_not_enough_stock(self):
+        """Тест отказа в резерве без частичного списания"""
+        order = self.make_order((self.first, 1), (self.second, 3))
+
+        with self.assertRaises(InventoryError):
+            InventoryService.reserve_for_order(order)
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.quantity, self.second.quantity), (5, 2))
+
+    def test_failed_checkout_keeps_order_state(self):
+        """Тест отката статуса и версии объекта заказа при нехватке остатков"""
+        order = self.make_order((self.second, 3))
+        version = order.version
+
+        with self.assertRaises(InventoryError):
+            OrderService.change_status(order, 'new')
+
+        self.assertEqual((order.state, order.version), ('basket', version))
+        self.assertEqual(order.get_dirty_fields(), {})
+        order.refresh_from_db()
+        self.assertEqual((order.state, order.version), ('basket', version))
+
+
+class StockHoldTestCase(OrderFixturesMixin, TestCase):
+    """Тесты резервов товаров в корзинах"""
+
+    product_fields = {'quantity': 3}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.rival = create_user('rival@gmail.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.basket_url = reverse('api:basket')
+
+    def add_to_basket(self, user, quantity):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            self.basket_url,
+            {'items': [{'product_info': self.product_info.id, 'quantity': quantity}]},
+            format='json',
+        )
+
+    def test_basket_hold_reduces_availability(self):
+        """Тест удержания товара корзиной и отказа другому покупателю"""
+        self.assertEqual(self.add_to_basket(self.buyer, 2).status_code, 201)
+        hold = StockHold.objects.get(order__user=self.buyer)
+        self.assertEqual(hold.quantity, 2)
+
+        with self.assertNumQueries(1):
+            self.assertFalse(self.product_info.check_availability(2))
+        self.assertTrue(self.product_info.check_availability(3, exclude_order_id=hold.order_id))
+
+        response = self.add_to_basket(self.rival, 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(OrderItem.objects.filter(order__user=self.rival).exists())
+
+        available = ProductInfo.objects.with_available().get(id=self.product_info.id)
+        self.assertEqual(available.available_quantity, 1)
+
+    def test_expired_holds_are_ignored_and_swept(self):
+        """Тест игнорирования и удаления просроченных резервов"""
+        self.add_to_basket(self.buyer, 3)
+        StockHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertTrue(self.product_info.check_availability(3))
+        self.assertEqual(StockHoldService.sweep_expired(batch_size=1), 1)
+        self.assertFalse(StockHold.objects.exists())
+
+
+class StockShardTestCase(OrderFixturesMixin, TestCase):
+    """Тесты шардированных остатков"""
+
+    product_fields = {'stock_shards': 3}
+
+    def setUp(self):
+        StockShardService.consolidate(self.product_info.id)
+
+    def stock_total(self):
+        return ProductInfo.objects.with_stock_total().get(id=self.product_info.id).stock_total
+
+    def test_consolidate_distributes_stock(self):
+        """Тест распределения остатка по шардам без потери количества"""
+        shards = list(StockShard.objects.order_by('shard_no').values_list('quantity', flat=True))
+        self.assertEqual(shards, [3, 3, 3])
+        self.assertEqual(self.stock_total(), 10)
+
+    def test_reserve_from_shards(self):
+        """Тест резерва с шарда и со всей суммы при раздробленном остатке"""
+        InventoryService.reserve_for_order(self.make_order((self.product_info, 2)))
+        self.assertEqual(self.stock_total(), 8)
+
+        big_order = self.make_order((self.product_info, 7))
+        InventoryService.reserve_for_order(big_order)
+        self.assertEqual(self.stock_total(), 1)
+
+        InventoryService.release_for_order(big_order)
+        self.assertEqual(self.stock_total(), 8)
+
+        with self.assertRaises(InventoryError):
+            InventoryService.reserve_for_order(self.make_order((self.product_info, 9)))
+        self.assertEqual(self.stock_total(), 8)
@@ -0,0 +1,51 @@
+"""Тесты метрик запросов"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from backend.metrics import REQUEST_QUERIES, REQUEST_SERIALIZER_DURATION
+from backend.models import Category
+
+
+class RequestMetricsTestCase(TestCase):
+    """Тесты middleware метрик и эндпоинта /metrics"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.bulk_create([Category(name=f'Категория {number}') for number in range(3)])
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(METRICS_QUERY_COUNT_HEADER=True)
+    def test_query_count_header_and_histograms(self):
+        """Тест заголовка X-Query-Count и записи гистограмм по имени представления"""
+        response = self.client.get('/api/v1/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(int(response['X-Query-Count']), 1)
+        self.assertEqual(REQUEST_QUERIES.snapshot()['backend:categories'][2], 1)
+        self.assertGreater(REQUEST_SERIALIZER_DURATION.snapshot()['backend:categories'][1], 0)
+
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_db_queries_bucket{view="backend:categories",le="+Inf"}', body)
+        self.assertIn('http_response_size_bytes_count{view="backend:categories"}', body)
+
+    @override_settings(METRICS_QUERY_COUNT_HEADER=False, METRICS_TOKEN='secret')
+    def test_header_disabled_and_token(self):
+        """Тест отключенного заголовка и доступа к /metrics по токену"""
+        response = self.client.get('/api/v1/categories/')
+        self.assertNotIn('X-Query-Count', response)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_histograms_are_shared_between_processes(self):
+        """Тест общих рядов для всех процессов: наблюдения пишутся в кэш"""
+        REQUEST_QUERIES.observe('backend:categories', 3)
+        REQUEST_QUERIES.observe('unresolved', 1)
+        # Наблюдение другого воркера gunicorn приходит через тот же кэш
+        cache.incr(REQUEST_QUERIES.key('backend:categories', 'count'))
+
+        series = REQUEST_QUERIES.snapshot()
+        self.assertEqual(series['backend:categories'][2], 2)
+        self.assertEqual(series['unresolved'][2], 1)
+        self.assertNotIn('backend:shops', series)
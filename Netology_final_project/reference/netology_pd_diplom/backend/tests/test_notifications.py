@@ -0,0 +1,72 @@
+"""Тесты объединения уведомлений о заказах"""
+from datetime import timedelta
+
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from backend.models import OutboxEvent, PendingNotification
+from backend.services.notifications import NotificationService
+from backend.services.orders import OrderService
+from backend.services.outbox import ORDER_CREATED, ORDER_STATUS_CHANGED
+from backend.tasks.outbox_tasks import process_outbox_events_task
+from backend.tests.fixtures import OrderFixturesMixin
+
+
+class NotificationTestCase(OrderFixturesMixin, TestCase):
+    """Тесты накопления смен статуса и сводки магазина"""
+
+    index_shop_orders = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.shop.order_digest = True
+        cls.shop.save(update_fields=['order_digest'])
+
+    def process(self, topic):
+        event_ids = list(OutboxEvent.objects.filter(topic=topic).values_list('id', flat=True))
+        process_outbox_events_task.apply(args=(topic, event_ids))
+
+    def test_status_changes_coalesce_per_recipient(self):
+        """Тест одного письма покупателю по нескольким заказам и сменам статуса"""
+        orders = [self.make_order() for _ in range(3)]
+        for order in orders:
+            OrderService.change_status(order, 'new')
+        self.process(ORDER_CREATED)
+        self.assertEqual(len(mail.outbox), 3)
+
+        for order in orders:
+            for state in ('confirmed', 'assembled', 'sent', 'delivered'):
+                OrderService.change_status(order, state)
+        self.process(ORDER_STATUS_CHANGED)
+
+        pending = PendingNotification.objects.filter(kind='order_status')
+        self.assertEqual(pending.count(), 3)
+        self.assertEqual(set(pending.values_list('old_status', 'new_status')), {('new', 'delivered')})
+
+        self.assertEqual(NotificationService.flush(), 0)
+        with self.assertNumQueries(5):
+            sent = NotificationService.flush(now=timezone.now() + timedelta(hours=1))
+        self.assertEqual(sent, 2)
+        self.assertFalse(PendingNotification.objects.exists())
+
+        buyer_email = next(email for email in mail.outbox[3:] if email.to == [self.buyer.email])
+        self.assertEqual(buyer_email.subject, 'Изменены статусы заказов (3)')
+        self.assertEqual(buyer_email.body.count('Доставлен'), 3)
+
+    def test_shop_digest(self):
+        """Тест ежечасной сводки заказов для администратора магазина"""
+        order = self.make_order()
+        OrderService.change_status(order, 'new')
+        self.process(ORDER_CREATED)
+
+        digest = PendingNotification.objects.get(kind='shop_digest')
+        self.assertEqual(digest.user_id, self.partner.id)
+        self.assertEqual(digest.send_after.minute, 0)
+        self.assertGreater(digest.send_after, timezone.now())
+
+        mail.outbox.clear()
+        NotificationService.flush(now=digest.send_after)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.partner.email])
+        self.assertEqual(mail.outbox[0].subject, 'Сводка заказов магазина Склад')
@@ -1,10 +1,17 @@
 """Тесты для заказов"""
+import hashlib
+import json
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from backend.models import Order, OrderItem, Product, ProductInfo, Shop, Category, Contact
+from backend.models import (
+    Order, OrderItem, Product, ProductInfo, Shop, ShopOrder, Category, Contact, IdempotencyKey
+)
 from backend.models.users import User
 
 
@@ -99,6 +106,88 @@ class OrderTestCase(TestCase):
         self.assertEqual(order.state, 'new')
         self.assertEqual(order.contact, self.contact)
 
+    def test_confirm_order_indexes_shop(self):
+        """Тест записи оформленного заказа в индекс заказов магазина"""
+        order = Order.objects.create(user=self.user, state='basket')
+        OrderItem.objects.create(order=order, product_info=self.product_info, quantity=1)
+
+        self.client.post(self.order_url, {'id': order.id, 'contact': self.contact.id}, format='json')
+
+        shop_order = ShopOrder.objects.get(order=order)
+        self.assertEqual(shop_order.shop, self.shop)
+        self.assertEqual(shop_order.state, 'new')
+
+    def test_confirm_order_idempotency_key(self):
+        """Тест повтора оформления с тем же Idempotency-Key"""
+        order = Order.objects.create(user=self.user, state='basket')
+        OrderItem.objects.create(order=order, product_info=self.product_info, quantity=3)
+        payload = {'id': order.id, 'contact': self.contact.id}
+
+        first = self.client.post(
+            self.order_url, payload, format='json', HTTP_IDEMPOTENCY_KEY='checkout-1'
+        )
+        replay = self.client.post(
+            self.order_url, payload, format='json', HTTP_IDEMPOTENCY_KEY='checkout-1'
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.product_info.refresh_from_db()
+        self.assertEqual(self.product_info.quantity, 7)
+        self.assertEqual(order.status_history.count(), 1)
+
+        other = self.client.post(
+            self.order_url, {'id': order.id, 'contact': 0}, format='json',
+            HTTP_IDEMPOTENCY_KEY='checkout-1',
+        )
+        self.assertEqual(other.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_confirm_order_abandoned_idempotency_key(self):
+        """Тест перехвата ключа, запрос по которому не завершился за IDEMPOTENCY_LEASE"""
+        order = Order.objects.create(user=self.user, state='basket')
+        OrderItem.objects.create(order=order, product_info=self.product_info, quantity=3)
+        payload = {'id': order.id, 'contact': self.contact.id}
+        record = IdempotencyKey.objects.create(
+            user=self.user, key='checkout-1', method='POST', path=self.order_url,
+            request_hash=hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest(),
+        )
+
+        running = self.client.post(
+            self.order_url, payload, format='json', HTTP_IDEMPOTENCY_KEY='checkout-1'
+        )
+        self.assertEqual(running.status_code, status.HTTP_409_CONFLICT)
+
+        IdempotencyKey.objects.filter(id=record.id).update(
+            created_at=timezone.now() - timedelta(minutes=10)
+        )
+        with self.settings(IDEMPOTENCY_LEASE=60):
+            retry = self.client.post(
+                self.order_url, payload, format='json', HTTP_IDEMPOTENCY_KEY='checkout-1'
+            )
+
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.product_info.refresh_from_db()
+        self.assertEqual(self.product_info.quantity, 7)
+        self.assertEqual(
+            IdempotencyKey.objects.get(user=self.user, key='checkout-1').status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_confirm_order_not_enough_stock(self):
+        """Тест отказа в оформлении при нехватке товара"""
+        order = Order.objects.create(user=self.user, state='basket')
+        OrderItem.objects.create(order=order, product_info=self.product_info, quantity=11)
+
+        response = self.client.post(
+            self.order_url, {'id': order.id, 'contact': self.contact.id}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        order.refresh_from_db()
+        self.assertEqual(order.state, 'basket')
+
     def test_get_orders(self):
         """Тест получения списка заказов"""
         order = Order.objects.create(user=self.user, state='new', contact=self.contact)
@@ -110,6 +199,57 @@ class OrderTestCase(TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['state'], 'new')
 
+    def test_get_orders_paginated(self):
+        """Тест постраничного получения заказов"""
+        orders = [
+            Order.objects.create(user=self.user, state='new', contact=self.contact)
+            for _ in range(3)
+        ]
+
+        response = self.client.get(self.order_url, {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = [order['id'] for order in response.json()]
+        self.assertEqual(len(first_page), 2)
+        self.assertIn('X-Next-Cursor', response)
+
+        response = self.client.get(
+            self.order_url, {'limit': 2, 'cursor': response['X-Next-Cursor']}
+        )
+        second_page = [order['id'] for order in response.json()]
+        self.assertNotIn('X-Next-Cursor', response)
+        self.assertEqual(
+            sorted(first_page + second_page), sorted(order.id for order in orders)
+        )
+
+    def test_get_orders_summary_and_filter(self):
+        """Тест краткого режима и фильтра по статусу"""
+        order = Order.objects.create(user=self.user, state='new', contact=self.contact)
+        OrderItem.objects.create(order=order, product_info=self.product_info, quantity=2)
+        Order.objects.create(user=self.user, state='canceled', contact=self.contact)
+
+        response = self.client.get(self.order_url, {'summary': 'true', 'state': 'new'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(len(data), 1)
+        self.assertNotIn('ordered_items', data[0])
+        self.assertEqual(data[0]['items_count'], 2)
+
+        response = self.client.get(self.order_url, {'state': 'basket'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_order_detail(self):
+        """Тест получения одного заказа"""
+        order = Order.objects.create(user=self.user, state='new', contact=self.contact)
+        OrderItem.objects.create(order=order, product_info=self.product_info, quantity=1)
+
+        response = self.client.get(reverse('api:order-detail', args=[order.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['ordered_items']), 1)
+
+        basket = Order.objects.create(user=self.user, state='basket')
+        response = self.client.get(reverse('api:order-detail', args=[basket.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_unauthorized_access(self):
         """Тест доступа без авторизации"""
         self.client.credentials()  # убираем токен
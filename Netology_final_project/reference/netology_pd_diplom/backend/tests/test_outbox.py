@@ -0,0 +1,104 @@
+"""Тесты событий outbox"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from backend.models import Order, OutboxEvent, PendingNotification
+from backend.services.orders import OrderService
+from backend.services.outbox import ORDER_CREATED, ORDER_STATUS_CHANGED, OutboxService
+from backend.tasks.outbox_tasks import process_outbox_events_task
+from backend.tests.fixtures import OrderFixturesMixin
+
+
+class OutboxTestCase(OrderFixturesMixin, TestCase):
+    """Тесты записи и обработки событий заказов"""
+
+    def test_events_only_on_state_transitions(self):
+        """Тест записи событий только при реальной смене статуса"""
+        order = self.make_order()
+        OrderService.change_status(order, 'new')
+        OrderService.change_status(order, 'confirmed')
+        self.assertEqual(
+            list(OutboxEvent.objects.order_by('id').values_list('topic', flat=True)),
+            [ORDER_CREATED, ORDER_STATUS_CHANGED],
+        )
+
+        order = Order.objects.get(id=order.id)
+        order.admin_email_sent = True
+        order.save()
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+
+        order.state = 'canceled'
+        order.save()
+        event = OutboxEvent.objects.latest('id')
+        self.assertEqual(event.payload, {'old_status': 'confirmed', 'new_status': 'canceled'})
+        self.assertEqual(order.get_dirty_fields(), {})
+
+    def test_relay_and_idempotent_processing(self):
+        """Тест пакетной передачи и однократной обработки событий"""
+        orders = [self.make_order() for _ in range(3)]
+        for order in orders:
+            OrderService.change_status(order, 'new')
+            OrderService.change_status(order, 'sent')
+
+        dispatched = []
+        self.assertEqual(OutboxService.relay(lambda topic, ids: dispatched.append(topic)), 6)
+        self.assertEqual(OutboxService.relay(lambda topic, ids: dispatched.append(topic)), 0)
+
+        event_ids = list(
+            OutboxEvent.objects.filter(topic=ORDER_STATUS_CHANGED).values_list('id', flat=True)
+        )
+        process_outbox_events_task.apply(args=(ORDER_STATUS_CHANGED, event_ids))
+        process_outbox_events_task.apply(args=(ORDER_STATUS_CHANGED, event_ids))
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(PendingNotification.objects.count(), 3)
+        self.assertFalse(
+            OutboxEvent.objects.filter(id__in=event_ids, processed_at__isnull=True).exists()
+        )
+
+    def test_failed_processing_keeps_events(self):
+        """Тест отката отметки об обработке вместе с ошибкой постановки уведомлений"""
+        order = self.make_order()
+        OrderService.change_status(order, 'new')
+        OrderService.change_status(order, 'sent')
+        event_ids = list(
+            OutboxEvent.objects.filter(topic=ORDER_STATUS_CHANGED).values_list('id', flat=True)
+        )
+
+        with patch(
+            'backend.tasks.outbox_tasks.NotificationService.enqueue', side_effect=RuntimeError
+        ):
+            result = process_outbox_events_task.apply(args=(ORDER_STATUS_CHANGED, event_ids))
+
+        self.assertEqual(result.state, 'FAILURE')
+        self.assertEqual(
+            OutboxEvent.objects.filter(id__in=event_ids, processed_at__isnull=True).count(), 1
+        )
+        process_outbox_events_task.apply(args=(ORDER_STATUS_CHANGED, event_ids))
+        self.assertEqual(PendingNotification.objects.count(), 1)
+
+    def test_exhausted_events_are_marked_failed(self):
+        """Тест пометки событий, исчерпавших попытки, и их повторного запуска"""
+        order = self.make_order()
+        OrderService.change_status(order, 'new')
+        event = OutboxEvent.objects.get()
+        OutboxEvent.objects.filter(id=event.id).update(
+            attempts=settings.OUTBOX_MAX_ATTEMPTS,
+            dispatched_at=timezone.now() - timedelta(seconds=settings.OUTBOX_REDISPATCH_AFTER + 1),
+        )
+
+        with self.assertLogs('backend.outbox', 'ERROR') as logs:
+            self.assertEqual(OutboxService.relay(lambda topic, ids: None), 0)
+        self.assertIn(f'Outbox event {event.id}', logs.output[0])
+        event.refresh_from_db()
+        self.assertIsNotNone(event.failed_at)
+
+        self.assertEqual(OutboxService.replay([event.id]), 1)
+        dispatched = []
+        self.assertEqual(OutboxService.relay(lambda topic, ids: dispatched.extend(ids)), 1)
+        event.refresh_from_db()
+        self.assertEqual((event.attempts, event.failed_at), (1, None))
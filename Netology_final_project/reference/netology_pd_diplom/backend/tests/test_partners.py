@@ -0,0 +1,194 @@
+"""Тесты для партнёрских эндпоинтов"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from backend.models import (
+    Order, OrderStatusHistory, OutboxEvent, ProductInfo, Shop, ShopOrder,
+    ShopProductSalesDaily, ShopSalesDaily
+)
+from backend.services.analytics import SalesRollupService
+from backend.services.orders import OrderConflictError, OrderService, OrderTransitionError
+from backend.tests.fixtures import OrderFixturesMixin, create_product_info
+
+
+class PartnerOrdersBaseTestCase(OrderFixturesMixin, TestCase):
+    """Общие данные для тестов заказов магазина"""
+
+    product_fields = {'quantity': 50}
+    order_state = 'new'
+    index_shop_orders = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_info = create_product_info(
+            Shop.objects.create(name='Чужой склад'), quantity=50, external_id=2,
+            product=cls.product_info.product,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.partner)
+        self.url = reverse('api:partner-orders-bulk')
+
+
+class PartnerOrdersBulkTestCase(PartnerOrdersBaseTestCase):
+    """Тесты массовой смены статуса заказов магазина"""
+
+    def test_bulk_status_change(self):
+        """Тест перевода нескольких заказов в статус 'sent' с результатом по каждому"""
+        orders = [self.make_order() for _ in range(3)]
+        canceled = self.make_order(state='canceled')
+        foreign = self.make_order((self.other_info, 1))
+        order_ids = [order.id for order in orders] + [canceled.id, foreign.id]
+
+        response = self.client.post(
+            self.url, {'order_ids': order_ids, 'status': 'sent'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['updated'], 3)
+        self.assertEqual([item['order_id'] for item in data['results']], order_ids)
+        self.assertEqual([item['status'] for item in data['results']], [True] * 3 + [False] * 2)
+
+        self.assertEqual(Order.objects.filter(id__in=order_ids[:3], state='sent').count(), 3)
+        self.assertEqual(ShopOrder.objects.filter(order_id__in=order_ids[:3], state='sent').count(), 3)
+        self.assertEqual(OrderStatusHistory.objects.filter(new_status='sent').count(), 3)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.state, 'new')
+
+    def test_bulk_status_validation(self):
+        """Тест отказа для недопустимого статуса и пользователя без магазина"""
+        response = self.client.post(
+            self.url, {'order_ids': [1], 'status': 'canceled'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.buyer)
+        response = self.client.post(self.url, {'order_ids': [1], 'status': 'sent'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OrderStateMachineTestCase(PartnerOrdersBaseTestCase):
+    """Тесты переходов статуса и оптимистичной блокировки"""
+
+    def test_invalid_transition(self):
+        """Тест запрета перехода, которого нет в таблице"""
+        order = self.make_order(state='delivered')
+
+        with self.assertRaises(OrderTransitionError):
+            OrderService.change_status(order, 'sent')
+
+        response = self.client.post(
+            reverse('api:partner-orders'), {'order_id': order.id, 'status': 'sent'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_concurrent_change_conflict(self):
+        """Тест конфликта при изменении заказа по устаревшей версии"""
+        order = self.make_order()
+        stale = Order.objects.get(id=order.id)
+
+        OrderService.change_status(order, 'confirmed')
+        with self.assertRaises(OrderConflictError):
+            OrderService.change_status(stale, 'canceled')
+
+        order.refresh_from_db()
+        self.assertEqual((order.state, order.version), ('confirmed', 1))
+        self.assertEqual(order.status_history.count(), 1)
+
+
+class PartnerAnalyticsTestCase(PartnerOrdersBaseTestCase):
+    """Тесты агрегатов продаж и аналитики магазина"""
+
+    def checkout(self, quantity):
+        order = self.make_order((self.product_info, quantity), (self.other_info, 1), state='basket')
+        OrderService.change_status(order, 'new')
+        return order
+
+    def rollup_values(self):
+        return (
+            sorted(ShopSalesDaily.objects.values_list('shop_id', 'date', 'state', 'orders_count', 'units', 'revenue')),
+            sorted(ShopProductSalesDaily.objects.values_list('shop_id', 'product_id', 'date', 'state', 'units', 'revenue')),
+        )
+
+    def test_rollups_follow_status_changes(self):
+        """Тест инкрементального обновления агрегатов и отчета по ним"""
+        first, second = self.checkout(2), self.checkout(3)
+        OrderService.change_status(first, 'sent')
+        OrderService.change_status(second, 'canceled')
+
+        response = self.client.get(reverse('api:partner-analytics'), {'group_by': 'status'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['totals']['orders'], 2)
+        self.assertEqual(data['totals']['units'], 5)
+        rows = {row['state']: (row['orders'], row['units']) for row in data['rows']}
+        self.assertEqual(rows, {'sent': (1, 2), 'canceled': (1, 3)})
+        self.assertFalse(ShopSalesDaily.objects.filter(state='new').exists())
+
+        response = self.client.get(
+            reverse('api:partner-analytics'), {'group_by': 'product', 'state': 'sent'}
+        )
+        self.assertEqual(response.json()['rows'][0]['units'], 2)
+
+        incremental = self.rollup_values()
+        SalesRollupService.rebuild()
+        rebuilt = self.rollup_values()
+        self.assertEqual(incremental, rebuilt)
+
+    def test_rollups_use_checkout_price(self):
+        """Тест выручки по цене оформления после изменения прайса"""
+        order = self.checkout(2)
+        ProductInfo.objects.filter(id=self.product_info.id).update(price=150)
+        OrderService.change_status(order, 'confirmed')
+
+        self.assertEqual(order.ordered_items.get(product_info=self.product_info).price, 100)
+        self.assertEqual(
+            list(ShopSalesDaily.objects.filter(shop=self.shop).values_list('state', 'revenue')),
+            [('confirmed', 200)],
+        )
+        incremental = self.rollup_values()
+        SalesRollupService.rebuild()
+        self.assertEqual(incremental, self.rollup_values())
+
+    def test_bulk_change_updates_rollups_once(self):
+        """Тест одного прохода агрегатов и outbox на пакет заказов"""
+        def bulk_confirm(count):
+            order_ids = [self.checkout(1).id for _ in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                OrderService.bulk_change_status(order_ids, 'confirmed', self.shop.id)
+            return len(queries)
+
+        bulk_confirm(1)
+        small, large = bulk_confirm(2), bulk_confirm(5)
+
+        # На каждый заказ — только условный UPDATE по версии
+        self.assertEqual(large - small, 3)
+        self.assertEqual(
+            list(ShopSalesDaily.objects.filter(shop=self.shop).values_list('state', 'orders_count')),
+            [('confirmed', 8)],
+        )
+        self.assertEqual(OutboxEvent.objects.filter(payload__new_status='confirmed').count(), 8)
+
+        # Встречные переходы одного пакета гасятся: агрегаты не обновляются
+        first, second = self.checkout(1), self.checkout(1)
+        with self.assertNumQueries(1):
+            SalesRollupService.apply_transitions(
+                [(first.id, 'new', 'confirmed'), (second.id, 'confirmed', 'new')]
+            )
+
+    def test_analytics_validation(self):
+        """Тест проверки параметров и доступа к аналитике"""
+        response = self.client.get(
+            reverse('api:partner-analytics'), {'date_from': '2025-02-01', 'date_to': '2025-01-01'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.buyer)
+        response = self.client.get(reverse('api:partner-analytics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
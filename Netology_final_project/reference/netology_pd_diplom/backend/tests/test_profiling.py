@@ -0,0 +1,109 @@
+"""Тесты профилирования запросов"""
+import os
+import pstats
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from backend.models import Category, RequestProfile
+from backend.models.users import User
+
+
+class RequestProfilingTestCase(TestCase):
+    """Тесты RequestProfilingMiddleware и хранилища профилей"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name='Профилируемая категория')
+        cls.staff = User.objects.create_user(
+            email='staff@gmail.com', password='TestPass123', is_active=True, is_staff=True
+        )
+        cls.buyer = User.objects.create_user(
+            email='buyer@gmail.com', password='TestPass123', is_active=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(PROFILING_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = reverse('api:categories')
+
+    def get(self, user=None, **headers):
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Token {Token.objects.get_or_create(user=user)[0].key}'
+        return self.client.get(self.url, **headers)
+
+    def test_staff_header_saves_profile(self):
+        """Тест профиля cProfile по заголовку сотрудника"""
+        response = self.get(self.staff, HTTP_X_PROFILE='cprofile', HTTP_X_REQUEST_ID='req-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Profile-Id'], 'req-1')
+        profile = RequestProfile.objects.get()
+        self.assertEqual(
+            (profile.view, profile.mode, profile.user, profile.status_code),
+            ('backend:categories', 'cprofile', self.staff, 200),
+        )
+        stats = pstats.Stats(os.path.join(self.directory, profile.file_name))
+        self.assertTrue(stats.total_calls)
+
+    def test_request_id_cannot_escape_directory(self):
+        """Тест очистки id запроса из заголовка в имени файла"""
+        self.get(self.staff, HTTP_X_PROFILE='1', HTTP_X_REQUEST_ID='../../etc/passwd')
+
+        profile = RequestProfile.objects.get()
+        self.assertNotIn('/', profile.file_name)
+        self.assertEqual(os.listdir(self.directory), [profile.file_name])
+
+    @override_settings(PROFILING_SAMPLE_INTERVAL=0.0001)
+    def test_sampling_mode_writes_collapsed_stacks(self):
+        """Тест семплирующего профилировщика"""
+        self.get(self.staff, HTTP_X_PROFILE='sampling')
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.mode, 'sampling')
+        self.assertTrue(profile.file_name.endswith('.collapsed'))
+        with open(os.path.join(self.directory, profile.file_name), encoding='utf-8') as file:
+            for line in file:
+                stack, samples = line.rsplit(' ', 1)
+                self.assertGreater(int(samples), 0)
+                self.assertIn(':', stack)
+
+    def test_header_ignored_for_non_staff(self):
+        """Тест отказа в профилировании не сотрудникам"""
+        self.assertNotIn('X-Profile-Id', self.get(self.buyer, HTTP_X_PROFILE='1'))
+        self.assertNotIn('X-Profile-Id', self.get(HTTP_X_PROFILE='1'))
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_FILES=2)
+    def test_sample_rate_and_bounded_storage(self):
+        """Тест выборочного профилирования и удаления старых профилей"""
+        for _ in range(3):
+            self.assertIn('X-Profile-Id', self.get())
+
+        self.assertEqual(RequestProfile.objects.count(), 2)
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            sorted(RequestProfile.objects.values_list('file_name', flat=True)),
+        )
+
+    def test_admin_lists_and_downloads_profiles(self):
+        """Тест списка профилей в админке и скачивания файла"""
+        self.get(self.staff, HTTP_X_PROFILE='cprofile')
+        profile = RequestProfile.objects.get()
+        admin = User.objects.create_superuser(email='admin@gmail.com', password='TestPass123')
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('admin:backend_requestprofile_changelist'))
+        self.assertContains(response, profile.file_name)
+        response = self.client.get(
+            reverse('admin:backend_requestprofile_download', args=[profile.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content))
@@ -0,0 +1,153 @@
+"""Тесты бюджета SQL-запросов эндпоинтов API"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from backend.models import (
+    ArchivedOrder, ArchivedOrderItem, ArchivedOrderStatusHistory, Category, Contact, Order,
+    OrderItem, OrderStatusHistory, Parameter, Product, ProductInfo, ProductParameter, Shop
+)
+from backend.models.users import User
+from backend.services.inventory import StockShardService
+from backend.services.orders import OrderService
+
+# Бюджет запросов на эндпоинт: (имя URL, пользователь, параметры запроса) -> запросов.
+# Число запросов не должно зависеть от количества строк; бюджет — верхняя граница,
+# при оптимизации эндпоинта его следует уменьшить. Полные списки заказов и корзина:
+# заказы, позиции, товар магазина, товар, категория, параметры, имена параметров.
+QUERY_BUDGETS = {
+    ('api:categories', None, ''): 1,
+    ('api:shops', None, ''): 1,
+    ('api:products', None, ''): 3,
+    ('api:user-details', 'buyer', ''): 1,
+    ('api:user-contact', 'buyer', ''): 1,
+    ('api:basket', 'buyer', ''): 7,
+    ('api:order', 'buyer', ''): 7,
+    ('api:order', 'buyer', '?summary=true'): 1,
+    ('api:order-detail', 'buyer', ''): 7,
+    ('api:order-archive', 'buyer', ''): 2,
+    ('api:order-archive-detail', 'buyer', ''): 3,
+    ('api:partner-state', 'partner', ''): 1,
+    ('api:partner-orders', 'partner', ''): 9,
+    ('api:partner-orders', 'partner', '?summary=true'): 3,
+    ('api:partner-order-detail', 'partner', ''): 8,
+    ('api:partner-analytics', 'partner', ''): 3,
+    ('api:partner-orders-archive', 'partner', ''): 3,
+    ('api:partner-orders-archive', 'partner', '?summary=true'): 2,
+}
+
+SMALL, LARGE = 2, 6
+
+
+class QueryBudgetTestCase(TestCase):
+    """Число SQL-запросов эндпоинтов постоянно при росте данных и укладывается в бюджет"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create_user(
+            email='budget@gmail.com', password='TestPass123', is_active=True
+        )
+        cls.partner = User.objects.create_user(
+            email='budget-shop@gmail.com', password='TestPass123', is_active=True, type='shop'
+        )
+        cls.shop = Shop.objects.create(name='Бюджетный магазин', user=cls.partner)
+        cls.parameters = [
+            Parameter.objects.create(name='Цвет'), Parameter.objects.create(name='Вес')
+        ]
+        cls.basket = Order.objects.create(user=cls.buyer, state='basket')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.rows = 0
+
+    def seed(self, size):
+        """
+        Добавляет по ``size`` категорий, товаров, контактов, заказов и архивных
+        заказов; в корзину и в каждый заказ — по ``size`` позиций. Половина
+        товаров шардирована.
+        """
+        infos = []
+        for _ in range(size):
+            self.rows += 1
+            category = Category.objects.create(name=f'Категория {self.rows}')
+            category.shops.add(self.shop)
+            product = Product.objects.create(name=f'Товар {self.rows}', category=category)
+            # Каждый второй товар шардирован: остаток разнесен по шардам консолидацией
+            info = ProductInfo.objects.create(
+                product=product, shop=self.shop, external_id=self.rows,
+                price=100, price_rrc=120, quantity=1000, stock_shards=2 * (self.rows % 2)
+            )
+            if info.stock_shards:
+                StockShardService.consolidate(info.id)
+            ProductParameter.objects.bulk_create(
+                ProductParameter(product_info=info, parameter=parameter, value=str(self.rows))
+                for parameter in self.parameters
+            )
+            infos.append(info)
+            Contact.objects.create(
+                user=self.buyer, city='Москва', street='Тверская', phone='+79991234567'
+            )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=self.basket, product_info=info, quantity=1) for info in infos
+        )
+
+        for _ in range(size):
+            order = Order.objects.create(
+                user=self.buyer, state='new', contact=Contact.objects.filter(user=self.buyer).first()
+            )
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product_info=info, quantity=2) for info in infos
+            )
+            OrderStatusHistory.objects.create(order=order, old_status='basket', new_status='new')
+            OrderService.index_shop_orders(order)
+            self.order = order
+
+            self.rows += 1
+            archived = ArchivedOrder.objects.create(
+                id=10 ** 6 + self.rows, user=self.buyer, dt=timezone.now(),
+                state='delivered', total_sum=200 * size, items_count=2 * size
+            )
+            ArchivedOrderItem.objects.bulk_create(
+                ArchivedOrderItem(
+                    order=archived, product_info_id=info.id, product_id=info.product_id,
+                    shop_id=self.shop.id, product_name=f'Товар {info.id}', price=100, quantity=2
+                )
+                for info in infos
+            )
+            ArchivedOrderStatusHistory.objects.bulk_create(
+                ArchivedOrderStatusHistory(
+                    order=archived, old_status=old, new_status=new, changed_at=timezone.now()
+                )
+                for old, new in [('new', 'sent'), ('sent', 'delivered')]
+            )
+            self.archived = archived
+
+    def count_queries(self, name, user, query):
+        """
+        Количество SQL-запросов одного GET-запроса к эндпоинту.
+        """
+        kwargs = {}
+        if name in ('api:order-detail', 'api:partner-order-detail'):
+            kwargs['order_id'] = self.order.id
+        elif name == 'api:order-archive-detail':
+            kwargs['order_id'] = self.archived.id
+        self.client.force_authenticate(getattr(self, user) if user else None)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name, kwargs=kwargs) + query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries)
+
+    def test_query_count_is_constant(self):
+        """Тест постоянства числа запросов при росте данных и соблюдения бюджета"""
+        self.seed(SMALL)
+        small = {endpoint: self.count_queries(*endpoint) for endpoint in QUERY_BUDGETS}
+        self.seed(LARGE)
+        for endpoint, budget in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=endpoint):
+                large = self.count_queries(*endpoint)
+                self.assertEqual(large, small[endpoint], 'число запросов растет с данными')
+                self.assertLessEqual(large, budget, 'превышен бюджет запросов')
@@ -0,0 +1,105 @@
+"""Тесты журнала медленных SQL-запросов"""
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from backend.models import Category, SlowQuery
+from backend.slow_queries import fingerprint, normalize, slow_query_logger
+
+# Порог, при котором медленным считается любой запрос
+LOG_ALL = {'SLOW_QUERY_THRESHOLD_MS': 1e-9}
+
+
+@override_settings(SLOW_QUERY_ASYNC=False)
+class SlowQueryLoggerTestCase(TestCase):
+    """Тесты SlowQueryLogger: отпечатки, агрегаты и планы выполнения"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name='Медленная категория')
+
+    def setUp(self):
+        slow_query_logger.explained.clear()
+
+    def test_normalize_collapses_values(self):
+        """Тест одинакового отпечатка для запросов с разными значениями"""
+        first = normalize("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'a''b' LIMIT 21")
+        second = normalize("SELECT *  FROM t\nWHERE id IN (%s) AND name = 'c' LIMIT 5")
+
+        self.assertEqual(first, 'SELECT * FROM t WHERE id IN (?) AND name = ? LIMIT ?')
+        self.assertEqual(normalize('RELEASE SAVEPOINT "s1407_x16"'), 'RELEASE SAVEPOINT ?')
+        self.assertEqual(fingerprint(first), fingerprint(second))
+
+    def test_wrapper_is_installed(self):
+        """Тест подключения обертки к соединению"""
+        self.assertIn(slow_query_logger, connection.execute_wrappers)
+
+    def test_view_query_is_aggregated_with_plan(self):
+        """Тест записи запроса представления с планом, стеком и счетчиком вызовов"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.settings(**LOG_ALL), self.assertLogs('backend.slow_queries', 'WARNING') as logs:
+                for _ in range(2):
+                    response = self.client.get(reverse('api:categories'))
+                    self.assertEqual(response.status_code, 200)
+
+        self.assertIn('view=backend:categories', '\n'.join(logs.output))
+        query = SlowQuery.objects.get(sql__contains='"backend_category"', last_view='backend:categories')
+        self.assertEqual(query.calls, 2)
+        self.assertGreaterEqual(query.max_ms, query.last_ms)
+        self.assertIn('backend_category', query.explain.lower().replace('"', ''))
+        self.assertIn('backend/api/views', query.stack)
+
+    def test_transaction_commands_are_skipped(self):
+        """Тест пропуска BEGIN/SAVEPOINT и сохранения после фиксации транзакции"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.settings(**LOG_ALL), self.assertLogs('backend.slow_queries', 'WARNING') as logs:
+                with transaction.atomic():
+                    Category.objects.create(name='Новая категория')
+            self.assertFalse(SlowQuery.objects.exists())
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotIn('SAVEPOINT', '\n'.join(logs.output))
+        self.assertEqual(
+            list(SlowQuery.objects.values_list('sql', flat=True)),
+            ['INSERT INTO "backend_category" ("name") VALUES (?) RETURNING "backend_category"."id"'],
+        )
+
+    def test_threshold_disables_logging(self):
+        """Тест отключения журнала нулевым порогом"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.settings(SLOW_QUERY_THRESHOLD_MS=0), self.assertNoLogs('backend.slow_queries'):
+                list(Category.objects.all())
+
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_explain_is_throttled(self):
+        """Тест повторного снятия плана не чаще интервала"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.settings(**LOG_ALL), self.assertLogs('backend.slow_queries', 'WARNING'):
+                list(Category.objects.filter(name='a'))
+        query = SlowQuery.objects.get(sql__contains='"backend_category"')
+        SlowQuery.objects.filter(id=query.id).update(explain='')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.settings(**LOG_ALL), self.assertLogs('backend.slow_queries', 'WARNING'):
+                list(Category.objects.filter(name='b'))
+
+        query.refresh_from_db()
+        self.assertEqual((query.calls, query.explain), (2, ''))
+
+
+@override_settings(SLOW_QUERY_ASYNC=True)
+class SlowQueryWorkerTestCase(TransactionTestCase):
+    """Тест сохранения медленных запросов фоновым потоком"""
+
+    def setUp(self):
+        slow_query_logger.explained.clear()
+
+    def test_worker_saves_query_with_plan(self):
+        """Тест записи запроса и плана фоновым потоком через отдельное соединение"""
+        with self.settings(**LOG_ALL), self.assertLogs('backend.slow_queries', 'WARNING'):
+            list(Category.objects.filter(name='a'))
+        slow_query_logger.flush()
+
+        query = SlowQuery.objects.get(sql__contains='"backend_category"')
+        self.assertEqual(query.calls, 1)
+        self.assertIn('backend_category', query.explain.lower().replace('"', ''))
@@ -0,0 +1,89 @@
+"""Тесты метрик задач Celery"""
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from backend.task_metrics import (
+    ENQUEUED_AT_HEADER, current_rss, queue_latency, stamp_enqueue_time, task_retried
+)
+from backend.tasks.celery_tasks import flush_notifications_task
+
+TASK = 'backend.tasks.celery_tasks.flush_notifications_task'
+
+
+@override_settings(METRICS_TOKEN='')
+class TaskMetricsTestCase(TestCase):
+    """Тесты сигналов Celery и экспорта метрик задач в /metrics"""
+
+    def setUp(self):
+        cache.clear()
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_publish_stamps_enqueue_time(self):
+        """Тест времени постановки в заголовке сообщения"""
+        headers = {}
+        stamp_enqueue_time(headers=headers)
+
+        self.assertAlmostEqual(headers[ENQUEUED_AT_HEADER], time.time(), delta=5)
+
+    def test_latency_counts_from_eta(self):
+        """Тест отсчета ожидания от ETA для отложенных задач и повторов"""
+        enqueued_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        eta = enqueued_at + timedelta(seconds=10)
+        now = (eta + timedelta(seconds=2)).timestamp()
+
+        delayed = SimpleNamespace(enqueued_at=enqueued_at.timestamp(), eta=eta.isoformat())
+        immediate = SimpleNamespace(headers={ENQUEUED_AT_HEADER: enqueued_at.timestamp()}, eta=None)
+
+        self.assertAlmostEqual(queue_latency(delayed, now), 2)
+        self.assertAlmostEqual(queue_latency(immediate, now), 12)
+        self.assertIsNone(queue_latency(SimpleNamespace(eta=None), now))
+
+    def test_task_run_is_exported(self):
+        """Тест учета выполнения и прироста памяти за задачу"""
+        with mock.patch('backend.task_metrics.current_rss', side_effect=[100 << 20, 103 << 20]):
+            result = flush_notifications_task.apply()
+        with mock.patch('backend.task_metrics.current_rss', side_effect=[200 << 20, 201 << 20]):
+            flush_notifications_task.apply()
+
+        self.assertEqual(result.state, 'SUCCESS')
+        output = self.scrape()
+        self.assertIn(f'celery_task_runtime_seconds_count{{task="{TASK}"}} 2', output)
+        self.assertIn(f'celery_task_max_rss_growth_bytes{{task="{TASK}"}} {3 << 20}', output)
+        self.assertNotIn(f'celery_task_failures_total{{task="{TASK}"}}', output)
+
+    def test_current_rss(self):
+        """Тест чтения текущего RSS процесса"""
+        if not current_rss():
+            self.skipTest('/proc недоступен')
+        before = current_rss()
+        block = bytearray(64 << 20)
+        block[::4096] = b'\x01' * len(block[::4096])
+
+        self.assertGreater(current_rss() - before, 32 << 20)
+
+    @override_settings(TASK_QUEUE_LATENCY_ALERT=30)
+    def test_queue_latency_alert(self):
+        """Тест предупреждения о долгом ожидании в очереди"""
+        with self.assertLogs('backend.tasks', 'ERROR') as logs:
+            flush_notifications_task.apply(headers={ENQUEUED_AT_HEADER: time.time() - 60})
+        flush_notifications_task.apply(headers={ENQUEUED_AT_HEADER: time.time()})
+
+        self.assertIn('waited', logs.output[0])
+        output = self.scrape()
+        self.assertIn(f'celery_task_queue_latency_seconds_count{{task="{TASK}"}} 2', output)
+        self.assertIn(f'celery_task_queue_latency_alerts_total{{task="{TASK}"}} 1', output)
+
+    def test_retry_is_counted(self):
+        """Тест счетчика повторов"""
+        task_retried(sender=flush_notifications_task)
+        task_retried(sender=flush_notifications_task)
+
+        self.assertIn(f'celery_task_retries_total{{task="{TASK}"}} 2', self.scrape())
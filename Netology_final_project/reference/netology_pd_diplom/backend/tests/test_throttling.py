@@ -3,6 +3,8 @@ from django.core.cache import cache
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase, APIClient
+from types import SimpleNamespace
+from backend.api.throttling import SlidingWindowUserRateThrottle
 
 
 User = get_user_model()
@@ -84,4 +86,51 @@ class ThrottlingTests(APITestCase):
             self.basket_url,
             **self.auth_headers
         )
-        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class SlidingWindowThrottleTests(APITestCase):
+    """
+    Проверка счетчиков скользящего окна.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.request = SimpleNamespace(user=SimpleNamespace(is_authenticated=True, pk=1), META={})
+        self.now = 1000 * 60.0
+
+    def make_throttle(self):
+        throttle = SlidingWindowUserRateThrottle()
+        throttle.rate = "10/min"
+        throttle.num_requests, throttle.duration = throttle.parse_rate(throttle.rate)
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allowed(self, count):
+        return sum(self.make_throttle().allow_request(self.request, None) for _ in range(count))
+
+    def test_previous_window_weight(self):
+        """
+        Предыдущее окно учитывается пропорционально непрошедшей части.
+        """
+        self.assertEqual(self.allowed(12), 10)
+        throttle = self.make_throttle()
+        throttle.allow_request(self.request, None)
+        self.assertEqual(throttle.wait(), 60.0)
+
+        self.now += 60 + 30
+        self.assertEqual(self.allowed(10), 5)
+
+        self.now += 60
+        self.assertEqual(self.allowed(10), 7)
+
+        self.now += 120
+        self.assertEqual(self.allowed(10), 10)
+
+    def test_counters_are_integers(self):
+        """
+        На ключ хранится счетчик, а не история запросов.
+        """
+        self.allowed(5)
+        key = self.make_throttle().get_cache_key(self.request, None)
+        self.assertEqual(cache.get(f"{key}:1000"), 5)
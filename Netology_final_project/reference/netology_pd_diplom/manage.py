@@ -1,11 +1,12 @@
 #!/usr/bin/env python
 """Django's command-line utility for administrative tasks."""
-import os
 import sys
 
 
 def main():
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'netology_pd_diplom_project.settings')
+    from netology_pd_diplom_project import configure_settings_module
+
+    configure_settings_module()
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
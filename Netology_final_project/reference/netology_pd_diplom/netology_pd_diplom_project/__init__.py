@@ -1,3 +1,14 @@
-from .celery import app as celery_app
+import os
 
-__all__ = ('celery_app',)
\ No newline at end of file
+
+def configure_settings_module():
+    """
+    Выбирает модуль настроек по DJANGO_ENV, если DJANGO_SETTINGS_MODULE не задан.
+    """
+    module = "settings_production" if os.getenv("DJANGO_ENV") == "production" else "settings"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", f"netology_pd_diplom_project.{module}")
+
+
+from .celery import app as celery_app  # noqa: E402
+
+__all__ = ('celery_app', 'configure_settings_module')
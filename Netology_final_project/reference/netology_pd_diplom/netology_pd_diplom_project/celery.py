@@ -1,12 +1,62 @@
 import os
+
 from celery import Celery
+from celery.signals import celeryd_init
+from kombu import Queue
+
+from netology_pd_diplom_project import configure_settings_module
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "netology_pd_diplom_project.settings")
+configure_settings_module()
 
 app = Celery("netology_pd_diplom_project")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
+# ======== QUEUES ========
+# Импорты идут минутами и не должны задерживать письма, поэтому у импортов,
+# уведомлений и обслуживания свои очереди и свои воркеры; в default остаются
+# события outbox и прочие задачи.
+QUEUES = ("default", "notifications", "imports", "maintenance")
+
+app.conf.task_queues = [Queue(name, routing_key=name) for name in QUEUES]
+app.conf.task_default_queue = "default"
+# Первое совпадение побеждает: do_import лежит среди задач писем
+app.conf.task_routes = {
+    "backend.tasks.celery_tasks.do_import": {"queue": "imports"},
+    "backend.tasks.import_tasks.*": {"queue": "imports"},
+    "backend.tasks.celery_tasks.*": {"queue": "notifications"},
+    "backend.tasks.maintenance_tasks.*": {"queue": "maintenance"},
+}
+
+# Профили воркеров: очереди, число процессов и prefetch. Профиль выбирается
+# переменной CELERY_WORKER_PROFILE; явные -Q, -c и --prefetch-multiplier
+# в командной строке важнее профиля. Без профиля воркер слушает все очереди.
+WORKER_PROFILES = {
+    "default": {"queues": ["default"], "concurrency": 2, "prefetch_multiplier": 4},
+    "notifications": {"queues": ["notifications"], "concurrency": 4, "prefetch_multiplier": 4},
+    # Одна задача на процесс: длинный импорт не держит за собой следующие
+    "imports": {"queues": ["imports"], "concurrency": 2, "prefetch_multiplier": 1},
+    "maintenance": {"queues": ["maintenance"], "concurrency": 2, "prefetch_multiplier": 1},
+}
+WORKER_PROFILE = os.getenv("CELERY_WORKER_PROFILE", "")
+
+if WORKER_PROFILE:
+    if WORKER_PROFILE not in WORKER_PROFILES:
+        raise ValueError(f"Unknown CELERY_WORKER_PROFILE: {WORKER_PROFILE}")
+    # Значения по умолчанию для -c и --prefetch-multiplier берутся из конфигурации
+    app.conf.worker_concurrency = WORKER_PROFILES[WORKER_PROFILE]["concurrency"]
+    app.conf.worker_prefetch_multiplier = WORKER_PROFILES[WORKER_PROFILE]["prefetch_multiplier"]
+
+
+@celeryd_init.connect
+def apply_worker_profile(sender=None, instance=None, options=None, **kwargs):
+    """
+    Подписывает воркер на очереди профиля, если -Q не задан.
+    """
+    if WORKER_PROFILE and not (options or {}).get("queues"):
+        instance.app.amqp.queues.select(WORKER_PROFILES[WORKER_PROFILE]["queues"])
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
-    print(f'Request: {self.request!r}')
\ No newline at end of file
+    print(f'Request: {self.request!r}')
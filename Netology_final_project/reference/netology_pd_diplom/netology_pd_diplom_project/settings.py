@@ -63,7 +63,7 @@ JWT_AUTH_REFRESH_COOKIE = 'jwt-refresh-token'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "backend.api.authentication.CachedTokenAuthentication",
         "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
@@ -72,9 +72,9 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "backend.api.exceptions.custom_exception_handler",
     "DEFAULT_THROTTLE_CLASSES": [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.ScopedRateThrottle',
+        'backend.api.throttling.SlidingWindowUserRateThrottle',
+        'backend.api.throttling.SlidingWindowAnonRateThrottle',
+        'backend.api.throttling.SlidingWindowScopedRateThrottle',
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "111/day",
@@ -85,6 +85,11 @@ REST_FRAMEWORK = {
     }
 }
 
+# Кэш токенов: LRU процесса и общий кэш, секунд
+AUTH_TOKEN_CACHE_TTL = 60
+AUTH_TOKEN_LOCAL_CACHE_TTL = 5
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 1024
+
 # ======== SOCIAL ========
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -126,6 +131,7 @@ SOCIALACCOUNT_LOGIN_ON_GET = True
 
 # ======== MIDDLEWARE ========
 MIDDLEWARE = [
+    'backend.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -134,16 +140,43 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.middleware.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'netology_pd_diplom_project.urls'
 
+# ======== METRICS ========
+# Метрики запросов в формате Prometheus; при заданном METRICS_TOKEN нужен Bearer-токен
+METRICS_PATH = '/metrics'
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Заголовок X-Query-Count с количеством SQL-запросов
+METRICS_QUERY_COUNT_HEADER = os.getenv("METRICS_QUERY_COUNT_HEADER", str(DEBUG)) == "True"
+
+# ======== PROFILING ========
+# Профиль запроса снимается по заголовку X-Profile от сотрудника или для доли
+# PROFILING_SAMPLE_RATE всех запросов; хранится не более PROFILING_MAX_FILES профилей
+PROFILING_MODE = os.getenv("PROFILING_MODE", "sampling")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", 0.002))
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 200))
+
+# ======== SLOW QUERIES ========
+# Запросы дольше SLOW_QUERY_THRESHOLD_MS (0 — выключено) пишутся в лог и в админку
+# (SlowQuery) с планом выполнения, который снимается не чаще раза в
+# SLOW_QUERY_EXPLAIN_INTERVAL секунд на отпечаток запроса
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True") == "True"
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", 3600))
+# False — сохранять в потоке запроса после фиксации его транзакции, а не фоновым
+# потоком (тесты, отладка)
+SLOW_QUERY_ASYNC = os.getenv("SLOW_QUERY_ASYNC", "True") == "True"
+
 # ======== TEMPLATES ========
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -151,6 +184,16 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Шаблоны компилируются один раз на процесс, в том числе письма
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
         },
     },
 ]
@@ -165,6 +208,23 @@ DATABASES = {
     }
 }
 
+# ======== CACHE ========
+# Общий кэш процессов (лимиты запросов, токены); без REDIS_CACHE_URL — кэш в памяти процесса
+REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL")
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # ======== STATIC ========
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -177,12 +237,113 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Europe/Moscow'
 CELERYD_POOL_RESTARTS = True
+# Очереди, маршруты и профили воркеров — в netology_pd_diplom_project/celery.py.
+# Задачи импорта подтверждаются после выполнения (acks_late): тайм-аут видимости
+# Redis должен быть больше самого долгого импорта, иначе задачу получит второй воркер
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": int(os.getenv("CELERY_VISIBILITY_TIMEOUT", 7200)),
+}
+CELERY_IMPORTS = (
+    "backend.tasks.celery_tasks",
+    "backend.tasks.import_tasks",
+    "backend.tasks.maintenance_tasks",
+    "backend.tasks.outbox_tasks",
+)
+CELERY_BEAT_SCHEDULE = {
+    "relay-outbox-events": {
+        "task": "backend.tasks.outbox_tasks.relay_outbox_task",
+        "schedule": 2.0,
+    },
+    "dispatch-emails": {
+        "task": "backend.tasks.celery_tasks.dispatch_emails_task",
+        "schedule": 5.0,
+    },
+    "flush-notifications": {
+        "task": "backend.tasks.celery_tasks.flush_notifications_task",
+        "schedule": 30.0,
+    },
+    "sweep-outbox-events": {
+        "task": "backend.tasks.maintenance_tasks.sweep_outbox_events_task",
+        "schedule": 86400.0,
+    },
+    "sweep-outgoing-emails": {
+        "task": "backend.tasks.maintenance_tasks.sweep_outgoing_emails_task",
+        "schedule": 86400.0,
+    },
+    "sweep-expired-stock-holds": {
+        "task": "backend.tasks.maintenance_tasks.sweep_expired_stock_holds_task",
+        "schedule": 300.0,
+    },
+    "sweep-idempotency-keys": {
+        "task": "backend.tasks.maintenance_tasks.sweep_idempotency_keys_task",
+        "schedule": 3600.0,
+    },
+    "consolidate-stock-shards": {
+        "task": "backend.tasks.maintenance_tasks.consolidate_stock_shards_task",
+        "schedule": 60.0,
+    },
+    "archive-orders": {
+        "task": "backend.tasks.maintenance_tasks.archive_orders_task",
+        "schedule": 86400.0,
+    },
+}
 if os.name == "nt":
     CELERYD_POOL = "solo"
+# Задача, ждавшая в очереди дольше стольких секунд (от постановки или ETA),
+# пишется в лог ошибкой и в celery_task_queue_latency_alerts_total; 0 — выключено
+TASK_QUEUE_LATENCY_ALERT = float(os.getenv("TASK_QUEUE_LATENCY_ALERT", 30))
+
+# ======== СКЛАД ========
+# Срок удержания товара в корзине, секунд
+STOCK_HOLD_TTL = int(os.getenv("STOCK_HOLD_TTL", "900"))
+STOCK_HOLD_SWEEP_BATCH = 1000
+
+# Срок хранения ответов для повторов по Idempotency-Key, секунд
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+# Через сколько секунд запрос без ответа считается брошенным (больше таймаута воркера)
+IDEMPOTENCY_LEASE = int(os.getenv("IDEMPOTENCY_LEASE", "120"))
+
+# ======== OUTBOX ========
+# Событий в одной пачке relay
+OUTBOX_RELAY_BATCH = 500
+# Через сколько секунд необработанное событие передается повторно
+OUTBOX_REDISPATCH_AFTER = 300
+OUTBOX_MAX_ATTEMPTS = 5
+# Срок хранения обработанных событий, дней
+OUTBOX_RETENTION_DAYS = 7
+
+# ======== АРХИВ ЗАКАЗОВ ========
+# Доставленные и отмененные заказы старше указанного срока переносятся в архив, дней
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "180"))
+ORDER_ARCHIVE_BATCH = 500
+# Ограничение числа пачек за один запуск периодической задачи
+ORDER_ARCHIVE_MAX_BATCHES = 200
 
 # ======== EMAIL ========
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Письма складываются в очередь и отправляются задачей dispatch_emails_task
+EMAIL_BACKEND = 'backend.services.email_dispatch.QueuedEmailBackend'
+# Бэкенд, через который диспетчер отправляет письма из очереди
+EMAIL_DISPATCH_BACKEND = os.getenv(
+    "EMAIL_DISPATCH_BACKEND", 'django.core.mail.backends.console.EmailBackend'
+)
 DEFAULT_FROM_EMAIL = "webmaster@localhost"
+EMAIL_DISPATCH_BATCH = 200
+EMAIL_DISPATCH_MAX_BATCHES = 10
+# Аренда пачки писем диспетчером, секунд
+EMAIL_DISPATCH_LEASE = 300
+EMAIL_MAX_ATTEMPTS = 5
+# Срок хранения отправленных и неотправленных окончательно писем, дней (копия в EmailLog)
+EMAIL_RETENTION_DAYS = 7
+# Лимиты отправки писем в минуту по доменам получателей
+EMAIL_DOMAIN_RATE_LIMITS = {
+    "default": 600,
+    "gmail.com": 300,
+    "mail.ru": 300,
+    "yandex.ru": 300,
+}
+# Окно объединения уведомлений о смене статуса заказов, секунд
+NOTIFICATION_COALESCE_SECONDS = int(os.getenv("NOTIFICATION_COALESCE_SECONDS", 300))
+NOTIFICATION_FLUSH_BATCH = 500
 
 # ======== SPECTACULAR / SWAGGER ========
 SPECTACULAR_SETTINGS = {
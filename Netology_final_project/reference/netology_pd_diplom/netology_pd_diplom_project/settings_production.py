@@ -0,0 +1,71 @@
+"""
+Настройки production-окружения.
+
+Подключаются через DJANGO_ENV=production (или явным
+DJANGO_SETTINGS_MODULE=netology_pd_diplom_project.settings_production)
+и переопределяют базовые настройки: PostgreSQL с постоянными или пулом
+соединений, Redis-кэш, сессии в кэше и DEBUG=False.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+# ======== BASE ========
+DEBUG = False
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
+if not SECRET_KEY:
+    raise ImproperlyConfigured("DJANGO_SECRET_KEY is required in production")
+ALLOWED_HOSTS = [
+    host.strip() for host in os.getenv("DJANGO_ALLOWED_HOSTS", "").split(",") if host.strip()
+]
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured("DJANGO_ALLOWED_HOSTS is required in production")
+
+# ======== DATABASE ========
+# DB_POOL_MAX_SIZE > 0 — пул соединений psycopg в каждом процессе;
+# иначе соединение живет DB_CONN_MAX_AGE секунд и переиспользуется запросами
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 0))
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv("POSTGRES_DB", "netology"),
+        'USER': os.getenv("POSTGRES_USER", "postgres"),
+        'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+        'HOST': os.getenv("POSTGRES_HOST", "db"),
+        'PORT': os.getenv("POSTGRES_PORT", "5432"),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+}
+if DB_POOL_MAX_SIZE:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv("DB_CONN_MAX_AGE", 600))
+
+# ======== CACHE / SESSIONS ========
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("REDIS_CACHE_URL", "redis://redis:6379/1"),
+    }
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+
+# ======== METRICS ========
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if not METRICS_TOKEN:
+    raise ImproperlyConfigured("METRICS_TOKEN is required in production")
+METRICS_QUERY_COUNT_HEADER = os.getenv("METRICS_QUERY_COUNT_HEADER") == "True"
+
+# ======== TEMPLATES ========
+TEMPLATES[0]['OPTIONS']['debug'] = False
@@ -8,6 +8,8 @@ from django.urls import path, include
 from django.views.generic import TemplateView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from backend.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
 
@@ -29,6 +31,9 @@ urlpatterns = [
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 
+    # Метрики Prometheus
+    path('metrics', metrics_view, name='metrics'),
+
     # Главная страница
     path('', TemplateView.as_view(template_name='home.html'), name='home'),
 ]
\ No newline at end of file
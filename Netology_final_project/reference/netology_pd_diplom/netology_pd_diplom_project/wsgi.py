@@ -2,15 +2,23 @@
 WSGI config for netology_pd_diplom project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Settings module is selected by DJANGO_ENV (see ``configure_settings_module``).
 
 For more information on this file, see
-https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
+https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
-import os
+import logging
 
+from django.core.checks import Tags, run_checks
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'netology_pd_diplom.settings')
+from netology_pd_diplom_project import configure_settings_module
+
+configure_settings_module()
 
 application = get_wsgi_application()
+
+# WSGI-сервер не запускает системные проверки: предупреждения о соединениях с БД пишем в лог
+for message in run_checks(tags=[Tags.database]):
+    logging.getLogger(__name__).warning("%s", message)